@@ -1,6 +1,104 @@
 from django.contrib import admin
-# from .models import CompanyContact, ProductContact, SolutionContact
-#
-# admin.site.register(CompanyContact)
-# admin.site.register(ProductContact)
-# admin.site.register(SolutionContact)
+from django.utils.translation import ugettext_lazy as _
+
+from envelope.managers import RELATED_FIELDS
+from envelope.paginator import EstimatedCountPaginator
+from envelope.search import search_contacts
+from envelope.transfer import streaming_export_response
+from envelope.utils import get_contact_models, has_field
+
+
+def export_as_csv(modeladmin, request, queryset):
+    """
+    Admin action streaming the selected contacts as a CSV file.
+    """
+    return streaming_export_response(queryset, 'csv')
+export_as_csv.short_description = _("Export selected contacts as CSV")
+
+
+def export_as_jsonl(modeladmin, request, queryset):
+    """
+    Admin action streaming the selected contacts as a JSONL file.
+    """
+    return streaming_export_response(queryset, 'jsonl')
+export_as_jsonl.short_description = _("Export selected contacts as JSONL")
+
+
+def mark_replied(modeladmin, request, queryset):
+    """
+    Admin action moving the selected contacts to the Replied state.
+    """
+    changed = queryset.set_state(1, user=request.user)
+    modeladmin.message_user(request, _("%d contacts marked as replied.") % changed)
+mark_replied.short_description = _("Mark selected contacts as replied")
+
+
+def mark_deleted(modeladmin, request, queryset):
+    """
+    Admin action moving the selected contacts to the Deleted state.
+    """
+    changed = queryset.set_state(-1, user=request.user)
+    modeladmin.message_user(request, _("%d contacts marked as deleted.") % changed)
+mark_deleted.short_description = _("Mark selected contacts as deleted")
+
+
+class BaseContactAdmin(admin.ModelAdmin):
+    """
+    Admin for models derived from :class:`envelope.models.BaseContact`.
+
+    The change list fetches the user and company foreign keys in the same
+    query as the contacts, filters on the ``state`` and ``created`` columns
+    and doesn't count all rows of a large table to paginate it.
+    """
+    list_display = ('user_email', 'state', 'created', 'created_by')
+    list_filter = ('state', 'created')
+    search_fields = ('^user_email',)
+    readonly_fields = ('created', 'updated')
+    raw_id_fields = ('created_by', 'updated_by')
+    paginator = EstimatedCountPaginator
+    # Django 1.8+: skip the extra COUNT(*) of the unfiltered table
+    show_full_result_count = False
+    actions = [mark_replied, mark_deleted, export_as_csv, export_as_jsonl]
+
+    def get_list_display(self, request):
+        list_display = super(BaseContactAdmin, self).get_list_display(request)
+        if has_field(self.model, 'company') and 'company' not in list_display:
+            list_display = tuple(list_display) + ('company',)
+        return list_display
+
+    def get_queryset(self, request):
+        try:
+            queryset = super(BaseContactAdmin, self).get_queryset(request)
+        except AttributeError:  # pragma: no cover
+            # Django 1.4 and 1.5
+            queryset = super(BaseContactAdmin, self).queryset(request)
+        related = [name for name in RELATED_FIELDS
+                   if has_field(self.model, name)]
+        return queryset.select_related(*related)
+
+    # Django 1.4 and 1.5
+    queryset = get_queryset
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Searches the subject and message through the full-text index, in
+        addition to the prefix lookup on ``search_fields`` (Django 1.6+).
+        """
+        if not search_term:
+            return queryset, False
+        results, use_distinct = super(BaseContactAdmin, self).get_search_results(
+            request, queryset, search_term)
+        return results | search_contacts(queryset, search_term), use_distinct
+
+    def __init__(self, model, admin_site):
+        super(BaseContactAdmin, self).__init__(model, admin_site)
+        # a select box listing every company would be huge
+        if has_field(model, 'company') and 'company' not in self.raw_id_fields:
+            self.raw_id_fields = tuple(self.raw_id_fields) + ('company',)
+
+
+# Contact models defined by envelope itself get registered automatically.
+for contact_model in get_contact_models():
+    if contact_model._meta.app_label == 'envelope' and \
+            contact_model not in admin.site._registry:
+        admin.site.register(contact_model, BaseContactAdmin)
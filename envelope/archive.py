@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Moving old contact records out of the live tables.
+"""
+
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import connections, models, router
+from django.utils import timezone
+
+from envelope.managers import PENDING
+from envelope.utils import atomic, has_field
+
+ARCHIVE_SUFFIX = '_archive'
+
+# Deleted and Replied, see envelope.constants.STATE_TYPES
+ARCHIVED_STATES = (-1, 1)
+
+
+def get_archive_table(model):
+    """
+    Returns the name of the archive table for a contact model.
+    """
+    return model._meta.db_table + ARCHIVE_SUFFIX
+
+
+def _columns(model, connection):
+    return ', '.join(connection.ops.quote_name(field.column)
+                     for field in model._meta.fields)
+
+
+def _column_definition(field, connection):
+    if isinstance(field, models.AutoField):
+        # archived rows keep their primary keys
+        db_type = models.IntegerField().db_type(connection=connection)
+    else:
+        db_type = field.db_type(connection=connection)
+    definition = '%s %s %s' % (connection.ops.quote_name(field.column), db_type,
+                               'NULL' if field.null else 'NOT NULL')
+    if field.primary_key:
+        definition += ' PRIMARY KEY'
+    return definition
+
+
+def ensure_archive_table(model, using):
+    """
+    Creates the archive table with the columns and primary key of the live
+    table and an index on ``created``, unless it already exists.
+    """
+    connection = connections[using]
+    table = get_archive_table(model)
+    if table in connection.introspection.table_names():
+        return False
+    qn = connection.ops.quote_name
+    definitions = [_column_definition(field, connection)
+                   for field in model._meta.fields
+                   if field.db_type(connection=connection) is not None]
+    with atomic(using=using):
+        cursor = connection.cursor()
+        cursor.execute('CREATE TABLE %s (%s)' % (qn(table), ', '.join(definitions)))
+        cursor.execute('CREATE INDEX %s ON %s (%s)' % (
+            qn(table + '_created'), qn(table),
+            qn(model._meta.get_field('created').column)))
+    return True
+
+
+def _remove_related_rows(model, rows, using):
+    """
+    Deletes the search terms of archived contacts and takes the pending
+    ones off the counters, as ``post_delete`` isn't sent for them.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from envelope.counters import adjust_pending_count
+    from envelope.models import ContactSearchTerm
+    content_type = ContentType.objects.db_manager(using).get_for_model(model)
+    ContactSearchTerm.objects.using(using).filter(
+        content_type=content_type,
+        object_id__in=[row[0] for row in rows]).delete()
+    deltas = defaultdict(int)
+    for row in rows:
+        if row[1] == PENDING:
+            deltas[row[2] if len(row) > 2 else None] -= 1
+    for company_id, delta in deltas.items():
+        adjust_pending_count(model, company_id, delta, using)
+
+
+def archive_contacts(model, states=ARCHIVED_STATES, days=90, chunk_size=1000,
+                     pause=0, using=None):
+    """
+    Moves contacts in one of ``states`` which were last updated more than
+    ``days`` ago into the archive table. Returns the number of moved rows.
+
+    Rows are copied and deleted in primary key order, ``chunk_size`` at a
+    time, each chunk in its own short transaction which locks the rows
+    and checks them against the criteria again. ``pause`` is the number of
+    seconds to sleep between chunks, to let replicas catch up. Search
+    terms and pending counters of the moved contacts are updated too.
+    """
+    using = using or router.db_for_write(model)
+    connection = connections[using]
+    ensure_archive_table(model, using)
+    qn = connection.ops.quote_name
+    columns = _columns(model, connection)
+    pk_column = qn(model._meta.pk.column)
+    insert_sql = 'INSERT INTO %s (%s) SELECT %s FROM %s WHERE %s IN (%%s)' % (
+        qn(get_archive_table(model)), columns, columns,
+        qn(model._meta.db_table), pk_column)
+    delete_sql = 'DELETE FROM %s WHERE %s IN (%%s)' % (
+        qn(model._meta.db_table), pk_column)
+    fields = ['pk', 'state']
+    if has_field(model, 'company'):
+        fields.append('company')
+
+    cutoff = timezone.now() - timedelta(days=days)
+    queryset = model._default_manager.using(using).filter(
+        state__in=states, updated__lt=cutoff).order_by('pk')
+    moved = 0
+    last_pk = None
+    while True:
+        chunk = queryset
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        pks = list(chunk.values_list('pk', flat=True)[:chunk_size])
+        if not pks:
+            return moved
+        with atomic(using=using):
+            rows = list(queryset.filter(pk__in=pks).select_for_update()
+                        .values_list(*fields))
+            if rows:
+                placeholders = ', '.join(['%s'] * len(rows))
+                params = [row[0] for row in rows]
+                cursor = connection.cursor()
+                cursor.execute(insert_sql % placeholders, params)
+                cursor.execute(delete_sql % placeholders, params)
+                _remove_related_rows(model, rows, using)
+        moved += len(rows)
+        last_pk = pks[-1]
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+File attachments of contact messages.
+"""
+
+import base64
+import mimetypes
+from email.mime.base import MIMEBase
+
+from django import forms
+from django.utils import six
+from django.utils.translation import ugettext_lazy as _
+
+from envelope import settings
+
+# Read size when encoding attachments; a multiple of 57 bytes, so that
+# every chunk encodes to complete 76-character base64 lines.
+ENCODE_CHUNK_SIZE = 57 * 1024
+
+
+class MultipleFileInput(forms.FileInput):
+    """
+    File input which lets the user select several files at once.
+    """
+
+    def __init__(self, attrs=None):
+        attrs = dict(attrs or {}, multiple='multiple')
+        super(MultipleFileInput, self).__init__(attrs)
+
+    def value_from_datadict(self, data, files, name):
+        if hasattr(files, 'getlist'):
+            return files.getlist(name)
+        value = files.get(name)
+        return [value] if value else []
+
+
+class AttachmentsField(forms.FileField):
+    """
+    Accepts a list of uploaded files, validating their number and size.
+    """
+    widget = MultipleFileInput
+    default_error_messages = {
+        'max_count': _("You can attach at most %(max_count)d files."),
+        'max_size': _("Each attachment must be smaller than %(max_size)d kB."),
+    }
+
+    def __init__(self, max_count=None, max_size=None, *args, **kwargs):
+        self._max_count = max_count
+        self._max_size = max_size
+        super(AttachmentsField, self).__init__(*args, **kwargs)
+
+    # the settings are resolved on use, fields are created at import time
+
+    @property
+    def max_count(self):
+        return self._max_count or settings.ATTACHMENTS_MAX_COUNT
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.ATTACHMENT_MAX_SIZE
+
+    def clean(self, data, initial=None):
+        files = [f for f in (data or []) if f]
+        if not files:
+            super(AttachmentsField, self).clean(None, initial)
+            return []
+        if len(files) > self.max_count:
+            raise forms.ValidationError(self.error_messages['max_count'] %
+                                        {'max_count': self.max_count})
+        cleaned = [super(AttachmentsField, self).clean(f) for f in files]
+        for f in cleaned:
+            if f.size > self.max_size:
+                raise forms.ValidationError(self.error_messages['max_size'] %
+                                            {'max_size': self.max_size // 1024})
+        return cleaned
+
+
+def attachment_to_mime(uploaded_file):
+    """
+    Returns a MIME part with the contents of an uploaded file.
+
+    Django serializes a message as a whole, so the encoded payload has to
+    be held in memory; its size is bounded by the attachment limits. The
+    file itself is read and base64-encoded in chunks into a single buffer,
+    rather than read whole or encoded into a list of chunks to be joined.
+    """
+    mimetype = (getattr(uploaded_file, 'content_type', None) or
+                mimetypes.guess_type(uploaded_file.name)[0] or
+                'application/octet-stream')
+    maintype, subtype = mimetype.split('/', 1)
+    part = MIMEBase(maintype, subtype)
+    uploaded_file.seek(0)
+    encode = getattr(base64, 'encodebytes', None) or base64.encodestring
+    payload = bytearray()
+    for chunk in iter(lambda: uploaded_file.read(ENCODE_CHUNK_SIZE), b''):
+        payload += encode(chunk)
+    payload = payload.decode('ascii') if six.PY3 else bytes(payload)
+    part.set_payload(payload)
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header('Content-Disposition', 'attachment',
+                    filename=uploaded_file.name)
+    return part
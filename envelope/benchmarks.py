@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Synthetic load generation for the contact form, used by the
+``envelope_loadtest`` management command.
+
+Submissions are generated up front by :class:`PayloadGenerator` and pushed
+in-process through :class:`~envelope.forms.ContactForm` or
+:class:`~envelope.views.ContactView` by a number of threads or processes.
+"""
+
+import json
+import math
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import threading
+from timeit import default_timer
+
+from django.conf import settings as project_settings
+from django.test.utils import override_settings
+
+from envelope.signals import after_send
+from envelope.utils import load_object
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    # Python < 3.4
+    tracemalloc = None
+
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua order invoice "
+    "delivery account password question thanks please help website price "
+    "product support refund shipping error page login"
+).split()
+
+SPAM_WORDS = "free winner casino viagra click http://example.com/offer".split()
+
+# (weight, shortest, longest) message lengths in characters
+MESSAGE_SIZES = (
+    (70, 50, 1000),
+    (25, 1000, 10000),
+    (5, 10000, 100000),
+)
+
+TARGETS = ('form', 'view')
+
+IMPORT_MODULES = ('envelope.forms', 'envelope.views')
+
+# run by measure_import_time() in a fresh interpreter
+IMPORT_TIME_SCRIPT = '''
+import json, sys
+from timeit import default_timer
+if sys.argv[1] == 'setup':
+    import django
+    if hasattr(django, 'setup'):
+        django.setup()
+times = []
+for name in sys.argv[2:]:
+    start = default_timer()
+    __import__(name)
+    times.append([name, default_timer() - start])
+sys.stdout.write(json.dumps(times))
+'''
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest-rank percentile of a sorted list.
+    """
+    if not values:
+        return 0.0
+    index = int(math.ceil(fraction * len(values))) - 1
+    return values[max(0, min(index, len(values) - 1))]
+
+
+class PayloadGenerator(object):
+    """
+    Generates POST data of synthetic submissions.
+
+    Senders are random, categories are picked from the form's category
+    choices, message lengths follow ``sizes`` (see ``MESSAGE_SIZES``) and
+    a ``spam_ratio`` fraction of the submissions is spam: spammy words, a
+    link and a filled-in honeypot field.
+    """
+
+    def __init__(self, form_class, spam_ratio=0.1, sizes=MESSAGE_SIZES,
+                 max_size=None, seed=None):
+        self.random = random.Random(seed)
+        self.spam_ratio = spam_ratio
+        self.sizes = sizes
+        self.max_size = max_size
+        if hasattr(form_class, 'get_category_choices'):
+            choices = form_class().get_category_choices()
+        else:
+            choices = getattr(form_class, 'category_choices', None) or ()
+        self.categories = [value for value, label in choices
+                           if value not in ('', None)]
+        self.honeypot_field = getattr(project_settings, 'HONEYPOT_FIELD_NAME',
+                                      'phonenumber')
+        # slicing a long random text is much cheaper than generating
+        # every message word by word
+        longest = max(size[2] for size in sizes)
+        words, length = [], 0
+        while length < longest * 2:
+            word = self.random.choice(WORDS)
+            words.append(word)
+            length += len(word) + 1
+        self.corpus = ' '.join(words)
+
+    def message_length(self):
+        weights = sum(size[0] for size in self.sizes)
+        pick = self.random.uniform(0, weights)
+        for weight, shortest, longest in self.sizes:
+            pick -= weight
+            if pick <= 0:
+                break
+        length = self.random.randint(shortest, longest)
+        if self.max_size:
+            length = min(length, self.max_size)
+        return length
+
+    def text(self, length):
+        start = self.random.randint(0, len(self.corpus) - length)
+        return self.corpus[start:start + length]
+
+    def generate(self):
+        """
+        Returns the POST data of one submission, and whether it is spam.
+        """
+        number = self.random.randint(1, 10 ** 6)
+        spam = self.random.random() < self.spam_ratio
+        data = {
+            'sender': 'Load Test %d' % number,
+            'email': 'loadtest%d@example.com' % number,
+            'subject': self.text(self.random.randint(10, 60)),
+            'message': self.text(self.message_length()),
+        }
+        if self.categories:
+            data['category'] = self.random.choice(self.categories)
+        if spam:
+            data['message'] = ' '.join(self.random.sample(SPAM_WORDS, 4)) + \
+                ' ' + data['message']
+            data[self.honeypot_field] = 'http://example.com/'
+        return data, spam
+
+
+def submit_form(form_class, data):
+    """
+    Validates and sends the data with a form. Returns the outcome.
+    """
+    form = form_class(data)
+    if not form.is_valid():
+        return 'invalid'
+    return 'sent' if form.save() else 'failed'
+
+
+# ContactView redirects whether the message was delivered or not
+_delivered = threading.local()
+
+
+def _mark_delivered(sender, **kwargs):
+    _delivered.value = True
+
+
+def submit_view(view, data, factory):
+    """
+    Posts the data to a view. Returns the outcome.
+    """
+    from django.contrib.auth.models import AnonymousUser
+    request = factory.post('/contact/', data)
+    request.user = AnonymousUser()
+    _delivered.value = False
+    response = view(request)
+    if response.status_code == 302:
+        return 'sent' if _delivered.value else 'failed'
+    if response.status_code == 400:
+        return 'rejected'
+    if response.status_code == 413:
+        return 'too_large'
+    return 'invalid'
+
+
+def measure_peak_memory(func, *args):
+    """
+    Calls the function and returns its result and the peak of memory
+    allocated during the call, in bytes.
+    """
+    tracemalloc.start()
+    try:
+        result = func(*args)
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class LoadTestResult(object):
+    """
+    Latencies (in seconds), outcomes and, if measured, peak memory (in
+    bytes) of the submissions of a load test.
+    """
+
+    def __init__(self, latencies, outcomes, elapsed, peak_memory=None):
+        self.latencies = sorted(latencies)
+        self.outcomes = {}
+        for outcome in outcomes:
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.elapsed = elapsed
+        self.peak_memory = sorted(peak_memory or [])
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    @property
+    def throughput(self):
+        return self.count / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, fraction):
+        return percentile(self.latencies, fraction)
+
+
+def run_worker(target, form_class_path, view_class_path, payloads,
+               memory=False):
+    """
+    Pushes payloads through the target, returning a list of
+    ``(seconds, outcome, peak memory)`` tuples. Peak memory is measured
+    only if ``memory`` is true, and is ``None`` otherwise.
+    """
+    form_class = load_object(form_class_path)
+    if target == 'view':
+        from django.test.client import RequestFactory
+        factory = RequestFactory()
+        view = load_object(view_class_path).as_view(form_class=form_class)
+
+        def submit(data):
+            return submit_view(view, data, factory)
+    else:
+        def submit(data):
+            return submit_form(form_class, data)
+    results = []
+    for data, spam in payloads:
+        start = default_timer()
+        if memory:
+            outcome, peak = measure_peak_memory(submit, data)
+        else:
+            outcome, peak = submit(data), None
+        results.append((default_timer() - start, outcome, peak))
+    return results
+
+
+def measure_import_time(modules=IMPORT_MODULES, settings_module=None):
+    """
+    Imports the modules one after another in a fresh interpreter and
+    returns a list of ``(module, seconds)`` tuples. Every duration covers
+    only what the previous modules didn't already import.
+
+    With a ``settings_module`` (by default ``DJANGO_SETTINGS_MODULE``),
+    Django is set up first, as in a worker process. Without one, the
+    modules are imported with unconfigured settings, which only works for
+    modules that don't use them at import time.
+    """
+    settings_module = settings_module or os.environ.get('DJANGO_SETTINGS_MODULE')
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(path for path in sys.path if path))
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+    process = subprocess.Popen(
+        [sys.executable, '-c', IMPORT_TIME_SCRIPT,
+         'setup' if settings_module else 'bare'] + list(modules),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+    stdout, stderr = process.communicate()
+    if process.returncode:
+        lines = stderr.decode('utf-8', 'replace').strip().splitlines()
+        raise ValueError("Importing %s failed: %s" % (
+            ', '.join(modules), lines[-1] if lines else process.returncode))
+    return [tuple(item) for item in json.loads(stdout.decode('utf-8'))]
+
+
+def _process_worker(args):
+    return run_worker(*args)
+
+
+def run_load_test(count=1000, concurrency=1, processes=False, target='form',
+                  form_class='envelope.forms.ContactForm',
+                  view_class='envelope.views.ContactView',
+                  spam_ratio=0.1, sizes=MESSAGE_SIZES, max_size=None, seed=None,
+                  email_backend='django.core.mail.backends.dummy.EmailBackend',
+                  memory=False):
+    """
+    Sends ``count`` synthetic submissions through the contact form or view
+    with ``concurrency`` threads (or processes, if ``processes`` is true)
+    and returns a :class:`LoadTestResult`.
+
+    Messages are delivered with ``email_backend``; the default discards
+    them. Processes are started with ``fork`` where available, so they
+    inherit the configured project.
+
+    With ``memory``, the peak memory allocated by every submission is
+    measured with ``tracemalloc`` (Python 3.4+). Tracing slows the
+    submissions down and covers all threads of a process, so it requires
+    processes or a single thread.
+    """
+    if target not in TARGETS:
+        raise ValueError("Unknown target %r, expected one of %s." %
+                         (target, ', '.join(TARGETS)))
+    if memory:
+        if tracemalloc is None:
+            raise ValueError("Measuring memory requires Python 3.4 or newer.")
+        if concurrency > 1 and not processes:
+            raise ValueError("Measuring memory requires processes or a single thread.")
+    generator = PayloadGenerator(load_object(form_class), spam_ratio,
+                                 sizes=sizes, max_size=max_size, seed=seed)
+    payloads = [generator.generate() for i in range(count)]
+    shares = [(target, form_class, view_class, payloads[i::concurrency], memory)
+              for i in range(concurrency)]
+
+    results = []
+    after_send.connect(_mark_delivered, dispatch_uid='envelope.benchmarks')
+    try:
+        with override_settings(EMAIL_BACKEND=email_backend):
+            start = default_timer()
+            if processes:
+                from django.db import connections
+                # forked processes mustn't share the parent's connections
+                for connection in connections.all():
+                    connection.close()
+                pool = multiprocessing.Pool(concurrency)
+                try:
+                    for share in pool.map(_process_worker, shares):
+                        results.extend(share)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                lock = threading.Lock()
+
+                def work(share):
+                    share_results = run_worker(*share)
+                    with lock:
+                        results.extend(share_results)
+
+                threads = [threading.Thread(target=work, args=(share,))
+                           for share in shares]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            elapsed = default_timer() - start
+    finally:
+        after_send.disconnect(dispatch_uid='envelope.benchmarks')
+
+    return LoadTestResult([result[0] for result in results],
+                          [result[1] for result in results], elapsed,
+                          [result[2] for result in results] if memory else None)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Buffered persistence of contact records.
+"""
+
+import atexit
+import logging
+import threading
+import weakref
+
+from django.db import connections
+
+from envelope import settings
+from envelope.utils import atomic
+
+logger = logging.getLogger('envelope.buffer')
+
+
+class WriteBuffer(object):
+    """
+    Collects items and writes them in batches with ``write()``.
+
+    The buffer is flushed when it holds ``max_size`` items, when the
+    oldest item has waited ``max_delay`` milliseconds, and when the
+    interpreter exits normally (see :func:`flush_all`). ``atexit`` hooks
+    don't run when the process is killed by a signal it doesn't handle,
+    which is what ``SIGTERM`` does by default: servers have to turn it into
+    a normal exit (as gunicorn's and uWSGI's graceful shutdowns do), or
+    at most ``max_size`` items or ``max_delay`` milliseconds worth of
+    submissions are lost.
+
+    Items which couldn't be written are put back and written with the next
+    batch. After ``max_retries`` failed writes in a row they are dropped,
+    so that an unavailable destination doesn't grow the buffer without
+    bounds.
+    """
+
+    def __init__(self, max_size=100, max_delay=1000, max_retries=3):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.max_retries = max_retries
+        self.lock = threading.RLock()
+        self.pending = []
+        self.timer = None
+        self.failures = 0
+        _buffers.add(self)
+
+    @property
+    def size(self):
+        return len(self.pending)
+
+    def add(self, item):
+        """
+        Adds an item to the buffer.
+        """
+        with self.lock:
+            self.pending.append(item)
+            full = self.size >= self.max_size
+            if not full:
+                self._start_timer()
+        if full:
+            self.flush()
+
+    def _start_timer(self):
+        if self.timer is None:
+            self.timer = threading.Timer(self.max_delay / 1000.0,
+                                         self._flush_from_timer)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def flush(self):
+        """
+        Writes all buffered items. Returns the number of written items.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, []
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        if not pending:
+            return 0
+        failed = self.write(pending)
+        with self.lock:
+            if not failed:
+                self.failures = 0
+            elif self.failures < self.max_retries:
+                self.failures += 1
+                self.pending[:0] = failed
+                self._start_timer()
+            else:
+                logger.error("Dropping %d buffered items after %d failed writes",
+                             len(failed), self.failures + 1)
+                self.failures = 0
+        return len(pending) - len(failed or ())
+
+    def write(self, items):
+        """
+        Writes a batch of items, returning a list of the items which
+        couldn't be written. Errors should be logged rather than raised,
+        the batch may be written from a timer thread or at exit.
+        """
+        raise NotImplementedError
+
+    def _flush_from_timer(self):
+        with self.lock:
+            self.timer = None
+        try:
+            self.flush()
+        finally:
+            # the timer thread has its own database connections
+            for connection in connections.all():
+                connection.close()
+
+
+class ContactBuffer(WriteBuffer):
+    """
+    Collects unsaved contact instances and inserts them with one
+    ``bulk_create()`` per model, see :class:`WriteBuffer`.
+
+    Note that ``bulk_create()`` doesn't send ``pre_save``/``post_save``
+    signals and doesn't set primary keys on most databases.
+    """
+
+    def write(self, instances):
+        pending = {}
+        for instance in instances:
+            pending.setdefault(type(instance), []).append(instance)
+        failed = []
+        for model, instances in pending.items():
+            try:
+                with atomic():
+                    model._default_manager.bulk_create(instances)
+            except Exception:
+                logger.exception("Failed to insert %d buffered %s records",
+                                 len(instances), model.__name__)
+                failed.extend(instances)
+        return failed
+
+
+_buffers = weakref.WeakSet()
+
+
+def flush_all():
+    """
+    Flushes every write buffer. Registered with ``atexit``.
+    """
+    for buffer in list(_buffers):
+        # there is no later batch to retry with
+        buffer.max_retries = 0
+        buffer.flush()
+
+atexit.register(flush_all)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """
+    Returns the per-process contact buffer, configured with
+    ``ENVELOPE_BUFFER_SIZE`` and ``ENVELOPE_BUFFER_INTERVAL``.
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ContactBuffer(settings.BUFFER_SIZE,
+                                        settings.BUFFER_INTERVAL)
+    return _buffer
+
+
+def persist_contact(instance):
+    """
+    Saves a contact instance, either immediately or through the buffer
+    when ``ENVELOPE_BUFFERED_WRITES`` is enabled.
+    """
+    if settings.BUFFERED_WRITES:
+        get_buffer().add(instance)
+    else:
+        instance.save()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Denormalized counts of pending contacts per company and contact model.
+
+The counters are kept up to date by signal receivers when contacts are
+created, change state or are deleted. Bulk operations which skip model
+signals (``bulk_create()``, ``QuerySet.update()``) leave them stale; run
+the ``envelope_rebuild_counters`` management command afterwards.
+"""
+
+from django.db import IntegrityError
+from django.db.models import Count, F
+
+from envelope.managers import PENDING
+from envelope.utils import atomic, has_field
+
+# Counter key used for models without a company.
+NO_COMPANY = 0
+
+
+def _content_type(model):
+    from django.contrib.contenttypes.models import ContentType
+    return ContentType.objects.get_for_model(model)
+
+
+def _company_id(instance):
+    return instance.__dict__.get('company_id') or NO_COMPANY
+
+
+def adjust_pending_count(model, company_id, delta, using=None):
+    """
+    Atomically adds ``delta`` to the pending counter of a model and company.
+    """
+    from envelope.models import PendingContactCounter
+    manager = PendingContactCounter.objects.db_manager(using)
+    lookup = {
+        'content_type': _content_type(model),
+        'company_id': company_id or NO_COMPANY,
+    }
+    if manager.filter(**lookup).update(pending=F('pending') + delta):
+        return
+    try:
+        with atomic(using=using):
+            manager.create(pending=delta, **lookup)
+    except IntegrityError:
+        # another process created the counter in the meantime
+        manager.filter(**lookup).update(pending=F('pending') + delta)
+
+
+def get_pending_count(model, company=None):
+    """
+    Returns the number of pending contacts of a model, for a company if
+    the model has one.
+    """
+    from envelope.models import PendingContactCounter
+    company_id = getattr(company, 'pk', company) or NO_COMPANY
+    counts = PendingContactCounter.objects.filter(
+        content_type=_content_type(model),
+        company_id=company_id).values_list('pending', flat=True)
+    return counts[0] if counts else 0
+
+
+def get_pending_counts(company=None):
+    """
+    Returns a dictionary mapping contact models to their pending counts.
+    """
+    from envelope.models import PendingContactCounter
+    company_id = getattr(company, 'pk', company) or NO_COMPANY
+    return dict((counter.content_type.model_class(), counter.pending)
+                for counter in PendingContactCounter.objects.filter(
+                    company_id=company_id).select_related('content_type'))
+
+
+def rebuild_pending_counts(model, using=None):
+    """
+    Recomputes the pending counters of a model from its table.
+    """
+    from envelope.models import PendingContactCounter
+    content_type = _content_type(model)
+    queryset = model._default_manager.db_manager(using).filter(state=PENDING)
+    if has_field(model, 'company'):
+        # without order_by(), Meta.ordering columns would split the groups
+        rows = queryset.order_by().values_list('company').annotate(
+            pending=Count('pk'))
+    else:
+        rows = [(NO_COMPANY, queryset.count())]
+    counters = [PendingContactCounter(content_type=content_type,
+                                      company_id=company_id or NO_COMPANY,
+                                      pending=pending)
+                for company_id, pending in rows]
+    manager = PendingContactCounter.objects.db_manager(using)
+    with atomic(using=using):
+        manager.filter(content_type=content_type).delete()
+        manager.bulk_create(counters)
+    return counters
+
+
+def remember_state(sender, instance, **kwargs):
+    """
+    Stores the loaded state and company, to detect changes on save.
+    This and the other receivers are connected to the contact models only,
+    see :func:`envelope.models.connect_contact_receivers`.
+    """
+    # __dict__ lookups don't trigger queries for deferred fields
+    instance._envelope_counted = (instance.__dict__.get('state'),
+                                  _company_id(instance))
+
+
+def count_saved_contact(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    old_state, old_company = (None, None) if created else \
+        getattr(instance, '_envelope_counted', (None, None))
+    new_state, new_company = instance.state, _company_id(instance)
+    if old_state is None and not created:
+        # loaded without the state field, the previous state is unknown
+        return
+    if (old_state, old_company) != (new_state, new_company):
+        if old_state == PENDING:
+            adjust_pending_count(sender, old_company, -1, using)
+        if new_state == PENDING:
+            adjust_pending_count(sender, new_company, 1, using)
+    instance._envelope_counted = (new_state, new_company)
+
+
+def count_deleted_contact(sender, instance, using=None, **kwargs):
+    if instance.__dict__.get('state') == PENDING:
+        adjust_pending_count(sender, _company_id(instance), -1, using)
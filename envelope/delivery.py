@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Delivery backends, which hand a submitted contact message over to its
+destination: an email (the default), a webhook, an append-only JSONL file
+or a contact model table.
+
+Backends are configured by name in ``ENVELOPE_DELIVERY_BACKENDS``::
+
+    ENVELOPE_DELIVERY_BACKENDS = {
+        'default': {'BACKEND': 'envelope.delivery.EmailDelivery'},
+        'sales': {
+            'BACKEND': 'envelope.delivery.WebhookDelivery',
+            'OPTIONS': {'url': 'https://crm.example.com/hooks/contact'},
+        },
+    }
+
+and picked per category with ``ENVELOPE_DELIVERY_CATEGORIES`` or per form
+with its ``delivery_backend`` attribute. Every backend is given the
+``EmailMessage`` built by the form, so ``after_send`` receivers get the
+same arguments whatever the destination.
+"""
+
+import copy
+import json
+import logging
+import socket
+import threading
+from smtplib import SMTPException, SMTPServerDisconnected
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError
+from django.utils import timezone
+from django.utils.encoding import force_text
+from django.utils.six.moves.urllib.request import Request, urlopen
+
+from envelope import instrumentation, settings
+from envelope.buffer import ContactBuffer, WriteBuffer, persist_contact
+from envelope.utils import chunked, get_contact_model, has_field, load_object
+
+logger = logging.getLogger('envelope.delivery')
+
+FAN_OUT_MODES = ('recipient', 'bcc')
+
+# To header of messages sent to Bcc recipients only
+UNDISCLOSED_RECIPIENTS = 'undisclosed-recipients:;'
+
+
+class DeliveryError(Exception):
+    """
+    Raised by a backend which could not deliver a message.
+    """
+
+
+def get_record(message, form):
+    """
+    Returns a JSON-serializable dictionary describing a submission: the
+    message id, time, subject, body, sender, recipients and the cleaned
+    form fields (without attachments).
+    """
+    return {
+        'message_id': message.extra_headers.get('Message-ID'),
+        'created': timezone.now().isoformat(),
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': list(message.to),
+        'fields': dict((name, value) for name, value in form.cleaned_data.items()
+                       if name != 'attachments'),
+    }
+
+
+def dump_record(record):
+    # lazy translations, dates and the like are written as text
+    return json.dumps(record, default=force_text, sort_keys=True)
+
+
+class BaseDelivery(object):
+    """
+    Interface of delivery backends. ``OPTIONS`` of the configuration are
+    passed as keyword arguments.
+    """
+    name = None
+
+    def __init__(self, **options):
+        pass
+
+    def deliver(self, message, form):
+        """
+        Delivers the message built by the form, raising
+        :exc:`DeliveryError` (or ``SMTPException``) on failure.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Writes out whatever the backend still buffers.
+        """
+
+
+def fan_out(message, mode, max_recipients=50):
+    """
+    Returns copies of the message which together reach all of its
+    recipients: one per recipient with ``mode='recipient'``, or one per
+    group of at most ``max_recipients`` Bcc recipients (and an undisclosed
+    To header) with ``mode='bcc'``.
+    """
+    recipients = []
+    for address in message.recipients():
+        if address not in recipients:
+            recipients.append(address)
+    if mode == 'recipient':
+        groups = [[address] for address in recipients]
+    else:
+        groups = chunked(recipients, max_recipients)
+    messages = []
+    for group in groups:
+        part = copy.copy(message)
+        part.extra_headers = dict(message.extra_headers)
+        part.cc = []
+        if mode == 'recipient':
+            part.to, part.bcc = group, []
+        else:
+            part.to, part.bcc = [], group
+            part.extra_headers['To'] = UNDISCLOSED_RECIPIENTS
+        messages.append(part)
+    return messages
+
+
+def _close(connection):
+    try:
+        connection.close()
+    except (SMTPException, socket.error):
+        pass
+
+
+def send_messages(messages, connection):
+    """
+    Sends the messages over one connection, which is opened once and
+    reopened only if it was lost. Returns the recipients of the messages
+    which failed.
+
+    The connection is reopened at most once: if it fails again, the relay
+    is considered unreachable and the remaining messages aren't tried,
+    their recipients fail too.
+    """
+    failed = []
+    reopened = False
+    try:
+        for index, message in enumerate(messages):
+            try:
+                # does nothing while the connection is open
+                connection.open()
+                connection.send_messages([message])
+            except (SMTPException, socket.error) as e:
+                logger.warning("Sending to %s failed", ', '.join(message.recipients()),
+                               exc_info=True)
+                failed.extend(message.recipients())
+                # smtplib resets the session after refused commands, only
+                # a lost connection has to be reopened
+                if isinstance(e, SMTPServerDisconnected) or \
+                        not isinstance(e, SMTPException):
+                    _close(connection)
+                    if reopened:
+                        remaining = messages[index + 1:]
+                        if remaining:
+                            logger.warning("Relay unreachable, not sending %d "
+                                           "remaining messages", len(remaining))
+                        for message in remaining:
+                            failed.extend(message.recipients())
+                        break
+                    reopened = True
+    finally:
+        _close(connection)
+    return failed
+
+
+class EmailDelivery(BaseDelivery):
+    """
+    Sends the message with the configured Django email backend.
+
+    By default, the message goes out once with every recipient in To.
+    With ``fan_out='recipient'`` every recipient gets a private copy, with
+    ``fan_out='bcc'`` the recipients are split into Bcc groups of at most
+    ``max_recipients`` (the relay's limit of recipients per message). The
+    copies are sent over a single connection, see :func:`send_messages`.
+
+    Failed recipients are listed in the ``failed_recipients`` attribute of
+    the message given to ``after_send`` and counted as
+    ``recipient_failures``; the delivery fails only if no copy was sent.
+    Note that recipients refused by the relay in a Bcc group which was
+    otherwise accepted aren't reported by Django's SMTP backend.
+    """
+
+    def __init__(self, fan_out=None, max_recipients=50, **options):
+        super(EmailDelivery, self).__init__(**options)
+        if fan_out not in (None,) + FAN_OUT_MODES:
+            raise ImproperlyConfigured("Unknown fan_out mode %r, expected one of %s." %
+                                       (fan_out, ', '.join(FAN_OUT_MODES)))
+        self.fan_out = fan_out
+        self.max_recipients = max_recipients
+
+    def get_connection(self):
+        from django.core.mail import get_connection
+        return get_connection()
+
+    def deliver(self, message, form):
+        message.failed_recipients = []
+        if self.fan_out is None:
+            message.send()
+            return
+        messages = fan_out(message, self.fan_out, self.max_recipients)
+        failed = send_messages(messages, self.get_connection())
+        message.failed_recipients = failed
+        if failed:
+            instrumentation.increment('recipient_failures', len(failed))
+            if len(failed) == sum(len(part.recipients()) for part in messages):
+                raise DeliveryError("Sending to all %d recipients failed." % len(failed))
+
+
+class WebhookDelivery(BaseDelivery):
+    """
+    POSTs the submission as JSON (see :func:`get_record`) to ``url``.
+    Error responses and timeouts (``timeout`` seconds) are delivery
+    failures.
+    """
+
+    def __init__(self, url, timeout=5, headers=None, **options):
+        super(WebhookDelivery, self).__init__(**options)
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        self.headers.update(headers or {})
+
+    def deliver(self, message, form):
+        data = dump_record(get_record(message, form)).encode('utf-8')
+        request = Request(self.url, data, self.headers)
+        try:
+            urlopen(request, timeout=self.timeout).close()
+        except (IOError, OSError) as e:
+            # URLError, HTTPError and socket errors
+            raise DeliveryError("Webhook %s failed: %s" % (self.url, e))
+
+
+class FileWriteBuffer(WriteBuffer):
+    """
+    Appends buffered lines to a file with a single write.
+    """
+
+    def __init__(self, path, max_size=100, max_delay=1000):
+        super(FileWriteBuffer, self).__init__(max_size, max_delay)
+        self.path = path
+
+    def write(self, lines):
+        try:
+            append_lines(self.path, lines)
+        except (IOError, OSError):
+            logger.exception("Failed to write %d buffered records to %s",
+                             len(lines), self.path)
+            return lines
+        return []
+
+
+def append_lines(path, lines):
+    # one write to a file opened for appending, so that processes
+    # sharing the file don't interleave their batches
+    with open(path, 'ab') as f:
+        f.write(''.join(line + '\n' for line in lines).encode('utf-8'))
+
+
+class FileDelivery(BaseDelivery):
+    """
+    Appends every submission as a line of JSON (see :func:`get_record`) to
+    the file at ``path``, for batch ingestion.
+
+    Lines are buffered and written ``batch_size`` at a time or after
+    ``interval`` milliseconds, defaulting to ``ENVELOPE_BUFFER_SIZE`` and
+    ``ENVELOPE_BUFFER_INTERVAL``. Lines which couldn't be written are
+    retried with the next batch, see :class:`~envelope.buffer.WriteBuffer`;
+    with a ``batch_size`` of 1 every line is written immediately
+    and errors are delivery failures.
+    """
+
+    def __init__(self, path, batch_size=None, interval=None, **options):
+        super(FileDelivery, self).__init__(**options)
+        self.path = path
+        self.batch_size = batch_size or settings.BUFFER_SIZE
+        self.buffer = None
+        if self.batch_size > 1:
+            self.buffer = FileWriteBuffer(path, self.batch_size,
+                                          interval or settings.BUFFER_INTERVAL)
+
+    def deliver(self, message, form):
+        line = dump_record(get_record(message, form))
+        if self.buffer is not None:
+            self.buffer.add(line)
+            return
+        try:
+            append_lines(self.path, [line])
+        except (IOError, OSError) as e:
+            raise DeliveryError("Writing to %s failed: %s" % (self.path, e))
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.flush()
+
+
+class DatabaseDelivery(BaseDelivery):
+    """
+    Saves every submission as an instance of the contact ``model`` (a
+    label such as ``"envelope.CompanyContact"``), with ``user_email`` set
+    to the sender and every other model field named like a form field
+    taken from the form.
+
+    By default every instance is saved immediately, so it is indexed for
+    search and counted like any other contact, and database errors are
+    delivery failures. With a ``batch_size`` above 1, instances are
+    inserted with ``bulk_create()`` ``batch_size`` at a time or after
+    ``interval`` milliseconds (``ENVELOPE_BUFFER_INTERVAL`` by default),
+    see :class:`~envelope.buffer.ContactBuffer`. Otherwise, with
+    ``ENVELOPE_BUFFERED_WRITES`` enabled, they go through the per-process
+    buffer of :func:`~envelope.buffer.persist_contact`. Both skip
+    ``post_save``: run ``envelope_search_index --rebuild`` and
+    ``envelope_rebuild_counters`` to catch up. Buffered instances are lost
+    if their insert keeps failing (the errors are only logged) or the
+    process is killed before they are written.
+    """
+
+    def __init__(self, model, batch_size=1, interval=None, **options):
+        super(DatabaseDelivery, self).__init__(**options)
+        self.model = get_contact_model(model)
+        self.batch_size = batch_size
+        self.buffer = None
+        if self.batch_size > 1:
+            self.buffer = ContactBuffer(self.batch_size,
+                                        interval or settings.BUFFER_INTERVAL)
+
+    def get_instance(self, message, form):
+        values = dict((name, value) for name, value in form.cleaned_data.items()
+                      if name != 'user_email' and has_field(self.model, name))
+        return self.model(user_email=form.cleaned_data['email'], **values)
+
+    def deliver(self, message, form):
+        instance = self.get_instance(message, form)
+        if self.buffer is not None:
+            self.buffer.add(instance)
+            return
+        try:
+            persist_contact(instance)
+        except DatabaseError as e:
+            raise DeliveryError("Saving the %s failed: %s" %
+                                (self.model.__name__, e))
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.flush()
+
+
+# backend name -> (configuration, backend)
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name='default'):
+    """
+    Returns the delivery backend configured as ``name`` in
+    ``ENVELOPE_DELIVERY_BACKENDS``, created once per process and again
+    (closing the previous one) if its configuration changes.
+    """
+    try:
+        config = settings.DELIVERY_BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured("No delivery backend named %r in "
+                                   "ENVELOPE_DELIVERY_BACKENDS." % name)
+    entry = _backends.get(name)
+    if entry is None or entry[0] != config:
+        with _backends_lock:
+            previous = entry = _backends.get(name)
+            if entry is None or entry[0] != config:
+                backend = load_object(config['BACKEND'])(**config.get('OPTIONS', {}))
+                backend.name = name
+                entry = _backends[name] = (config, backend)
+            else:
+                previous = None
+        if previous is not None:
+            previous[1].close()
+    return entry[1]
+
+
+def get_backend_name(category):
+    """
+    Returns the name of the delivery backend for a category, according
+    to ``ENVELOPE_DELIVERY_CATEGORIES``.
+    """
+    if category not in (None, ''):
+        for value, name in settings.DELIVERY_CATEGORIES.items():
+            if force_text(value) == force_text(category):
+                return name
+    return 'default'
+
+
+def close_backends():
+    """
+    Closes and forgets the created backends; they are created again on
+    next use.
+    """
+    with _backends_lock:
+        entries = list(_backends.values())
+        _backends.clear()
+    for config, backend in entries:
+        backend.close()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Model fields used by contact models.
+"""
+
+import base64
+import zlib
+
+from django.db import models
+from django.utils import six
+
+from envelope import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Stored values starting with MARKER carry one of the following tags.
+MARKER = '\x01'
+ZLIB_TAG = 'z'
+ZSTD_TAG = 's'
+RAW_TAG = 'r'
+
+
+def _zstd_compress(data):
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _zstd_decompress(data):
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+CODECS = {
+    'zlib': (ZLIB_TAG, zlib.compress, zlib.decompress),
+    'zstd': (ZSTD_TAG, _zstd_compress, _zstd_decompress),
+}
+
+DECOMPRESSORS = {
+    ZLIB_TAG: zlib.decompress,
+    ZSTD_TAG: _zstd_decompress,
+}
+
+
+def compress_text(text, threshold=None, algorithm=None):
+    """
+    Returns the text to be stored in the database: compressed and
+    base64-encoded if it is longer than ``threshold`` characters and
+    compression makes it shorter, otherwise the text itself.
+    """
+    if text is None:
+        return None
+    threshold = settings.COMPRESSION_THRESHOLD if threshold is None else threshold
+    algorithm = algorithm or settings.COMPRESSION_ALGORITHM
+    if len(text) > threshold:
+        tag, compress, _ = CODECS[algorithm]
+        packed = base64.b64encode(compress(text.encode('utf-8'))).decode('ascii')
+        if len(packed) + 2 < len(text):
+            return MARKER + tag + packed
+    if text.startswith(MARKER):
+        # escape text which would be mistaken for a compressed value
+        return MARKER + RAW_TAG + text
+    return text
+
+
+def decompress_text(value):
+    """
+    Returns the original text of a value produced by ``compress_text()``.
+    """
+    if not isinstance(value, six.string_types) or not value.startswith(MARKER):
+        return value
+    tag, payload = value[1:2], value[2:]
+    if tag == RAW_TAG:
+        return payload
+    decompress = DECOMPRESSORS[tag]
+    return decompress(base64.b64decode(payload.encode('ascii'))).decode('utf-8')
+
+
+def decoded_flag(attname):
+    # instance attribute telling that the field already holds decoded text
+    return '_%s_decoded' % attname
+
+
+class CompressedTextDescriptor(object):
+    """
+    Keeps the value loaded from the database as it is, and decompresses it
+    only when the attribute is read for the first time.
+
+    Only values loaded from the database are decoded, and only once:
+    Django marks loaded instances with ``_state.adding = False`` after
+    setting their fields, so values set while ``adding`` is true come from
+    ``__init__`` (either a database row or the model's constructor) and are
+    decoded on read only once the instance turns out to be loaded. Values
+    assigned later, and values of saved instances, are taken as they are.
+    """
+
+    def __init__(self, field):
+        self.field = field
+        self.flag = decoded_flag(field.attname)
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        try:
+            value = instance.__dict__[self.field.attname]
+        except KeyError:
+            raise AttributeError(self.field.attname)
+        if not instance.__dict__.get(self.flag) and not instance._state.adding:
+            try:
+                value = decompress_text(value)
+            except (ValueError, TypeError, KeyError, zlib.error):
+                # text stored before the column was compressed
+                pass
+            instance.__dict__[self.field.attname] = value
+            instance.__dict__[self.flag] = True
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+        # assigned to an instance which was already loaded or saved
+        instance.__dict__[self.flag] = not instance._state.adding
+
+
+class CompressedTextField(models.TextField):
+    """
+    Text field which stores values longer than ``threshold`` characters
+    compressed with ``algorithm`` (``'zlib'`` or ``'zstd'``, which needs the
+    ``zstandard`` package). Defaults come from the
+    ``ENVELOPE_COMPRESSION_THRESHOLD`` and ``ENVELOPE_COMPRESSION_ALGORITHM``
+    settings.
+
+    Values are decompressed on first access to the attribute, so querysets
+    which ``defer()`` the field, or never read it, don't pay for it. Values
+    assigned in Python are never decoded, whatever they start with. The
+    column is a regular text column; note that ``values()`` returns stored
+    (possibly compressed) values, and database-side lookups and native
+    full-text indexes see the compressed form.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.threshold = kwargs.pop('threshold', None)
+        self.algorithm = kwargs.pop('algorithm', None)
+        super(CompressedTextField, self).__init__(*args, **kwargs)
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        super(CompressedTextField, self).contribute_to_class(cls, name, *args, **kwargs)
+        setattr(cls, self.name, CompressedTextDescriptor(self))
+
+    def pre_save(self, model_instance, add):
+        # reading decodes a loaded value before it is written back; from
+        # now on the instance holds the Python value
+        value = super(CompressedTextField, self).pre_save(model_instance, add)
+        model_instance.__dict__[decoded_flag(self.attname)] = True
+        return value
+
+    def get_prep_value(self, value):
+        value = super(CompressedTextField, self).get_prep_value(value)
+        return compress_text(value, self.threshold, self.algorithm)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super(CompressedTextField, self).deconstruct()
+        if self.threshold is not None:
+            kwargs['threshold'] = self.threshold
+        if self.algorithm is not None:
+            kwargs['algorithm'] = self.algorithm
+        return name, path, args, kwargs
+
+    def south_field_triple(self):
+        from south.modelsinspector import introspector
+        args, kwargs = introspector(self)
+        return ('django.db.models.fields.TextField', args, kwargs)
@@ -10,18 +10,16 @@ import logging
 from smtplib import SMTPException
 
 from django import forms
-from django.core import mail
-from django.core.exceptions import ValidationError
-from django.template.loader import render_to_string
+from django.core.validators import MaxLengthValidator
 from django.utils.translation import ugettext_lazy as _
 
 # Needed as such to avoid naming conflict with envelope.settings.
 from django.conf import settings as project_settings
 
-from envelope import settings
+from envelope import instrumentation, settings
+from envelope.attachments import AttachmentsField, attachment_to_mime
+from envelope.instrumentation import StageTimer
 from envelope.signals import after_send
-from phonenumber_field.validators import validate_international_phonenumber
-from envelope.constants import PRODUCT_CONTACT_CHOICES, COMPANY_CONTACT_CHOICES
 
 logger = logging.getLogger('envelope.forms')
 
@@ -50,57 +48,114 @@ class BaseContactForm(forms.Form):
         Template used to render the email message. Defaults to
         ``envelope/email_body.txt``.
 
+    ``delivery_backend``
+        Name of the delivery backend (see :mod:`envelope.delivery`).
+        Defaults to the backend of the selected category in
+        ``settings.ENVELOPE_DELIVERY_CATEGORIES``, or ``'default'``.
+
+    ``stage_timer``
+        :class:`~envelope.instrumentation.StageTimer` measuring the stages
+        of ``save()``. :class:`~envelope.views.ContactView` passes its own,
+        so that the timings cover the whole submission.
+
     """
     sender = forms.CharField(label=_("Name"))
     email = forms.EmailField(label=_("Email"))
     subject = forms.CharField(label=_("Subject"), required=False)
     message = forms.CharField(label=_("Message"), widget=forms.Textarea())
 
-    subject_intro = settings.SUBJECT_INTRO
-    from_email = settings.FROM_EMAIL
-    email_recipients = settings.EMAIL_RECIPIENTS
-    # A copy of the email should also go to admins.
-    # This prevents the need to visit the db for such tasks.
-    # Business rule, admins should get a copy of any such email or message, unless explicitly stated otherwise.
-    for admin in project_settings.ADMINS:
-        email_recipients.append(admin[1])
+    # None means the corresponding setting, resolved on use
+    subject_intro = None
+    from_email = None
+    email_recipients = None
     template_name = 'envelope/email_body.txt'
+    delivery_backend = None
+    stage_timer = None
 
     def __init__(self, *args, **kwargs):
         for kwarg in list(kwargs):
             if hasattr(self, kwarg):
                 setattr(self, kwarg, kwargs.pop(kwarg))
         super(BaseContactForm, self).__init__(*args, **kwargs)
+        if settings.MAX_MESSAGE_LENGTH:
+            field = self.fields['message']
+            field.max_length = settings.MAX_MESSAGE_LENGTH
+            field.validators.append(MaxLengthValidator(field.max_length))
+            field.widget.attrs.update(field.widget_attrs(field.widget))
 
     def save(self):
         """
         Sends the message.
+
+        The duration of each stage is measured with ``stage_timer`` (a
+        :class:`~envelope.instrumentation.StageTimer`, created if not set).
         """
-        subject = self.get_subject()
-        from_email = self.get_from_email()
-        email_recipients = self.get_email_recipients()
-        context = self.get_context()
-        message_body = render_to_string(self.get_template_names(), context)
+        # imported here, they are needed only when a message is sent
+        from django.core import mail
+        from django.core.mail.message import make_msgid
+        from django.template.loader import render_to_string
+        from envelope.delivery import DeliveryError
+
+        timer = self.stage_timer = self.stage_timer or StageTimer()
+        with timer.stage('prepare'):
+            subject = self.get_subject()
+            from_email = self.get_from_email()
+            email_recipients = self.get_email_recipients()
+            context = self.get_context()
+        with timer.stage('render') as span:
+            message_body = render_to_string(self.get_template_names(), context)
+            span.set_attribute('envelope.body_length', len(message_body))
+        message = None
         try:
-            message = mail.EmailMessage(
-                subject=subject,
-                body=message_body,
-                from_email=from_email,
-                to=email_recipients,
-                headers={
-                    'Reply-To': self.cleaned_data['email']
-                }
-            )
-            message.send()
-            after_send.send(sender=self.__class__, message=message, form=self)
-            logger.info(_("Contact form submitted and sent (from: %s)") %
-                        self.cleaned_data['email'])
-        except SMTPException:
-            logger.exception(_("An error occured while sending the email"))
+            with timer.stage('build'):
+                message = mail.EmailMessage(
+                    subject=subject,
+                    body=message_body,
+                    from_email=from_email,
+                    to=email_recipients,
+                    headers={
+                        'Reply-To': self.cleaned_data['email'],
+                        'Message-ID': make_msgid(),
+                    }
+                )
+                for attachment in self.get_attachments():
+                    message.attach(attachment)
+            with timer.stage('send') as span:
+                backend = self.get_delivery_backend()
+                span.set_attribute('envelope.recipients', len(email_recipients))
+                span.set_attribute('envelope.delivery', backend.name)
+                backend.deliver(message, self)
+            with timer.stage('after_send'):
+                after_send.send(sender=self.__class__, message=message, form=self)
+            instrumentation.increment('sent')
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("Contact form submitted and sent (from: %s)",
+                            self.cleaned_data['email'],
+                            extra=self.get_log_extra('sent', message))
+        except (SMTPException, DeliveryError):
+            instrumentation.increment('send_failures')
+            logger.exception("An error occured while sending the email",
+                             extra=self.get_log_extra('failed', message))
             return False
         else:
             return True
 
+    def get_log_extra(self, outcome, message=None):
+        """
+        Returns the ``extra`` argument of the log records about this
+        submission: an ``envelope`` dictionary with the message id,
+        category, outcome, recipient count and stage timings, which log
+        shippers can index without parsing the message.
+        """
+        headers = message.extra_headers if message is not None else {}
+        return {'envelope': {
+            'message_id': headers.get('Message-ID'),
+            'category': self.cleaned_data.get('category'),
+            'outcome': outcome,
+            'recipients': len(self.get_email_recipients()),
+            'timings': self.stage_timer.as_dict() if self.stage_timer else {},
+        }}
+
     def get_context(self):
         """
         Returns context dictionary for the email body template.
@@ -108,6 +163,9 @@ class BaseContactForm(forms.Form):
         By default, the template has access to all form fields' values
         stored in ``self.cleaned_data``. Override this method to set
         additional template variables.
+
+        The copy is shallow, the values themselves (including a possibly
+        large message) are shared with ``cleaned_data``.
         """
         return self.cleaned_data.copy()
 
@@ -117,7 +175,10 @@ class BaseContactForm(forms.Form):
 
         Override this method to customize the display of the subject.
         """
-        return self.subject_intro + self.cleaned_data['subject']
+        subject_intro = self.subject_intro
+        if subject_intro is None:
+            subject_intro = settings.SUBJECT_INTRO
+        return subject_intro + self.cleaned_data['subject']
 
     def get_from_email(self):
         """
@@ -125,7 +186,7 @@ class BaseContactForm(forms.Form):
 
         Override to customize how the from email address is determined.
         """
-        return self.from_email
+        return self.from_email or settings.FROM_EMAIL
 
     def get_email_recipients(self):
         """
@@ -133,7 +194,25 @@ class BaseContactForm(forms.Form):
 
         Override to customize how the email recipients are determined.
         """
-        return self.email_recipients
+        if self.email_recipients is not None:
+            return self.email_recipients
+        # A copy of the email should also go to admins.
+        # This prevents the need to visit the db for such tasks.
+        # Business rule, admins should get a copy of any such email or message, unless explicitly stated otherwise.
+        return list(settings.EMAIL_RECIPIENTS) + \
+            [admin[1] for admin in project_settings.ADMINS]
+
+    def get_delivery_backend(self):
+        """
+        Returns the delivery backend of the message.
+
+        Override to choose the backend depending on the submitted data.
+        """
+        from envelope import delivery
+        name = self.delivery_backend
+        if name is None:
+            name = delivery.get_backend_name(self.cleaned_data.get('category'))
+        return delivery.get_backend(name)
 
     def get_template_names(self):
         """
@@ -144,6 +223,14 @@ class BaseContactForm(forms.Form):
         """
         return self.template_name
 
+    def get_attachments(self):
+        """
+        Returns a list of MIME parts to attach to the message.
+
+        Override to attach files to the email.
+        """
+        return []
+
 
 class ContactForm(BaseContactForm):
     """
@@ -163,8 +250,9 @@ class ContactForm(BaseContactForm):
     You can additionally override ``category_choices`` or
     ``get_category_choices()`` in a subclass.
     """
-    category_choices = settings.CONTACT_CHOICES
-    category = forms.ChoiceField(label=_("Category"), choices=category_choices)
+    # None means ``settings.ENVELOPE_CONTACT_CHOICES``
+    category_choices = None
+    category = forms.ChoiceField(label=_("Category"), choices=())
 
     def __init__(self, *args, **kwargs):
         """
@@ -195,6 +283,8 @@ class ContactForm(BaseContactForm):
 
         Override this method to customize the generation of categories.
         """
+        if self.category_choices is None:
+            return settings.CONTACT_CHOICES
         return self.category_choices
 
     def get_category_display(self):
@@ -206,3 +296,36 @@ class ContactForm(BaseContactForm):
         except (AttributeError, ValueError, KeyError):
             category = None
         return dict(self.get_category_choices()).get(category)
+
+
+class AttachmentContactForm(ContactForm):
+    """
+    Contact form which additionally accepts file attachments.
+
+    Use it together with :class:`envelope.views.AttachmentContactView`,
+    which streams uploaded files to temporary files on disk. The number
+    and size of the files are limited by ``ENVELOPE_ATTACHMENTS_MAX_COUNT``
+    and ``ENVELOPE_ATTACHMENT_MAX_SIZE``.
+    """
+    attachments = AttachmentsField(label=_("Attachments"), required=False)
+
+    # Error set by the upload handler when it stopped the upload.
+    upload_error = None
+
+    def __init__(self, *args, **kwargs):
+        super(AttachmentContactForm, self).__init__(*args, **kwargs)
+        self.fields.keyOrder.append('attachments')
+
+    def clean(self):
+        if self.upload_error:
+            raise forms.ValidationError(self.upload_error)
+        return super(AttachmentContactForm, self).clean()
+
+    def get_context(self):
+        context = super(AttachmentContactForm, self).get_context()
+        context.pop('attachments', None)
+        return context
+
+    def get_attachments(self):
+        return [attachment_to_mime(f)
+                for f in self.cleaned_data.get('attachments', [])]
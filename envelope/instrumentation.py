@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Timing of the stages of contact form processing.
+
+Every stage duration is sent as the :data:`~envelope.signals.stage_timed`
+signal and passed to the metrics backends listed in
+``ENVELOPE_METRICS_BACKENDS``. Stages are also traced as spans, see
+:mod:`envelope.tracing`.
+"""
+
+import logging
+import socket
+from contextlib import contextmanager
+from timeit import default_timer
+
+from envelope import settings, signals, tracing
+from envelope.utils import load_object
+
+logger = logging.getLogger('envelope.metrics')
+
+
+class BaseMetricsBackend(object):
+    """
+    Interface of metrics backends. Durations are given in milliseconds.
+    """
+
+    def timing(self, name, milliseconds, tags=None):
+        pass
+
+    def increment(self, name, value=1, tags=None):
+        pass
+
+
+class LoggingMetricsBackend(BaseMetricsBackend):
+    """
+    Logs metrics to the ``envelope.metrics`` logger at DEBUG level.
+    """
+
+    def timing(self, name, milliseconds, tags=None):
+        logger.debug("%s: %.3f ms %s", name, milliseconds, tags or '')
+
+    def increment(self, name, value=1, tags=None):
+        logger.debug("%s: +%s %s", name, value, tags or '')
+
+
+class StatsdMetricsBackend(BaseMetricsBackend):
+    """
+    Sends metrics over UDP to a statsd server at ``ENVELOPE_STATSD_HOST``
+    and ``ENVELOPE_STATSD_PORT``, prefixed with ``ENVELOPE_STATSD_PREFIX``.
+    Tags are sent in the DogStatsD format.
+    """
+
+    def __init__(self, host=None, port=None, prefix=None):
+        self.address = (host or settings.STATSD_HOST,
+                        port or settings.STATSD_PORT)
+        self.prefix = settings.STATSD_PREFIX if prefix is None else prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def format(self, name, value, metric_type, tags=None):
+        line = '%s%s:%s|%s' % (self.prefix, name, value, metric_type)
+        if tags:
+            line += '|#' + ','.join('%s:%s' % item for item in sorted(tags.items()))
+        return line
+
+    def send(self, line):
+        try:
+            self.socket.sendto(line.encode('utf-8'), self.address)
+        except (socket.error, socket.gaierror):
+            pass
+
+    def timing(self, name, milliseconds, tags=None):
+        self.send(self.format(name, '%.3f' % milliseconds, 'ms', tags))
+
+    def increment(self, name, value=1, tags=None):
+        self.send(self.format(name, value, 'c', tags))
+
+
+_backends = None
+
+
+def get_metrics_backends():
+    """
+    Returns instances of the backends configured in
+    ``ENVELOPE_METRICS_BACKENDS``.
+    """
+    global _backends
+    if _backends is None:
+        _backends = [load_object(path)() for path in settings.METRICS_BACKENDS]
+    return _backends
+
+
+def record_timing(stage, duration, tags=None):
+    """
+    Publishes the duration (in seconds) of a stage.
+    """
+    signals.stage_timed.send(sender=StageTimer, stage=stage, duration=duration)
+    for backend in get_metrics_backends():
+        backend.timing('envelope.%s' % stage, duration * 1000, tags)
+
+
+def increment(name, value=1, tags=None):
+    """
+    Increments a counter in all metrics backends.
+    """
+    for backend in get_metrics_backends():
+        backend.increment('envelope.%s' % name, value, tags)
+
+
+class StageTimer(object):
+    """
+    Measures the stages of processing a single submission.
+
+    ``stages`` is a list of ``(name, seconds)`` pairs, in the order the
+    stages finished.
+    """
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Measures the ``with`` block as the stage ``name``. The block runs
+        in a tracing span named ``envelope.<name>``, which it gets as the
+        ``as`` target and can add attributes to.
+        """
+        start = default_timer()
+        try:
+            with tracing.get_tracer().span('envelope.' + name) as span:
+                yield span
+        finally:
+            duration = default_timer() - start
+            self.stages.append((name, duration))
+            record_timing(name, duration)
+
+    @property
+    def total(self):
+        return sum(duration for name, duration in self.stages)
+
+    def as_dict(self):
+        """
+        Returns the stage durations in milliseconds, keyed by stage name.
+        """
+        return dict((name, round(duration * 1000, 3))
+                    for name, duration in self.stages)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Archival of old deleted and replied contacts.
+"""
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from envelope.archive import ARCHIVED_STATES, archive_contacts, get_archive_table
+from envelope.utils import get_contact_model, get_contact_models
+
+
+class Command(BaseCommand):
+    args = '[app_label.ModelName ...]'
+    help = ("Moves old contacts in the Deleted and Replied states to archive "
+            "tables. Processes all contact models if none are given.")
+    option_list = BaseCommand.option_list + (
+        make_option('--days', dest='days', type='int', default=90,
+                    help="Archive contacts last updated more than this many "
+                         "days ago. Default: %default"),
+        make_option('--state', dest='states', action='append', type='int',
+                    help="State of the contacts to archive. Can be repeated. "
+                         "Default: %s" % ', '.join(str(s) for s in ARCHIVED_STATES)),
+        make_option('--chunk-size', dest='chunk_size', type='int',
+                    default=1000,
+                    help="Rows moved per transaction. Default: %default"),
+        make_option('--pause', dest='pause', type='float', default=0,
+                    help="Seconds to sleep between chunks. Default: %default"),
+        make_option('--database', dest='database',
+                    help="Database alias. Defaults to the router's choice."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            models = [get_contact_model(label) for label in args] or get_contact_models()
+        except ValueError as e:
+            raise CommandError(e)
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be a positive number.")
+        states = options['states'] or ARCHIVED_STATES
+        for model in models:
+            moved = archive_contacts(model, states=states,
+                                     days=options['days'],
+                                     chunk_size=options['chunk_size'],
+                                     pause=options['pause'],
+                                     using=options['database'])
+            self.stdout.write("%s: moved %d rows to %s\n" % (
+                model._meta.object_name, moved, get_archive_table(model)))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Streaming export of contact records.
+"""
+
+import io
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import six
+
+from envelope.transfer import WRITERS, iter_export_rows
+from envelope.utils import get_contact_model
+
+
+class Command(BaseCommand):
+    args = '<app_label.ModelName>'
+    help = ("Exports contact records as CSV or JSONL, reading them from the "
+            "database in chunks.")
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', default='csv',
+                    choices=sorted(WRITERS),
+                    help="Output format. Default: %default"),
+        make_option('--output', '-o', dest='output',
+                    help="Output file. Defaults to standard output."),
+        make_option('--state', dest='states', action='append', type='int',
+                    help="Export only contacts in this state. Can be "
+                         "repeated."),
+        make_option('--chunk-size', dest='chunk_size', type='int',
+                    default=1000,
+                    help="Rows fetched per query. Default: %default"),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 1:
+            raise CommandError("Usage: manage.py envelope_export %s" % self.args)
+        try:
+            model = get_contact_model(args[0])
+        except ValueError as e:
+            raise CommandError(e)
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be a positive number.")
+        queryset = model._default_manager.all()
+        if options['states']:
+            queryset = queryset.filter(state__in=options['states'])
+        line_formatter = WRITERS[options['format']][0]
+        lines = line_formatter(iter_export_rows(queryset,
+                                                chunk_size=options['chunk_size']))
+        if options['output']:
+            with io.open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                for line in lines:
+                    if not isinstance(line, six.text_type):  # pragma: no cover
+                        line = line.decode('utf-8')
+                    f.write(line)
+        else:
+            for line in lines:
+                # every line already ends with a newline
+                self.stdout.write(line)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Bulk import of historical contact submissions.
+"""
+
+import os
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+
+from envelope import search
+from envelope.counters import rebuild_pending_counts
+from envelope.transfer import ContactImporter, READERS
+from envelope.utils import get_contact_model, load_object
+
+
+class Command(BaseCommand):
+    args = '<app_label.ModelName> <path>'
+    help = ("Imports contact submissions from a CSV or JSONL file. Every row "
+            "is validated with a contact form before being inserted. Rows "
+            "are inserted without model signals, so the pending counters "
+            "and the inverted search index are rebuilt afterwards unless "
+            "--no-rebuild is given.")
+    option_list = BaseCommand.option_list + (
+        make_option('--format', dest='format', choices=sorted(READERS),
+                    help="Input format. Guessed from the file extension "
+                         "if omitted."),
+        make_option('--form', dest='form',
+                    default='envelope.forms.BaseContactForm',
+                    help="Dotted path of the form class used to validate "
+                         "rows. Default: %default"),
+        make_option('--chunk-size', dest='chunk_size', type='int',
+                    default=1000,
+                    help="Rows inserted per transaction. Default: %default"),
+        make_option('--encoding', dest='encoding', default='utf-8',
+                    help="Input file encoding. Default: %default"),
+        make_option('--no-rebuild', action='store_false', dest='rebuild',
+                    default=True,
+                    help="Don't rebuild the pending counters and the inverted "
+                         "search index of the model after the import; run "
+                         "envelope_rebuild_counters and envelope_search_index "
+                         "later instead."),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 2:
+            raise CommandError("Usage: manage.py envelope_import %s" % self.args)
+        label, path = args
+        try:
+            model = get_contact_model(label)
+            form_class = load_object(options['form'])
+        except (ValueError, ImportError) as e:
+            raise CommandError(e)
+        input_format = options['format'] or os.path.splitext(path)[1][1:].lower()
+        if input_format not in READERS:
+            raise CommandError("Unknown input format %r, use --format." % input_format)
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be a positive number.")
+        if not os.path.isfile(path):
+            raise CommandError("File not found: %s" % path)
+        self.verbosity = int(options['verbosity'])
+
+        importer = ContactImporter(model, form_class,
+                                   chunk_size=options['chunk_size'],
+                                   progress=self.report_progress,
+                                   on_error=self.report_error)
+        rows = READERS[input_format](path, encoding=options['encoding'])
+        imported, rejected = importer.run(rows)
+        self.stdout.write("Imported %d rows into %s, rejected %d.\n" %
+                          (imported, label, rejected))
+        if imported and options['rebuild']:
+            self.rebuild(model)
+
+    def rebuild(self, model):
+        using = router.db_for_write(model)
+        rebuild_pending_counts(model, using=using)
+        backend = search.get_search_backend(model, using)
+        # native indexes are kept up to date by the database
+        if backend is search.BACKENDS['inverted']:
+            backend.rebuild(model, using)
+        if self.verbosity >= 1:
+            self.stdout.write("Rebuilt pending counters and search index.\n")
+
+    def report_progress(self, imported, rejected, elapsed):
+        if self.verbosity >= 1:
+            rate = imported / elapsed if elapsed else 0
+            self.stdout.write("%d imported, %d rejected, %.1fs elapsed "
+                              "(%.0f rows/s)\n" % (imported, rejected, elapsed, rate))
+
+    def report_error(self, number, errors):
+        if self.verbosity >= 2:
+            details = '; '.join('%s: %s' % (field, ' '.join(messages))
+                                for field, messages in errors.items())
+            self.stderr.write("Row %d rejected: %s\n" % (number, details))
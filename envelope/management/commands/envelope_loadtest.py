@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+In-process load test of the contact form.
+"""
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from envelope.benchmarks import (IMPORT_MODULES, MESSAGE_SIZES, TARGETS,
+                                 measure_import_time, percentile, run_load_test)
+from envelope.smtp_sink import SMTPSinkServer
+
+
+class Command(BaseCommand):
+    help = ("Sends synthetic submissions through the contact form or view "
+            "and reports throughput and latency.")
+    option_list = BaseCommand.option_list + (
+        make_option('--count', dest='count', type='int', default=1000,
+                    help="Number of submissions. Default: %default"),
+        make_option('--concurrency', dest='concurrency', type='int', default=1,
+                    help="Number of threads (or processes). Default: %default"),
+        make_option('--processes', dest='processes', action='store_true',
+                    default=False,
+                    help="Use processes instead of threads."),
+        make_option('--target', dest='target', choices=TARGETS, default='view',
+                    help="Submit through the 'form' or the 'view'. "
+                         "Default: %default"),
+        make_option('--form', dest='form', default='envelope.forms.ContactForm',
+                    help="Dotted path of the form class. Default: %default"),
+        make_option('--view', dest='view', default='envelope.views.ContactView',
+                    help="Dotted path of the view class. Default: %default"),
+        make_option('--spam-ratio', dest='spam_ratio', type='float', default=0.1,
+                    help="Fraction of spam submissions. Default: %default"),
+        make_option('--message-size', dest='message_size', type='int',
+                    help="Length of every generated message, instead of "
+                         "a mix of short and long ones."),
+        make_option('--max-message-size', dest='max_size', type='int',
+                    help="Upper limit of generated message lengths."),
+        make_option('--memory', dest='memory', action='store_true',
+                    default=False,
+                    help="Measure the peak memory of every submission "
+                         "(Python 3.4+, slows submissions down)."),
+        make_option('--seed', dest='seed', type='int',
+                    help="Seed of the payload generator, for repeatable runs."),
+        make_option('--email-backend', dest='email_backend',
+                    default='django.core.mail.backends.dummy.EmailBackend',
+                    help="Email backend used to deliver the messages. "
+                         "Default: %default"),
+        make_option('--smtp-sink', dest='smtp_sink', action='store_true',
+                    default=False,
+                    help="Deliver over SMTP to a local sink server started "
+                         "for the test."),
+        make_option('--smtp-delay', dest='smtp_delay', type='float', default=0,
+                    help="Milliseconds the sink waits before every reply."),
+        make_option('--smtp-failure-rate', dest='smtp_failure_rate',
+                    type='float', default=0,
+                    help="Fraction of sink commands answered with a failure."),
+        make_option('--smtp-drop-rate', dest='smtp_drop_rate', type='float',
+                    default=0,
+                    help="Fraction of sink commands answered by closing the "
+                         "connection."),
+        make_option('--import-time', dest='import_time', action='store_true',
+                    default=False,
+                    help="Instead of the load test, measure how long importing "
+                         "the envelope modules takes in a fresh process."),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            raise CommandError("This command takes no arguments.")
+        if options['count'] < 1 or options['concurrency'] < 1:
+            raise CommandError("--count and --concurrency must be positive numbers.")
+        if not 0 <= options['spam_ratio'] <= 1:
+            raise CommandError("--spam-ratio must be between 0 and 1.")
+        if options['import_time']:
+            return self.report_import_time(options)
+
+        sink = None
+        if options['smtp_sink']:
+            sink = SMTPSinkServer(('127.0.0.1', 0),
+                                  delay=options['smtp_delay'] / 1000.0,
+                                  failure_rate=options['smtp_failure_rate'],
+                                  drop_rate=options['smtp_drop_rate'])
+            host, port = sink.start()
+            options['email_backend'] = 'django.core.mail.backends.smtp.EmailBackend'
+        try:
+            if sink:
+                with override_settings(EMAIL_HOST=host, EMAIL_PORT=port,
+                                       EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+                                       EMAIL_USE_TLS=False):
+                    result = self.run(options)
+            else:
+                result = self.run(options)
+        except (ValueError, ImportError) as e:
+            raise CommandError(e)
+        finally:
+            if sink:
+                sink.stop()
+
+        self.stdout.write("%d submissions in %.2fs with %d %s: %.1f/s\n" % (
+            result.count, result.elapsed, options['concurrency'],
+            'processes' if options['processes'] else 'threads',
+            result.throughput))
+        self.stdout.write("latency (ms): p50 %.2f, p90 %.2f, p99 %.2f, max %.2f\n" % (
+            result.percentile(0.5) * 1000, result.percentile(0.9) * 1000,
+            result.percentile(0.99) * 1000, result.percentile(1) * 1000))
+        self.stdout.write("outcomes: %s\n" % ', '.join(
+            '%s %d' % item for item in sorted(result.outcomes.items())))
+        if result.peak_memory:
+            self.stdout.write("peak memory (KiB): p50 %.1f, p90 %.1f, max %.1f\n" % (
+                percentile(result.peak_memory, 0.5) / 1024.0,
+                percentile(result.peak_memory, 0.9) / 1024.0,
+                result.peak_memory[-1] / 1024.0))
+        if sink:
+            self.stdout.write("smtp sink: %s\n" % ', '.join(
+                '%s %d' % item for item in sorted(sink.stats.items())))
+
+    def report_import_time(self, options):
+        modules = list(IMPORT_MODULES)
+        for path in (options['form'], options['view']):
+            module = path.rpartition('.')[0]
+            if module not in modules:
+                modules.append(module)
+        try:
+            times = measure_import_time(modules, options.get('settings'))
+        except ValueError as e:
+            raise CommandError(e)
+        for module, seconds in times:
+            self.stdout.write("import %s: %.1f ms\n" % (module, seconds * 1000))
+
+    def run(self, options):
+        sizes = MESSAGE_SIZES
+        if options['message_size']:
+            sizes = ((1, options['message_size'], options['message_size']),)
+        return run_load_test(
+            count=options['count'],
+            concurrency=options['concurrency'],
+            processes=options['processes'],
+            target=options['target'],
+            form_class=options['form'],
+            view_class=options['view'],
+            spam_ratio=options['spam_ratio'],
+            sizes=sizes,
+            max_size=options['max_size'],
+            seed=options['seed'],
+            email_backend=options['email_backend'],
+            memory=options['memory'])
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Printing the profiles of contact form submissions.
+"""
+
+import datetime
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from envelope.profiling import clear_profiles, get_profiles, make_token
+
+
+class Command(BaseCommand):
+    help = ("Prints the profiles of sampled or explicitly profiled contact "
+            "form submissions, most recent last.")
+    option_list = BaseCommand.option_list + (
+        make_option('--stage', dest='stage',
+                    help="Only show this stage (for example 'send')."),
+        make_option('--limit', dest='limit', type='int', default=10,
+                    help="Functions shown per stage. Default: %default"),
+        make_option('--last', dest='last', type='int',
+                    help="Only show the given number of most recent profiles."),
+        make_option('--clear', dest='clear', action='store_true', default=False,
+                    help="Remove the stored profiles after printing them."),
+        make_option('--token', dest='token', action='store_true', default=False,
+                    help="Print a signed value for the profiling header "
+                         "and exit."),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            raise CommandError("This command takes no arguments.")
+        if options['token']:
+            self.stdout.write("%s\n" % make_token())
+            return
+        if options['limit'] < 1:
+            raise CommandError("--limit must be a positive number.")
+
+        profiles = get_profiles()
+        if options['last']:
+            profiles = profiles[-options['last']:]
+        for entry in profiles:
+            self.write_profile(entry, options['stage'], options['limit'])
+        if not profiles:
+            self.stdout.write("No profiles stored.\n")
+        if options['clear']:
+            clear_profiles()
+
+    def write_profile(self, entry, stage, limit):
+        self.stdout.write("%s %s (%.1f ms)\n" % (
+            datetime.datetime.fromtimestamp(entry['time']).isoformat(),
+            entry['path'], entry['total'] * 1000))
+        for name, duration, rows in entry['stages']:
+            if stage and name != stage:
+                continue
+            self.stdout.write("  %s: %.1f ms\n" % (name, duration * 1000))
+            self.stdout.write("    %8s %10s %10s  %s\n" % (
+                'ncalls', 'tottime', 'cumtime', 'function'))
+            for function, calls, tottime, cumtime, callers in rows[:limit]:
+                self.stdout.write("    %8d %10.4f %10.4f  %s\n" % (
+                    calls, tottime, cumtime, function))
+                if callers:
+                    self.stdout.write("    %30s  <- %s\n" % ('', ', '.join(callers[:3])))
+        self.stdout.write("\n")
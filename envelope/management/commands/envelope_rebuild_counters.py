@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Recomputing the denormalized pending contact counters.
+"""
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from envelope.counters import rebuild_pending_counts
+from envelope.utils import get_contact_model, get_contact_models
+
+
+class Command(BaseCommand):
+    args = '[app_label.ModelName ...]'
+    help = ("Recomputes pending contact counters from the contact tables. "
+            "Processes all contact models if none are given.")
+    option_list = BaseCommand.option_list + (
+        make_option('--database', dest='database',
+                    help="Database alias. Defaults to the router's choice."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            models = [get_contact_model(label) for label in args] or get_contact_models()
+        except ValueError as e:
+            raise CommandError(e)
+        for model in models:
+            counters = rebuild_pending_counts(model, using=options['database'])
+            self.stdout.write("%s: %d pending in %d counters\n" % (
+                model._meta.object_name,
+                sum(counter.pending for counter in counters), len(counters)))
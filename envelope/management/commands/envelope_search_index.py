@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Creation and rebuilding of full-text search indexes.
+"""
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router
+
+from envelope import search, settings
+from envelope.utils import get_contact_model, get_contact_models
+
+
+class Command(BaseCommand):
+    args = '[app_label.ModelName ...]'
+    help = ("Creates the native full-text index of the contact models if the "
+            "database supports one, or rebuilds the built-in inverted index "
+            "otherwise. Processes all contact models if none are given.")
+    option_list = BaseCommand.option_list + (
+        make_option('--rebuild', action='store_true', dest='rebuild',
+                    default=False,
+                    help="Rebuild existing indexes from table contents."),
+        make_option('--database', dest='database',
+                    help="Database alias. Defaults to the router's choice."),
+    )
+
+    def handle(self, *args, **options):
+        try:
+            models = [get_contact_model(label) for label in args] or get_contact_models()
+        except ValueError as e:
+            raise CommandError(e)
+        for model in models:
+            using = options['database'] or router.db_for_write(model)
+            backend = search.get_native_backend(using)
+            if backend is None or settings.SEARCH_BACKEND == 'inverted':
+                search.BACKENDS['inverted'].rebuild(model, using)
+                action = "rebuilt inverted index"
+            elif not backend.is_installed(model, using):
+                backend.install(model, using)
+                action = "created native index"
+            elif options['rebuild']:
+                backend.rebuild(model, using)
+                action = "rebuilt native index"
+            else:
+                action = "native index already exists"
+            self.stdout.write("%s: %s\n" % (model._meta.object_name, action))
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Bulk state transitions of contacts.
+"""
+
+from datetime import timedelta
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from envelope.constants import STATE_TYPES
+from envelope.utils import get_contact_model
+
+
+class Command(BaseCommand):
+    args = '<app_label.ModelName> <state>'
+    help = ("Moves contacts to another state with set-based updates. "
+            "States: %s." % ', '.join('%d' % state for state, _ in STATE_TYPES))
+    option_list = BaseCommand.option_list + (
+        make_option('--from-state', dest='from_states', action='append',
+                    type='int',
+                    help="Change only contacts in this state. Can be "
+                         "repeated."),
+        make_option('--days', dest='days', type='int',
+                    help="Change only contacts created more than this many "
+                         "days ago."),
+        make_option('--email', dest='email',
+                    help="Change only contacts sent from this address."),
+        make_option('--batch-size', dest='batch_size', type='int',
+                    default=1000,
+                    help="Rows updated per statement. Default: %default"),
+    )
+
+    def handle(self, *args, **options):
+        if len(args) != 2:
+            raise CommandError("Usage: manage.py envelope_set_state %s" % self.args)
+        try:
+            model = get_contact_model(args[0])
+            state = int(args[1])
+        except ValueError as e:
+            raise CommandError(e)
+        if state not in dict(STATE_TYPES):
+            raise CommandError("Unknown state: %d" % state)
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive number.")
+        queryset = model._default_manager.all()
+        if options['from_states']:
+            queryset = queryset.filter(state__in=options['from_states'])
+        if options['days'] is not None:
+            queryset = queryset.filter(
+                created__lt=timezone.now() - timedelta(days=options['days']))
+        if options['email']:
+            queryset = queryset.filter(user_email=options['email'])
+        changed = queryset.set_state(state, batch_size=options['batch_size'])
+        self.stdout.write("%s: %d contacts moved to state %d\n" % (
+            model._meta.object_name, changed, state))
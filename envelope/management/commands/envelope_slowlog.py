@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Listing the slowest contact form submissions.
+"""
+
+import datetime
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from envelope import settings
+from envelope.models import SlowSubmission
+
+
+class Command(BaseCommand):
+    help = ("Lists the slowest contact form submissions saved by the slow "
+            "log (requires ENVELOPE_SLOWLOG_DATABASE).")
+    option_list = BaseCommand.option_list + (
+        make_option('--limit', dest='limit', type='int', default=10,
+                    help="Number of submissions shown. Default: %default"),
+        make_option('--days', dest='days', type='int',
+                    help="Only show submissions from the given number of "
+                         "recent days."),
+        make_option('--clear', dest='clear', action='store_true', default=False,
+                    help="Delete the saved submissions (only those older than "
+                         "--days, if given) instead of listing them."),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            raise CommandError("This command takes no arguments.")
+        if not settings.SLOWLOG_DATABASE:
+            raise CommandError("Slow submissions are only kept in the memory "
+                               "of each process. Set ENVELOPE_SLOWLOG_DATABASE "
+                               "= True to save them.")
+        if options['limit'] < 1:
+            raise CommandError("--limit must be a positive number.")
+
+        queryset = SlowSubmission.objects.all()
+        if options['days'] is not None:
+            since = timezone.now() - datetime.timedelta(days=options['days'])
+            if options['clear']:
+                queryset = queryset.filter(created__lt=since)
+            else:
+                queryset = queryset.filter(created__gte=since)
+        if options['clear']:
+            count = queryset.count()
+            queryset.delete()
+            self.stdout.write("Deleted %d slow submissions.\n" % count)
+            return
+
+        for submission in queryset.order_by('-duration')[:options['limit']]:
+            self.stdout.write("%.1f ms  %s  %s  %s (%d chars, %d recipients)\n" % (
+                submission.duration, submission.created.isoformat(),
+                submission.path, submission.outcome or '-',
+                submission.message_size, submission.recipients))
+            stages = sorted(submission.get_stages().items(),
+                            key=lambda item: item[1], reverse=True)
+            self.stdout.write("    %s\n" % ', '.join(
+                '%s %.1f ms' % stage for stage in stages))
+            if submission.receivers:
+                self.stdout.write("    receivers: %s\n" % submission.receivers)
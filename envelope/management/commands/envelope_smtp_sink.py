@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Running the local SMTP sink server.
+"""
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand, CommandError
+
+from envelope.smtp_sink import SMTPSinkServer
+
+
+class Command(BaseCommand):
+    help = ("Runs a local SMTP server which discards all messages, with "
+            "optional latency and injected failures. Point EMAIL_HOST and "
+            "EMAIL_PORT at it.")
+    option_list = BaseCommand.option_list + (
+        make_option('--host', dest='host', default='127.0.0.1',
+                    help="Address to listen on. Default: %default"),
+        make_option('--port', dest='port', type='int', default=1025,
+                    help="Port to listen on. Default: %default"),
+        make_option('--delay', dest='delay', type='float', default=0,
+                    help="Milliseconds to wait before every reply. "
+                         "Default: %default"),
+        make_option('--failure-rate', dest='failure_rate', type='float',
+                    default=0,
+                    help="Fraction of MAIL, RCPT and DATA commands answered "
+                         "with a temporary failure. Default: %default"),
+        make_option('--drop-rate', dest='drop_rate', type='float', default=0,
+                    help="Fraction of commands answered by closing the "
+                         "connection. Default: %default"),
+    )
+
+    def handle(self, *args, **options):
+        if args:
+            raise CommandError("This command takes no arguments.")
+        for name in ('failure_rate', 'drop_rate'):
+            if not 0 <= options[name] <= 1:
+                raise CommandError("--%s must be between 0 and 1." %
+                                   name.replace('_', '-'))
+        self.verbosity = int(options['verbosity'])
+        server = SMTPSinkServer((options['host'], options['port']),
+                                delay=options['delay'] / 1000.0,
+                                failure_rate=options['failure_rate'],
+                                drop_rate=options['drop_rate'],
+                                on_message=self.report_message)
+        self.stdout.write("SMTP sink listening on %s:%d, quit with CONTROL-C.\n" %
+                          server.server_address)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        self.stdout.write("\n%s\n" % ', '.join(
+            '%s %d' % item for item in sorted(server.stats.items())))
+
+    def report_message(self, mail_from, recipients, size):
+        if self.verbosity >= 2:
+            self.stdout.write("%s -> %s (%d bytes)\n" % (
+                mail_from, ', '.join(recipients), size))
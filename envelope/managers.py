@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Querysets and managers of the contact models.
+"""
+
+import base64
+from collections import defaultdict
+
+from django.db import models, router
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from envelope.utils import atomic, has_field
+
+# Foreign keys of the contact models worth fetching together with them.
+RELATED_FIELDS = ('created_by', 'updated_by', 'company')
+
+PENDING = 2
+
+
+def encode_cursor(obj):
+    """
+    Returns an opaque cursor pointing at the given contact.
+    """
+    value = '%s|%s' % (obj.created.isoformat(), obj.pk)
+    return base64.urlsafe_b64encode(value.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Returns the ``(created, pk)`` pair stored in a cursor. Raises
+    ``ValueError`` if the cursor is malformed.
+    """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        created, pk = value.split('|')
+        created = parse_datetime(created)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError("Invalid cursor: %r" % cursor)
+    if created is None:
+        raise ValueError("Invalid cursor: %r" % cursor)
+    return created, pk
+
+
+class ContactQuerySet(models.query.QuerySet):
+    """
+    Queryset with the lookups used by contact inboxes.
+    """
+
+    def pending(self):
+        return self.filter(state=PENDING)
+
+    def for_company(self, company):
+        return self.filter(company=company)
+
+    def with_related(self):
+        """
+        Fetches the user and company foreign keys in the same query.
+        """
+        related = [name for name in RELATED_FIELDS
+                   if has_field(self.model, name)]
+        return self.select_related(*related)
+
+    def newest_first(self):
+        return self.order_by('-created', '-pk')
+
+    def page(self, cursor=None, limit=50):
+        """
+        Returns a list of at most ``limit`` contacts, newest first, created
+        before the one the cursor points at, and the cursor for the next
+        page (``None`` on the last page).
+
+        Unlike offset pagination, every page costs the same, and no
+        ``COUNT(*)`` is needed.
+        """
+        queryset = self.newest_first()
+        if cursor:
+            created, pk = decode_cursor(cursor)
+            queryset = queryset.filter(Q(created__lt=created) |
+                                       Q(created=created, pk__lt=pk))
+        objects = list(queryset[:limit + 1])
+        if len(objects) > limit:
+            return objects[:limit], encode_cursor(objects[limit - 1])
+        return objects, None
+
+    def set_state(self, state, user=None, batch_size=1000):
+        """
+        Moves all contacts of the queryset to ``state`` and returns the
+        number of changed contacts.
+
+        Instead of saving each contact, one ``UPDATE`` of ``state``,
+        ``updated`` and ``updated_by`` is issued per ``batch_size``
+        contacts, each batch in its own transaction. Everything is read
+        from the database written to, as a replica may lag behind. Each
+        batch is locked (``SELECT ... FOR UPDATE`` where supported) and
+        the queryset's filters are applied again, so contacts changed in
+        the meantime are skipped and pending counters are adjusted from
+        the current states. A single
+        :data:`~envelope.signals.state_changed` signal with the primary
+        keys of the changed contacts is sent at the end
+        (``pre_save``/``post_save`` are not sent).
+        """
+        from envelope import counters, routers, signals
+        model = self.model
+        using = self._db or router.db_for_write(model)
+        fields = ['pk', 'state']
+        if has_field(model, 'company'):
+            fields.append('company')
+        queryset = self.using(using).exclude(state=state).order_by('pk')
+        now = timezone.now()
+        changed = []
+        last_pk = None
+        while True:
+            batch = queryset
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+            pks = list(batch.values_list('pk', flat=True)[:batch_size])
+            if not pks:
+                break
+            with atomic(using=using):
+                rows = list(queryset.filter(pk__in=pks).select_for_update()
+                            .values_list(*fields))
+                affected = [row[0] for row in rows]
+                # pending contacts leave the counter, or all of them join it
+                deltas = defaultdict(int)
+                for row in rows:
+                    company_id = row[2] if len(row) > 2 else None
+                    if state == PENDING:
+                        deltas[company_id] += 1
+                    elif row[1] == PENDING:
+                        deltas[company_id] -= 1
+                values = {'state': state, 'updated': now}
+                if user is not None:
+                    values['updated_by'] = user
+                if affected:
+                    queryset.filter(pk__in=affected).update(**values)
+                for company_id, delta in deltas.items():
+                    if delta:
+                        counters.adjust_pending_count(model, company_id,
+                                                      delta, using)
+            changed.extend(affected)
+            last_pk = pks[-1]
+        if changed:
+            routers.pin_after_write(model)
+            signals.state_changed.send(sender=model, state=state,
+                                       count=len(changed), pks=changed,
+                                       user=user)
+        return len(changed)
+
+
+class ContactManager(models.Manager):
+    """
+    Default manager of the contact models.
+    """
+
+    def get_queryset(self):
+        return ContactQuerySet(self.model, using=self._db)
+
+    # Django 1.4 and 1.5
+    get_query_set = get_queryset
+
+    def pending(self):
+        return self.get_queryset().pending()
+
+    def for_company(self, company):
+        return self.get_queryset().for_company(company)
+
+    def with_related(self):
+        return self.get_queryset().with_related()
+
+    def newest_first(self):
+        return self.get_queryset().newest_first()
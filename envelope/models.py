@@ -1,8 +1,15 @@
+import json
+
+import django
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import (class_prepared, post_delete, post_init,
+                                      post_save)
 from django.utils.translation import ugettext_lazy as _
 
 from .constants import STATE_TYPES
+from .managers import ContactManager
 
 
 class BaseContact(models.Model):
@@ -36,5 +43,118 @@ class BaseContact(models.Model):
     )
     user_email = models.EmailField(verbose_name=_('Email'))
 
+    objects = ContactManager()
+
     class Meta:
         abstract = True
+        # Indexes for the most common lookups: pending contacts newest first
+        # and all contacts from a given address. Subclasses which define
+        # their own Meta should inherit from BaseContact.Meta to keep them.
+        if django.VERSION >= (1, 5):
+            index_together = [
+                ('state', 'created'),
+                ('user_email', 'created'),
+            ]
+
+
+class ContactSearchTerm(models.Model):
+    """
+    A word from the subject or message of a contact record, used by the
+    built-in full-text search (see :mod:`envelope.search`).
+    """
+    content_type = models.ForeignKey(ContentType)
+    object_id = models.PositiveIntegerField()
+    term = models.CharField(max_length=64)
+
+    class Meta:
+        if django.VERSION >= (1, 5):
+            index_together = [
+                ('term', 'content_type', 'object_id'),
+                ('content_type', 'object_id'),
+            ]
+
+
+class PendingContactCounter(models.Model):
+    """
+    Number of pending contacts of a contact model, per company (see
+    :mod:`envelope.counters`). Models without a company are counted with
+    ``company_id`` set to 0.
+    """
+    content_type = models.ForeignKey(ContentType)
+    company_id = models.PositiveIntegerField(default=0)
+    pending = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('content_type', 'company_id')
+
+
+class SlowSubmission(models.Model):
+    """
+    A contact form submission which took longer than
+    ``ENVELOPE_SLOWLOG_THRESHOLD`` (see :mod:`envelope.slowlog`).
+    Durations are in milliseconds.
+    """
+    created = models.DateTimeField(db_index=True)
+    path = models.CharField(max_length=255)
+    duration = models.FloatField(db_index=True)
+    # stage durations as a JSON object
+    stages = models.TextField()
+    # comma-separated names of the before_send receivers
+    receivers = models.TextField(blank=True)
+    message_size = models.PositiveIntegerField(default=0)
+    recipients = models.PositiveIntegerField(default=0)
+    outcome = models.CharField(max_length=16, blank=True)
+
+    class Meta:
+        ordering = ('-duration',)
+
+    def get_stages(self):
+        return json.loads(self.stages or '{}')
+
+
+from envelope.counters import (count_deleted_contact, count_saved_contact,
+                               remember_state)
+from envelope.routers import pin_after_write
+from envelope.search import remove_from_search_index, update_search_index
+
+# Receivers of model signals of the contact models, connected to each
+# concrete subclass of BaseContact so that saving other models doesn't
+# call them.
+CONTACT_RECEIVERS = (
+    (post_save, update_search_index),
+    (post_delete, remove_from_search_index),
+    (post_init, remember_state),
+    (post_save, count_saved_contact),
+    (post_delete, count_deleted_contact),
+    (post_save, pin_after_write),
+    (post_delete, pin_after_write),
+)
+
+
+def _dispatch_uid(receiver):
+    return '%s.%s' % (receiver.__module__, receiver.__name__)
+
+
+def connect_contact_receivers(sender, **kwargs):
+    """
+    Connects ``CONTACT_RECEIVERS`` to a newly defined contact model. Deferred
+    classes (created by ``only()`` and ``defer()`` before Django 1.10) are
+    the senders of their instances' signals, so they are connected too.
+    """
+    if issubclass(sender, BaseContact) and not sender._meta.abstract:
+        for signal, receiver in CONTACT_RECEIVERS:
+            signal.connect(receiver, sender=sender,
+                           dispatch_uid=_dispatch_uid(receiver))
+
+class_prepared.connect(connect_contact_receivers,
+                       dispatch_uid='envelope.models.connect_contact_receivers')
+
+# search terms and counters are read from the replica too
+post_save.connect(pin_after_write, sender=ContactSearchTerm,
+                  dispatch_uid=_dispatch_uid(pin_after_write))
+post_delete.connect(pin_after_write, sender=ContactSearchTerm,
+                    dispatch_uid=_dispatch_uid(pin_after_write))
+post_save.connect(pin_after_write, sender=PendingContactCounter,
+                  dispatch_uid=_dispatch_uid(pin_after_write))
+post_delete.connect(pin_after_write, sender=PendingContactCounter,
+                    dispatch_uid=_dispatch_uid(pin_after_write))
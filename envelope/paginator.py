@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Paginators for very large contact tables.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator which avoids ``COUNT(*)`` over a whole table.
+
+    When the queryset is unfiltered and the database keeps table statistics
+    (PostgreSQL and MySQL), the row count is read from those statistics
+    instead of being computed. Filtered querysets, small tables and other
+    databases fall back to an exact count.
+
+    ``estimate_threshold``
+        Estimates below this value are replaced with an exact count, which
+        is cheap for small tables and keeps the last page accurate.
+    """
+    estimate_threshold = 10000
+
+    def __init__(self, *args, **kwargs):
+        super(EstimatedCountPaginator, self).__init__(*args, **kwargs)
+        self._estimated_count = None
+
+    @property
+    def count(self):
+        if self._estimated_count is None:
+            estimate = self.get_estimate()
+            if estimate is not None and estimate >= self.estimate_threshold:
+                self._estimated_count = estimate
+            else:
+                self._estimated_count = super(EstimatedCountPaginator, self).count
+        return self._estimated_count
+
+    def get_estimate(self):
+        """
+        Returns the estimated number of rows in the table, or ``None`` if no
+        estimate is available.
+        """
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None or query.where:
+            return None
+        connection = connections[queryset.db]
+        table = queryset.model._meta.db_table
+        cursor = connection.cursor()
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s",
+                           [table])
+            row = cursor.fetchone()
+            return int(row[0]) if row else None
+        elif connection.vendor == 'mysql':
+            cursor.execute("SHOW TABLE STATUS LIKE %s", [table])
+            row = cursor.fetchone()
+            return int(row[4]) if row and row[4] is not None else None
+        return None
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+On-demand profiling of contact form submissions.
+
+A submission is profiled when it is picked by sampling
+(``ENVELOPE_PROFILING_SAMPLE_RATE``) or carries a valid signed token in the
+``ENVELOPE_PROFILING_HEADER`` header. Every stage measured by its
+:class:`~envelope.instrumentation.StageTimer` then runs under its own
+``cProfile`` profiler, and the most expensive functions of each stage are
+stored in a ring buffer in the Django cache, where the
+``envelope_profile_dump`` management command can read them.
+"""
+
+import cProfile
+import pstats
+import random
+import time
+from contextlib import contextmanager
+
+from django.core import signing
+
+from envelope import settings
+from envelope.instrumentation import StageTimer
+
+SIGNING_SALT = 'envelope.profiling'
+CACHE_PREFIX = 'envelope:profile:'
+# profiles older than a week are of little use
+CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def get_cache():
+    # imported here, importing the cache module on Django < 1.7 requires
+    # configured settings
+    try:
+        # Django 1.7+
+        from django.core.cache import caches
+    except ImportError:  # pragma: no cover
+        from django.core.cache import get_cache
+        return get_cache(settings.PROFILING_CACHE)
+    return caches[settings.PROFILING_CACHE]
+
+
+def make_token():
+    """
+    Returns a signed value for the profiling header, valid for
+    ``ENVELOPE_PROFILING_TOKEN_MAX_AGE`` seconds.
+    """
+    return signing.TimestampSigner(salt=SIGNING_SALT).sign('profile')
+
+
+def has_valid_token(request):
+    header = 'HTTP_' + settings.PROFILING_HEADER.upper().replace('-', '_')
+    token = request.META.get(header)
+    if not token:
+        return False
+    try:
+        signing.TimestampSigner(salt=SIGNING_SALT).unsign(
+            token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def should_profile(request):
+    """
+    Checks whether the request is picked by sampling or carries a valid
+    profiling token.
+    """
+    rate = settings.PROFILING_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return True
+    return bool(settings.PROFILING_HEADER) and has_valid_token(request)
+
+
+def get_stage_timer(request):
+    """
+    Returns a :class:`ProfilingStageTimer` if the request should be
+    profiled, and a plain :class:`~envelope.instrumentation.StageTimer`
+    otherwise.
+    """
+    if should_profile(request):
+        return ProfilingStageTimer()
+    return StageTimer()
+
+
+def summarize(profile, limit):
+    """
+    Returns the ``limit`` functions with the highest cumulative time in a
+    profile, as ``(function, calls, total time, cumulative time, callers)``
+    tuples; ``callers`` names the functions which called it.
+    """
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [(pstats.func_std_string(func), calls, tottime, cumtime,
+             [pstats.func_std_string(caller) for caller in callers])
+            for func, (primitive, calls, tottime, cumtime, callers) in rows[:limit]]
+
+
+class ProfilingStageTimer(StageTimer):
+    """
+    Stage timer which runs every stage under ``cProfile``.
+
+    ``profiles`` is a list of ``(name, seconds, top functions)`` tuples,
+    see :func:`summarize`.
+    """
+
+    def __init__(self):
+        super(ProfilingStageTimer, self).__init__()
+        self.profiles = []
+
+    @contextmanager
+    def stage(self, name):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            with super(ProfilingStageTimer, self).stage(name) as span:
+                yield span
+        finally:
+            profile.disable()
+            self.profiles.append((name, self.stages[-1][1],
+                                  summarize(profile, settings.PROFILING_TOP)))
+
+    def save(self, path=''):
+        store_profile({
+            'time': time.time(),
+            'path': path,
+            'total': self.total,
+            'stages': self.profiles,
+        })
+
+
+def store_profile(entry):
+    """
+    Adds a profile to the ring buffer, overwriting the oldest one once
+    ``ENVELOPE_PROFILING_BUFFER_SIZE`` profiles are stored.
+    """
+    cache = get_cache()
+    counter_key = CACHE_PREFIX + 'counter'
+    cache.add(counter_key, 0, CACHE_TIMEOUT)
+    try:
+        number = cache.incr(counter_key)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(counter_key, 1, CACHE_TIMEOUT)
+        number = 1
+    slot = number % settings.PROFILING_BUFFER_SIZE
+    cache.set('%s%d' % (CACHE_PREFIX, slot), entry, CACHE_TIMEOUT)
+
+
+def get_profiles():
+    """
+    Returns the stored profiles, oldest first.
+    """
+    keys = ['%s%d' % (CACHE_PREFIX, slot)
+            for slot in range(settings.PROFILING_BUFFER_SIZE)]
+    entries = get_cache().get_many(keys).values()
+    return sorted(entries, key=lambda entry: entry['time'])
+
+
+def clear_profiles():
+    get_cache().delete_many(
+        [CACHE_PREFIX + 'counter'] +
+        ['%s%d' % (CACHE_PREFIX, slot)
+         for slot in range(settings.PROFILING_BUFFER_SIZE)])
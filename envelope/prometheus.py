@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Add ``'envelope.prometheus.PrometheusMetricsBackend'`` to
+``ENVELOPE_METRICS_BACKENDS`` to collect the metrics, and set
+``ENVELOPE_PROMETHEUS_ENDPOINT = True`` to serve them at ``metrics/`` under
+the URL where ``envelope.urls`` is included.
+
+With several worker processes (for example a preforking server), set
+``ENVELOPE_PROMETHEUS_DIR`` to a directory shared by the workers: each of
+them periodically writes its metrics there and the endpoint serves the sum.
+Call :func:`mark_process_dead` when a worker exits, so that the directory
+doesn't keep a file for every worker that ever ran.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils import six
+
+from envelope import settings
+from envelope.instrumentation import BaseMetricsBackend
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+STAGE_HISTOGRAM = 'envelope_stage_duration_seconds'
+
+
+def _labels_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _metric_name(name):
+    return name.replace('.', '_').replace('-', '_')
+
+
+def _escape(value):
+    return six.text_type(value).replace('\\', '\\\\').replace(
+        '"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join('%s="%s"' % (key, _escape(value))
+                             for key, value in pairs)
+
+
+class Registry(object):
+    """
+    Thread-safe store of counters and histograms.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, labels=None):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        key = (name, _labels_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def snapshot(self):
+        """
+        Returns the metrics as a JSON-serializable dictionary.
+        """
+        with self.lock:
+            return {
+                'buckets': list(self.buckets),
+                'counters': [[name, list(map(list, labels)), value]
+                             for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(map(list, labels)), list(h[0]), h[1], h[2]]
+                               for (name, labels), h in self.histograms.items()],
+            }
+
+    def merge(self, snapshot):
+        """
+        Adds the metrics of a snapshot to this registry.
+        """
+        if tuple(snapshot['buckets']) != self.buckets:
+            return
+        with self.lock:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, counts, total, count in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                histogram = self.histograms.setdefault(
+                    key, [[0] * len(self.buckets), 0.0, 0])
+                histogram[0] = [a + b for a, b in zip(histogram[0], counts)]
+                histogram[1] += total
+                histogram[2] += count
+
+    def render(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        with self.lock:
+            for name in sorted(set(name for name, labels in self.counters)):
+                lines.append('# TYPE %s counter' % name)
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append('%s%s %s' % (name, _format_labels(labels), value))
+            for name in sorted(set(name for name, labels in self.histograms)):
+                lines.append('# TYPE %s histogram' % name)
+                for (metric, labels), (counts, total, count) in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, bucket_count in zip(self.buckets, counts):
+                        lines.append('%s_bucket%s %s' % (
+                            name, _format_labels(labels, [('le', repr(bound))]), bucket_count))
+                    lines.append('%s_bucket%s %s' % (
+                        name, _format_labels(labels, [('le', '+Inf')]), count))
+                    lines.append('%s_sum%s %r' % (name, _format_labels(labels), total))
+                    lines.append('%s_count%s %s' % (name, _format_labels(labels), count))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+_last_write = [0]
+
+
+def write_snapshot(directory=None):
+    """
+    Writes the metrics of this process to the shared directory.
+    """
+    directory = directory or settings.PROMETHEUS_DIR
+    if not directory:
+        return
+    path = os.path.join(directory, 'envelope_%d.json' % os.getpid())
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(registry.snapshot(), f)
+    os.rename(tmp_path, path)
+    _last_write[0] = time.time()
+
+
+def _maybe_write_snapshot():
+    if settings.PROMETHEUS_DIR and \
+            time.time() - _last_write[0] >= settings.PROMETHEUS_WRITE_INTERVAL:
+        write_snapshot()
+
+
+atexit.register(write_snapshot)
+
+
+def mark_process_dead(pid, directory=None):
+    """
+    Folds the metrics file of an exited worker process into
+    ``envelope_dead.json`` and removes it, so that the totals keep counting
+    while the number of files stays bounded. Meant to be called from the
+    server's worker exit hook, such as gunicorn's ``child_exit``; calls are
+    not safe to run concurrently for the same directory.
+    """
+    directory = directory or settings.PROMETHEUS_DIR
+    if not directory:
+        return
+    path = os.path.join(directory, 'envelope_%d.json' % pid)
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except IOError:
+        return
+    except ValueError:
+        # a partial write; the counts are lost either way
+        os.remove(path)
+        return
+    dead = Registry(snapshot['buckets'])
+    dead_path = os.path.join(directory, 'envelope_dead.json')
+    try:
+        with open(dead_path) as f:
+            dead.merge(json.load(f))
+    except (IOError, ValueError):
+        pass
+    dead.merge(snapshot)
+    tmp_path = dead_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(dead.snapshot(), f)
+    os.rename(tmp_path, dead_path)
+    os.remove(path)
+
+
+def collect():
+    """
+    Returns the text exposition of the metrics of this process, or of all
+    processes when ``ENVELOPE_PROMETHEUS_DIR`` is set.
+    """
+    if not settings.PROMETHEUS_DIR:
+        return registry.render()
+    write_snapshot()
+    combined = Registry(registry.buckets)
+    for path in glob.glob(os.path.join(settings.PROMETHEUS_DIR, 'envelope_*.json')):
+        try:
+            with open(path) as f:
+                combined.merge(json.load(f))
+        except (IOError, ValueError):
+            continue
+    return combined.render()
+
+
+class PrometheusMetricsBackend(BaseMetricsBackend):
+    """
+    Metrics backend collecting stage timings into a histogram and counters
+    into Prometheus counters.
+    """
+
+    def timing(self, name, milliseconds, tags=None):
+        labels = dict(tags or {}, stage=name.split('.', 1)[-1])
+        registry.observe(STAGE_HISTOGRAM, milliseconds / 1000.0, labels)
+        _maybe_write_snapshot()
+
+    def increment(self, name, value=1, tags=None):
+        registry.inc(_metric_name(name) + '_total', value, tags)
+        _maybe_write_snapshot()
+
+
+def metrics_view(request):
+    """
+    Serves the metrics in the Prometheus text format.
+    """
+    allowed = settings.PROMETHEUS_ALLOWED_IPS
+    if allowed is not None and request.META.get('REMOTE_ADDR') not in allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(collect(), content_type=CONTENT_TYPE)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Routing of contact reads to a database replica.
+
+Add the router and the middleware to your settings::
+
+    DATABASE_ROUTERS = ['envelope.routers.ContactReplicaRouter']
+    MIDDLEWARE_CLASSES += ('envelope.routers.ReplicaPinningMiddleware',)
+    ENVELOPE_REPLICA_DATABASE = 'replica'
+
+Reads of contact records, search terms and counters go to the replica,
+except for ``ENVELOPE_REPLICA_PIN_SECONDS`` after the current thread (or,
+with the middleware, the current client) wrote any of them, so that users
+see their own changes despite replication lag. Writes are not routed and
+go to the default database.
+"""
+
+import math
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS
+
+from envelope import settings
+
+PIN_COOKIE_NAME = 'envelope_pin'
+
+_state = threading.local()
+
+
+def is_routed_model(model):
+    from envelope.models import (BaseContact, ContactSearchTerm,
+                                 PendingContactCounter)
+    return issubclass(model, (BaseContact, ContactSearchTerm,
+                              PendingContactCounter))
+
+
+def pin_to_primary(seconds=None):
+    """
+    Sends reads of the current thread to the primary database for the
+    next ``seconds`` (``ENVELOPE_REPLICA_PIN_SECONDS`` by default).
+    """
+    if seconds is None:
+        seconds = settings.REPLICA_PIN_SECONDS
+    _state.pinned_until = time.time() + seconds
+    _state.wrote = True
+
+
+def is_pinned():
+    return getattr(_state, 'pinned_until', 0) > time.time()
+
+
+def get_read_database():
+    """
+    Returns the alias of the database contact reads should go to, or
+    ``None`` for the default one.
+    """
+    if settings.REPLICA_DATABASE and not is_pinned():
+        return settings.REPLICA_DATABASE
+    return None
+
+
+def using_replica(queryset):
+    """
+    Runs a queryset of any model on the replica, unless reads are pinned
+    to the primary. Useful without the router, or for other models.
+    """
+    alias = get_read_database()
+    return queryset.using(alias) if alias else queryset
+
+
+class ContactReplicaRouter(object):
+    """
+    Database router sending reads of envelope models to
+    ``ENVELOPE_REPLICA_DATABASE`` and their writes to the default database,
+    allowing relations between objects of the two.
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_routed_model(model):
+            return get_read_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        # instances read from the replica are saved on the primary
+        if is_routed_model(model):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = (DEFAULT_DB_ALIAS, settings.REPLICA_DATABASE)
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaPinningMiddleware(object):
+    """
+    Keeps reads of a client on the primary database for a while after one
+    of its requests wrote contact records, using a cookie.
+    """
+
+    def process_request(self, request):
+        _state.wrote = False
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE_NAME, 0))
+        except (TypeError, ValueError):
+            pinned_until = 0
+        if math.isnan(pinned_until) or math.isinf(pinned_until):
+            pinned_until = 0
+        # the cookie comes from the client, which must not be able to pin
+        # its reads for longer than a write of its own would
+        _state.pinned_until = min(pinned_until,
+                                  time.time() + settings.REPLICA_PIN_SECONDS)
+
+    def process_response(self, request, response):
+        if getattr(_state, 'wrote', False):
+            response.set_cookie(PIN_COOKIE_NAME, str(_state.pinned_until),
+                                max_age=int(settings.REPLICA_PIN_SECONDS) + 1,
+                                httponly=True)
+        _state.wrote = False
+        _state.pinned_until = 0
+        return response
+
+
+def pin_after_write(sender, **kwargs):
+    """
+    Signal receiver pinning reads to the primary after a write. Connected
+    to the routed models only, see
+    :func:`envelope.models.connect_contact_receivers`.
+    """
+    if settings.REPLICA_DATABASE:
+        pin_to_primary()
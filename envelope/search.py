@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Full-text search over the subject and message of contact records.
+
+Three backends are available:
+
+* ``postgres`` - a GIN index over ``to_tsvector()`` of the searched columns,
+* ``sqlite`` - an FTS5 table kept up to date by triggers,
+* ``inverted`` - a built-in inverted index (the
+  :class:`~envelope.models.ContactSearchTerm` model) updated when a contact
+  is saved, which works on any database.
+
+Native indexes are created with the ``envelope_search_index`` management
+command. Until that happens, the ``auto`` backend falls back to the
+inverted index.
+"""
+
+import re
+from contextlib import contextmanager
+
+from django.db import connections, router, transaction
+
+try:
+    # Django 1.8+
+    from django.core.signals import setting_changed
+except ImportError:  # pragma: no cover
+    setting_changed = None
+
+try:
+    from django.utils.encoding import force_text
+except ImportError:  # pragma: no cover
+    # Django 1.4
+    from django.utils.encoding import force_unicode as force_text
+
+from envelope import settings
+from envelope.utils import atomic, has_field, iter_keyset
+
+SEARCH_FIELDS = ('subject', 'message_box')
+
+TERM_RE = re.compile(r'\w{2,}', re.UNICODE)
+
+TERM_MAX_LENGTH = 64
+
+
+def tokenize(text):
+    """
+    Returns a set of lowercase search terms found in the text.
+    """
+    return set(term[:TERM_MAX_LENGTH]
+               for term in TERM_RE.findall(force_text(text or '').lower()))
+
+
+def get_search_fields(model):
+    return [name for name in SEARCH_FIELDS if has_field(model, name)]
+
+
+def _columns(model, connection):
+    qn = connection.ops.quote_name
+    return [qn(model._meta.get_field(name).column)
+            for name in get_search_fields(model)]
+
+
+class BaseSearchBackend(object):
+    """
+    Interface of the search backends.
+    """
+
+    def is_installed(self, model, using):
+        """
+        Returns ``True`` if the index for the model exists.
+        """
+        return True
+
+    def install(self, model, using):
+        """
+        Creates the index for the model and fills it with existing rows.
+        """
+        self.rebuild(model, using)
+
+    def rebuild(self, model, using):
+        """
+        Rebuilds the index from the contents of the table.
+        """
+
+    def filter(self, queryset, query):
+        """
+        Narrows the queryset down to contacts matching all words of the
+        query.
+        """
+        raise NotImplementedError
+
+    def update(self, instance):
+        """
+        Called after a contact has been saved.
+        """
+
+    def remove(self, instance):
+        """
+        Called after a contact has been deleted.
+        """
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Uses a GIN index on the ``to_tsvector()`` of the searched columns.
+    """
+    config = 'simple'
+
+    def get_index_name(self, model):
+        return '%s_fts' % model._meta.db_table
+
+    def get_document(self, model, connection):
+        return "to_tsvector('%s', %s)" % (self.config, " || ' ' || ".join(
+            "coalesce(%s, '')" % column
+            for column in _columns(model, connection)))
+
+    def is_installed(self, model, using):
+        cursor = connections[using].cursor()
+        cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s",
+                       [self.get_index_name(model)])
+        return cursor.fetchone() is not None
+
+    def install(self, model, using):
+        """
+        Builds the index without locking out writes to the table. This
+        commits the current transaction and can't be done inside
+        ``atomic()``.
+        """
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        with _autocommit(connection):
+            connection.cursor().execute(
+                'CREATE INDEX CONCURRENTLY %s ON %s USING gin (%s)' % (
+                    qn(self.get_index_name(model)), qn(model._meta.db_table),
+                    self.get_document(model, connection)))
+        clear_backend_cache()
+
+    def rebuild(self, model, using):
+        connection = connections[using]
+        connection.cursor().execute('REINDEX INDEX %s' % connection.ops.quote_name(
+            self.get_index_name(model)))
+
+    def filter(self, queryset, query):
+        connection = connections[queryset.db]
+        # the expression has to match the indexed one exactly
+        where = "%s @@ plainto_tsquery('%s', %%s)" % (
+            self.get_document(queryset.model, connection), self.config)
+        return queryset.extra(where=[where], params=[query])
+
+
+class SqliteSearchBackend(BaseSearchBackend):
+    """
+    Uses an external content FTS5 table kept in sync with triggers.
+    """
+
+    def get_table_name(self, model):
+        return '%s_fts' % model._meta.db_table
+
+    def is_installed(self, model, using):
+        connection = connections[using]
+        return self.get_table_name(model) in connection.introspection.table_names()
+
+    def install(self, model, using):
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        table = qn(model._meta.db_table)
+        fts = qn(self.get_table_name(model))
+        pk = qn(model._meta.pk.column)
+        columns = _columns(model, connection)
+        names = ', '.join(columns)
+        new = ', '.join('new.%s' % column for column in columns)
+        old = ', '.join('old.%s' % column for column in columns)
+        statements = [
+            "CREATE VIRTUAL TABLE %s USING fts5(%s, content=%s, content_rowid=%s)"
+            % (fts, names, table, pk),
+            "CREATE TRIGGER %s AFTER INSERT ON %s BEGIN "
+            "INSERT INTO %s(rowid, %s) VALUES (new.%s, %s); END"
+            % (qn(self.get_table_name(model) + '_ai'), table, fts, names, pk, new),
+            "CREATE TRIGGER %s AFTER DELETE ON %s BEGIN "
+            "INSERT INTO %s(%s, rowid, %s) VALUES ('delete', old.%s, %s); END"
+            % (qn(self.get_table_name(model) + '_ad'), table, fts, fts, names, pk, old),
+            "CREATE TRIGGER %s AFTER UPDATE ON %s BEGIN "
+            "INSERT INTO %s(%s, rowid, %s) VALUES ('delete', old.%s, %s); "
+            "INSERT INTO %s(rowid, %s) VALUES (new.%s, %s); END"
+            % (qn(self.get_table_name(model) + '_au'), table, fts, fts, names, pk, old,
+               fts, names, pk, new),
+        ]
+        with atomic(using=using):
+            cursor = connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+        self.rebuild(model, using)
+        clear_backend_cache()
+
+    def rebuild(self, model, using):
+        connection = connections[using]
+        fts = connection.ops.quote_name(self.get_table_name(model))
+        connection.cursor().execute(
+            "INSERT INTO %s(%s) VALUES ('rebuild')" % (fts, fts))
+
+    def filter(self, queryset, query):
+        terms = tokenize(query)
+        if not terms:
+            return queryset
+        connection = connections[queryset.db]
+        qn = connection.ops.quote_name
+        fts = qn(self.get_table_name(queryset.model))
+        where = '%s.%s IN (SELECT rowid FROM %s WHERE %s MATCH %%s)' % (
+            qn(queryset.model._meta.db_table),
+            qn(queryset.model._meta.pk.column), fts, fts)
+        match = ' '.join('"%s"' % term for term in sorted(terms))
+        return queryset.extra(where=[where], params=[match])
+
+
+class InvertedIndexSearchBackend(BaseSearchBackend):
+    """
+    Stores every word of a contact as a
+    :class:`~envelope.models.ContactSearchTerm` row.
+    """
+
+    def _get_content_type(self, model):
+        from django.contrib.contenttypes.models import ContentType
+        return ContentType.objects.get_for_model(model)
+
+    def _terms(self, instance):
+        return tokenize(' '.join(force_text(getattr(instance, name) or '')
+                                 for name in get_search_fields(type(instance))))
+
+    def _make_terms(self, instance, content_type):
+        from envelope.models import ContactSearchTerm
+        return [ContactSearchTerm(content_type=content_type,
+                                  object_id=instance.pk, term=term)
+                for term in self._terms(instance)]
+
+    def rebuild(self, model, using):
+        from envelope.models import ContactSearchTerm
+        content_type = self._get_content_type(model)
+        ContactSearchTerm.objects.using(using).filter(
+            content_type=content_type).delete()
+        queryset = model._default_manager.using(using)
+        for chunk in iter_keyset(queryset):
+            terms = []
+            for instance in chunk:
+                terms.extend(self._make_terms(instance, content_type))
+            with atomic(using=using):
+                ContactSearchTerm.objects.using(using).bulk_create(terms)
+
+    def filter(self, queryset, query):
+        from envelope.models import ContactSearchTerm
+        content_type = self._get_content_type(queryset.model)
+        for term in tokenize(query):
+            # the terms have to be read from the database of the contacts
+            object_ids = ContactSearchTerm.objects.using(queryset.db).filter(
+                content_type=content_type, term=term).values('object_id')
+            queryset = queryset.filter(pk__in=object_ids)
+        return queryset
+
+    def update(self, instance):
+        from envelope.models import ContactSearchTerm
+        using = instance._state.db
+        content_type = self._get_content_type(type(instance))
+        with atomic(using=using):
+            ContactSearchTerm.objects.using(using).filter(
+                content_type=content_type, object_id=instance.pk).delete()
+            ContactSearchTerm.objects.using(using).bulk_create(
+                self._make_terms(instance, content_type))
+
+    def remove(self, instance):
+        from envelope.models import ContactSearchTerm
+        ContactSearchTerm.objects.using(instance._state.db).filter(
+            content_type=self._get_content_type(type(instance)),
+            object_id=instance.pk).delete()
+
+
+BACKENDS = {
+    'postgres': PostgresSearchBackend(),
+    'sqlite': SqliteSearchBackend(),
+    'inverted': InvertedIndexSearchBackend(),
+}
+
+NATIVE_BACKENDS = {
+    'postgresql': 'postgres',
+    'sqlite': 'sqlite',
+}
+
+_backend_cache = {}
+
+
+def clear_backend_cache(**kwargs):
+    """
+    Forgets the search backends chosen for the contact models, so that a
+    newly installed index is used. Connected to ``setting_changed``.
+    """
+    _backend_cache.clear()
+
+if setting_changed is not None:
+    setting_changed.connect(clear_backend_cache, dispatch_uid='envelope.search')
+
+
+@contextmanager
+def _autocommit(connection):
+    """
+    Runs the block outside of a transaction, as PostgreSQL requires for
+    ``CREATE INDEX CONCURRENTLY``.
+    """
+    if hasattr(connection, 'set_autocommit'):
+        # Django 1.6+
+        if connection.in_atomic_block:
+            raise transaction.TransactionManagementError(
+                "The index can't be created concurrently inside atomic().")
+        autocommit = connection.get_autocommit()
+        connection.set_autocommit(True)
+        try:
+            yield
+        finally:
+            connection.set_autocommit(autocommit)
+    else:  # pragma: no cover
+        # Django 1.4 and 1.5
+        transaction.commit_unless_managed(using=connection.alias)
+        connection.cursor()
+        isolation_level = connection.isolation_level
+        connection._set_isolation_level(0)
+        try:
+            yield
+        finally:
+            connection._set_isolation_level(isolation_level)
+
+
+def get_native_backend(using):
+    """
+    Returns the native search backend for a database, or ``None``.
+    """
+    name = NATIVE_BACKENDS.get(connections[using].vendor)
+    return BACKENDS[name] if name else None
+
+
+def get_search_backend(model, using=None):
+    """
+    Returns the search backend used for a contact model, as configured with
+    ``ENVELOPE_SEARCH_BACKEND``.
+    """
+    using = using or router.db_for_read(model)
+    key = (model, using)
+    if key not in _backend_cache:
+        if settings.SEARCH_BACKEND != 'auto':
+            backend = BACKENDS[settings.SEARCH_BACKEND]
+        else:
+            backend = get_native_backend(using)
+            if backend is None or not backend.is_installed(model, using):
+                backend = BACKENDS['inverted']
+        _backend_cache[key] = backend
+    return _backend_cache[key]
+
+
+def search_contacts(queryset, query):
+    """
+    Returns contacts from the queryset matching all words of the query.
+    """
+    return get_search_backend(queryset.model, queryset.db).filter(queryset, query)
+
+
+def update_search_index(sender, instance, **kwargs):
+    """
+    Keeps the inverted index up to date; native indexes need no help.
+    Connected to the contact models only, see
+    :func:`envelope.models.connect_contact_receivers`.
+    """
+    if not kwargs.get('raw'):
+        get_search_backend(sender, instance._state.db).update(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend(sender, instance._state.db).remove(instance)
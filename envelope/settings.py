@@ -4,11 +4,27 @@ from __future__ import unicode_literals
 
 """
 Defaults and overrides for envelope-related settings.
+
+Every setting is looked up as ``ENVELOPE_<NAME>`` in the project settings
+when it is used, so importing envelope modules neither requires nor
+evaluates configured settings. On Django 1.8+ the values are cached, and
+dropped whenever a setting is changed (for example by
+``override_settings``). Older versions only send that signal from
+``django.test``, which can't be imported before settings are configured,
+so values are looked up on every use there.
 """
 
+import sys
+
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
+try:
+    # Django 1.8+
+    from django.core.signals import setting_changed
+except ImportError:  # pragma: no cover
+    setting_changed = None
+
 
 DEFAULT_CONTACT_CHOICES = (
     ('', _("Choose")),
@@ -16,13 +32,88 @@ DEFAULT_CONTACT_CHOICES = (
     (20, _("Other")),
 )
 
-FROM_EMAIL = settings.DEFAULT_FROM_EMAIL
+DEFAULTS = {
+    'CONTACT_CHOICES': DEFAULT_CONTACT_CHOICES,
+    # [settings.DEFAULT_FROM_EMAIL]
+    'EMAIL_RECIPIENTS': None,
+    'SUBJECT_INTRO': _("Message from contact form: "),
+    'BUFFERED_WRITES': False,
+    'BUFFER_SIZE': 100,
+    'BUFFER_INTERVAL': 1000,
+    'SEARCH_BACKEND': 'auto',
+    'ATTACHMENTS_MAX_COUNT': 5,
+    'ATTACHMENT_MAX_SIZE': 10 * 1024 * 1024,
+    'COMPRESSION_THRESHOLD': 16 * 1024,
+    'COMPRESSION_ALGORITHM': 'zlib',
+    'REPLICA_DATABASE': None,
+    'REPLICA_PIN_SECONDS': 5,
+    'METRICS_BACKENDS': [],
+    'STATSD_HOST': 'localhost',
+    'STATSD_PORT': 8125,
+    'STATSD_PREFIX': '',
+    'PROMETHEUS_ENDPOINT': False,
+    'PROMETHEUS_ALLOWED_IPS': None,
+    'PROMETHEUS_DIR': None,
+    'PROMETHEUS_WRITE_INTERVAL': 1,
+    'PROFILING_SAMPLE_RATE': 0,
+    'PROFILING_HEADER': 'X-Envelope-Profile',
+    'PROFILING_TOKEN_MAX_AGE': 3600,
+    'PROFILING_BUFFER_SIZE': 50,
+    'PROFILING_TOP': 20,
+    'PROFILING_CACHE': 'default',
+    'MAX_MESSAGE_LENGTH': None,
+    'MAX_REQUEST_SIZE': None,
+    'TRACER': 'auto',
+    'SLOWLOG_THRESHOLD': 1000,
+    'SLOWLOG_SIZE': 100,
+    'SLOWLOG_DATABASE': False,
+    'DELIVERY_BACKENDS': {
+        'default': {'BACKEND': 'envelope.delivery.EmailDelivery'},
+    },
+    'DELIVERY_CATEGORIES': {},
+}
+
+
+class EnvelopeSettings(object):
+    """
+    Resolves (and on Django 1.8+ caches) envelope settings on attribute
+    access.
+
+    It replaces this module in ``sys.modules``, so ``settings.NAME`` keeps
+    working wherever ``from envelope import settings`` is used. Other
+    module-level names (such as ``DEFAULT_CONTACT_CHOICES``) are looked up
+    in the module.
+    """
+
+    def __init__(self, module):
+        self.__dict__['_module'] = module
+
+    def __getattr__(self, name):
+        if name == 'FROM_EMAIL':
+            value = settings.DEFAULT_FROM_EMAIL
+        elif name in DEFAULTS:
+            value = getattr(settings, 'ENVELOPE_' + name, DEFAULTS[name])
+            if name == 'EMAIL_RECIPIENTS' and value is None:
+                value = [settings.DEFAULT_FROM_EMAIL]
+        else:
+            return getattr(self._module, name)
+        if setting_changed is not None:
+            self.__dict__[name] = value
+        return value
 
-CONTACT_CHOICES = getattr(settings, 'ENVELOPE_CONTACT_CHOICES',
-                          DEFAULT_CONTACT_CHOICES)
+    def reload(self, **kwargs):
+        """
+        Drops the cached values, so they are looked up again on next use.
+        """
+        for name in list(self.__dict__):
+            if name == 'FROM_EMAIL' or name in DEFAULTS:
+                del self.__dict__[name]
 
-EMAIL_RECIPIENTS = getattr(settings, 'ENVELOPE_EMAIL_RECIPIENTS',
-                           [settings.DEFAULT_FROM_EMAIL])
 
-SUBJECT_INTRO = getattr(settings, 'ENVELOPE_SUBJECT_INTRO',
-                        _("Message from contact form: "))
+_settings = EnvelopeSettings(sys.modules[__name__])
+_settings.__name__ = __name__
+_settings.__file__ = __file__
+_settings.__doc__ = __doc__
+if setting_changed is not None:
+    setting_changed.connect(_settings.reload, dispatch_uid='envelope.settings')
+sys.modules[__name__] = _settings
@@ -10,3 +10,5 @@ from django.dispatch import Signal
 
 before_send = Signal(providing_args=["request", "form"])
 after_send = Signal(providing_args=["message", "form"])
+state_changed = Signal(providing_args=["state", "count", "pks", "user"])
+stage_timed = Signal(providing_args=["stage", "duration"])
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Log of contact form submissions slower than ``ENVELOPE_SLOWLOG_THRESHOLD``
+milliseconds.
+
+The last ``ENVELOPE_SLOWLOG_SIZE`` slow submissions of every process are
+kept in memory; with ``ENVELOPE_SLOWLOG_DATABASE`` they are also saved as
+:class:`~envelope.models.SlowSubmission` records, which the
+``envelope_slowlog`` management command lists.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+
+from django.db import DatabaseError
+from django.utils import timezone
+
+from envelope import settings
+
+logger = logging.getLogger('envelope.slowlog')
+
+# created on first use, when the settings are configured
+_entries = None
+_lock = threading.Lock()
+
+
+def is_slow(duration):
+    """
+    Checks whether a submission which took ``duration`` seconds is slow.
+    """
+    threshold = settings.SLOWLOG_THRESHOLD
+    return threshold is not None and duration * 1000 >= threshold
+
+
+def record_submission(view, form, duration):
+    """
+    Records a slow submission to a :class:`~envelope.views.ContactView`,
+    with the stage durations, the ``before_send`` receivers, the message
+    size and the number of recipients.
+    """
+    message_size = recipients = 0
+    if form is not None and hasattr(form, 'cleaned_data'):
+        message_size = len(form.cleaned_data.get('message') or '')
+        if hasattr(form, 'get_email_recipients'):
+            recipients = len(form.get_email_recipients())
+    timer = getattr(view, 'stage_timer', None)
+    record({
+        'created': timezone.now(),
+        'path': view.request.path,
+        'duration': round(duration * 1000, 3),
+        'stages': timer.as_dict() if timer else {},
+        'receivers': getattr(view, 'receivers', []),
+        'message_size': message_size,
+        'recipients': recipients,
+        'outcome': getattr(view, 'outcome', ''),
+    })
+
+
+def record(entry):
+    """
+    Adds an entry (a dictionary with the fields of
+    :class:`~envelope.models.SlowSubmission`) to the log.
+    """
+    global _entries
+    with _lock:
+        if _entries is None:
+            _entries = deque(maxlen=settings.SLOWLOG_SIZE)
+        _entries.append(entry)
+    if settings.SLOWLOG_DATABASE:
+        from envelope.models import SlowSubmission
+        try:
+            SlowSubmission.objects.create(
+                created=entry['created'],
+                path=entry['path'][:255],
+                duration=entry['duration'],
+                stages=json.dumps(entry['stages']),
+                receivers=','.join(entry['receivers']),
+                message_size=entry['message_size'],
+                recipients=entry['recipients'],
+                outcome=entry['outcome'])
+        except DatabaseError:
+            logger.exception("Could not save a slow submission")
+
+
+def get_entries():
+    """
+    Returns the slow submissions recorded in this process, oldest first.
+    """
+    with _lock:
+        return list(_entries or ())
+
+
+def get_worst(limit=10):
+    """
+    Returns the slowest submissions recorded in this process.
+    """
+    entries = sorted(get_entries(), key=lambda entry: entry['duration'],
+                     reverse=True)
+    return entries[:limit]
+
+
+def clear():
+    global _entries
+    with _lock:
+        _entries = None
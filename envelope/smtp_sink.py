@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+A local SMTP server which accepts and discards messages, with injectable
+latency and faults, for benchmarking delivery without a network.
+
+It speaks just enough SMTP for ``smtplib`` (and so Django's SMTP email
+backend): ``HELO``/``EHLO``, ``MAIL``, ``RCPT``, ``DATA``, ``RSET``,
+``NOOP`` and ``QUIT``.
+"""
+
+import random
+import threading
+import time
+
+from django.utils.six.moves import socketserver
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """
+    Handles a single SMTP connection.
+    """
+    # small replies would otherwise wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def reply(self, *lines):
+        self.wfile.write(''.join(line + '\r\n' for line in lines).encode('ascii'))
+        self.wfile.flush()
+
+    def readline(self):
+        return self.rfile.readline().decode('utf-8', 'replace')
+
+    def handle(self):
+        server = self.server
+        self.reply('220 localhost envelope SMTP sink')
+        mail_from, recipients = None, []
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            command = line[:4].upper()
+            if server.delay:
+                time.sleep(server.delay)
+            if server.should_drop():
+                server.count('dropped')
+                return
+            if command in ('MAIL', 'RCPT', 'DATA') and server.should_fail():
+                server.count('failed')
+                self.reply('451 4.3.0 Injected failure')
+                continue
+
+            if command == 'EHLO':
+                self.reply('250-localhost', '250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                mail_from, recipients = line[10:].strip(), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipients.append(line[8:].strip())
+                self.reply('250 OK')
+            elif command == 'DATA':
+                if not recipients:
+                    self.reply('503 Need RCPT first')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                size = 0
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    size += len(data)
+                server.receive(mail_from, recipients, size)
+                mail_from, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'RSET':
+                mail_from, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class SMTPSinkServer(socketserver.ThreadingTCPServer):
+    """
+    SMTP server which counts and discards the messages it receives.
+
+    ``delay``
+        Seconds to wait before answering every command.
+
+    ``failure_rate``
+        Probability of answering ``MAIL``, ``RCPT`` or ``DATA`` with a
+        temporary failure (``451``).
+
+    ``drop_rate``
+        Probability of closing the connection instead of answering a
+        command.
+
+    ``on_message``
+        Called with the sender, the list of recipients and the size of
+        every accepted message.
+
+    ``stats`` counts connections, messages, recipients, failed commands
+    and dropped connections.
+    """
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 1025), delay=0, failure_rate=0,
+                 drop_rate=0, on_message=None, seed=None):
+        socketserver.ThreadingTCPServer.__init__(self, address, SMTPSinkHandler)
+        self.delay = delay
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.on_message = on_message
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = dict.fromkeys(
+            ('connections', 'messages', 'recipients', 'failed', 'dropped'), 0)
+        self.thread = None
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.stats[name] += value
+
+    def should_fail(self):
+        return self.failure_rate and self.random.random() < self.failure_rate
+
+    def should_drop(self):
+        return self.drop_rate and self.random.random() < self.drop_rate
+
+    def process_request(self, request, client_address):
+        self.count('connections')
+        socketserver.ThreadingTCPServer.process_request(self, request, client_address)
+
+    def receive(self, mail_from, recipients, size):
+        self.count('messages')
+        self.count('recipients', len(recipients))
+        if self.on_message:
+            self.on_message(mail_from, recipients, size)
+
+    def start(self):
+        """
+        Serves in a background thread and returns the ``(host, port)``
+        address, useful with port 0.
+        """
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self.server_address
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.thread:
+            self.thread.join()
@@ -1,4 +1,27 @@
 from .forms import BaseContactFormTestCase, ContactFormTestCase
-from .views import ContactViewTestCase
+from .views import ContactInboxViewTestCase, ContactViewTestCase
 from .spam_filters import CheckHoneypotTestCase
 from .templatetags import RenderContactFormTestCase
+from .transfer import (ExportTestCase, ImportCommandTestCase, ReadersTestCase,
+                       WritersTestCase)
+from .buffer import ContactBufferTestCase
+from .search import (PostgresSearchBackendTestCase, SearchBackendTestCase,
+                     SqliteSearchBackendTestCase, TokenizeTestCase)
+from .managers import CursorTestCase, PageTestCase, SetStateTestCase
+from .counters import ContactCounterTestCase, PendingCounterTestCase
+from .attachments import (AttachmentContactViewTestCase, AttachmentsFieldTestCase,
+                          AttachmentToMimeTestCase)
+from .fields import CompressTextTestCase, CompressedTextFieldTestCase
+from .routers import ContactReplicaRouterTestCase, ReplicaWriteTestCase
+from .instrumentation import StageTimerTestCase, StatsdMetricsBackendTestCase
+from .prometheus import MarkProcessDeadTestCase, RegistryTestCase
+from .profiling import ProfilingTestCase
+from .benchmarks import LoadTestTestCase
+from .smtp_sink import SMTPSinkServerTestCase
+from .tracing import TracingTestCase
+from .slowlog import SlowLogTestCase
+from .delivery import DatabaseDeliveryTestCase, DeliveryTestCase
+from .admin import AdminActionsTestCase, ContactChangeListTestCase
+from .paginator import EstimatedCountPaginatorTestCase
+from .archive import ArchiveTestCase
+from .migrations import ContactIndexesMigrationTestCase
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the contact admin.
+"""
+
+from django.contrib.admin import AdminSite
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from mock import Mock
+
+from envelope.admin import BaseContactAdmin, mark_deleted, mark_replied
+from envelope.counters import get_pending_count
+from envelope.tests.models import Company, Contact, create_tables
+
+
+class AdminActionsTestCase(TestCase):
+    """
+    Unit tests for the state changing admin actions.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(AdminActionsTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.modeladmin = Mock()
+        self.request = Mock(user=User.objects.create(username='admin'))
+        for email in ('a@example.com', 'b@example.com', 'c@example.com'):
+            Contact.objects.create(user_email=email)
+
+    def test_mark_replied(self):
+        """
+        Selected contacts are marked as replied by the current user.
+        """
+        mark_replied(self.modeladmin, self.request,
+                     Contact.objects.exclude(user_email='c@example.com'))
+        self.assertEqual(Contact.objects.filter(state=1, updated_by=self.request.user)
+                         .count(), 2)
+        self.assertEqual(get_pending_count(Contact), 1)
+        self.modeladmin.message_user.assert_called_once_with(
+            self.request, "2 contacts marked as replied.")
+
+    def test_mark_deleted(self):
+        """
+        Selected contacts are marked as deleted, including replied ones.
+        """
+        Contact.objects.filter(user_email='a@example.com').set_state(1)
+        mark_deleted(self.modeladmin, self.request, Contact.objects.all())
+        self.assertEqual(Contact.objects.filter(state=-1).count(), 3)
+        self.assertEqual(get_pending_count(Contact), 0)
+
+
+class ContactChangeListTestCase(TestCase):
+    """
+    Unit tests for the contact change list.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ContactChangeListTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.modeladmin = BaseContactAdmin(Contact, AdminSite())
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'secret')
+        company = Company.objects.create(name="ACME")
+        for email in ('a@example.com', 'b@example.com', 'c@example.com'):
+            Contact.objects.create(user_email=email, company=company,
+                                   created_by=self.request.user)
+
+    def test_company_field(self):
+        """
+        The company is listed and picked with a raw id widget.
+        """
+        self.assertTrue('company' in self.modeladmin.get_list_display(self.request))
+        self.assertTrue('company' in self.modeladmin.raw_id_fields)
+
+    def test_queries(self):
+        """
+        The change list takes one query to count the contacts and one to
+        fetch them with their users and companies.
+        """
+        with self.assertNumQueries(2):
+            response = self.modeladmin.changelist_view(self.request)
+            contacts = list(response.context_data['cl'].result_list)
+            self.assertEqual(len(contacts), 3)
+            for contact in contacts:
+                self.assertEqual(contact.company.name, "ACME")
+                self.assertEqual(contact.created_by, self.request.user)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for contact archival.
+"""
+
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.six import StringIO
+
+from envelope.archive import (archive_contacts, ensure_archive_table,
+                              get_archive_table)
+from envelope.counters import get_pending_count
+from envelope.models import ContactSearchTerm
+from envelope.tests.models import Contact, create_tables
+
+
+class ArchiveTestCase(TestCase):
+    """
+    Unit tests for ``archive_contacts()`` and the ``envelope_archive``
+    command.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ArchiveTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.old_replied = self._create("Old invoice", state=1, days=100)
+        self.old_pending = self._create("Old question", state=2, days=100)
+        self.new_replied = self._create("New invoice", state=1, days=1)
+
+    def _create(self, subject, state, days):
+        contact = Contact.objects.create(user_email='a@example.com',
+                                         subject=subject, state=state)
+        Contact.objects.filter(pk=contact.pk).update(
+            updated=timezone.now() - timedelta(days=days))
+        return contact
+
+    def _archived(self):
+        cursor = connection.cursor()
+        cursor.execute('SELECT id, subject FROM %s ORDER BY id' %
+                       connection.ops.quote_name(get_archive_table(Contact)))
+        return cursor.fetchall()
+
+    def test_archive_table(self):
+        """
+        The archive table has the primary key and an index on created.
+        """
+        self.assertTrue(ensure_archive_table(Contact, 'default'))
+        self.assertFalse(ensure_archive_table(Contact, 'default'))
+        indexes = connection.introspection.get_indexes(
+            connection.cursor(), get_archive_table(Contact))
+        self.assertTrue(indexes['id']['primary_key'])
+        self.assertTrue('created' in indexes)
+
+    def test_archive_contacts(self):
+        """
+        Old contacts are moved with their primary keys, their search terms
+        deleted and pending ones uncounted.
+        """
+        self.assertEqual(get_pending_count(Contact), 1)
+        moved = archive_contacts(Contact, states=(1, 2), days=30, chunk_size=1)
+        self.assertEqual(moved, 2)
+        self.assertEqual(list(Contact.objects.values_list('pk', flat=True)),
+                         [self.new_replied.pk])
+        self.assertEqual(self._archived(), [(self.old_replied.pk, "Old invoice"),
+                                            (self.old_pending.pk, "Old question")])
+        self.assertEqual(set(ContactSearchTerm.objects.values_list('object_id', flat=True)),
+                         set([self.new_replied.pk]))
+        self.assertEqual(get_pending_count(Contact), 0)
+
+    def test_command(self):
+        """
+        By default, old deleted and replied contacts are archived.
+        """
+        out = StringIO()
+        call_command('envelope_archive', 'envelope.Contact', days=30, stdout=out)
+        self.assertEqual(out.getvalue(), "Contact: moved 1 rows to %s\n" %
+                         get_archive_table(Contact))
+        self.assertEqual(self._archived(), [(self.old_replied.pk, "Old invoice")])
+        self.assertEqual(get_pending_count(Contact), 1)
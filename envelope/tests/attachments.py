@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for contact form attachments.
+"""
+
+import base64
+import unittest
+
+from django import forms
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from envelope.attachments import AttachmentsField, attachment_to_mime
+from envelope.tests.views import test_templates
+
+
+class AttachmentsFieldTestCase(unittest.TestCase):
+    """
+    Unit tests for ``AttachmentsField``.
+    """
+
+    def setUp(self):
+        self.field = AttachmentsField(max_count=2, max_size=10, required=False)
+
+    def _file(self, name='log.txt', size=5):
+        return SimpleUploadedFile(name, b'x' * size, 'text/plain')
+
+    def test_no_files(self):
+        """
+        An optional field accepts no files.
+        """
+        self.assertEqual(self.field.clean([]), [])
+
+    def test_valid_files(self):
+        """
+        All submitted files are returned.
+        """
+        files = [self._file(), self._file('other.txt')]
+        self.assertEqual(len(self.field.clean(files)), 2)
+
+    def test_too_many_files(self):
+        """
+        More files than max_count are rejected.
+        """
+        files = [self._file() for i in range(3)]
+        self.assertRaises(forms.ValidationError, self.field.clean, files)
+
+    def test_too_large_file(self):
+        """
+        Files larger than max_size are rejected.
+        """
+        self.assertRaises(forms.ValidationError, self.field.clean, [self._file(size=11)])
+
+
+class AttachmentToMimeTestCase(unittest.TestCase):
+    """
+    Unit tests for ``attachment_to_mime()``.
+    """
+
+    def test_payload(self):
+        """
+        The MIME part carries the base64-encoded file and its name.
+        """
+        content = bytes(bytearray(range(256))) * 1000
+        part = attachment_to_mime(SimpleUploadedFile('data.bin', content,
+                                                     'application/octet-stream'))
+        self.assertEqual(part.get_content_type(), 'application/octet-stream')
+        self.assertEqual(part.get_filename(), 'data.bin')
+        self.assertEqual(base64.b64decode(part.get_payload()), content)
+
+
+@override_settings(TEMPLATE_DIRS=test_templates,
+                   ENVELOPE_ATTACHMENTS_MAX_COUNT=2,
+                   ENVELOPE_ATTACHMENT_MAX_SIZE=1024)
+class AttachmentContactViewTestCase(TestCase):
+    """
+    Unit tests for uploads to ``AttachmentContactView``.
+    """
+    urls = 'envelope.tests.urls'
+
+    def setUp(self):
+        self.url = reverse('attachment_contact')
+        self.form_data = {
+            'sender': 'me',
+            'email': 'test@example.com',
+            'category': 10,
+            'subject': 'A subject',
+            'message': 'Hello there!',
+        }
+        mail.outbox = []
+
+    def _post(self, *sizes):
+        self.form_data['attachments'] = [
+            SimpleUploadedFile('log%d.txt' % i, b'x' * size, 'text/plain')
+            for i, size in enumerate(sizes)]
+        return self.client.post(self.url, self.form_data)
+
+    def _errors(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mail.outbox, [])
+        return response.context['form'].non_field_errors()
+
+    def test_attachments(self):
+        """
+        Files within the limits are attached to the message.
+        """
+        response = self._post(1024, 10)
+        self.assertEqual(response.status_code, 302)
+        message, = mail.outbox
+        self.assertEqual([part.get_filename() for part in message.attachments],
+                         ['log0.txt', 'log1.txt'])
+
+    def test_too_many_files(self):
+        """
+        The upload stops at the first file over the count limit.
+        """
+        self.assertEqual(self._errors(self._post(10, 10, 10)),
+                         ["You can attach at most 2 files."])
+
+    def test_too_large_file(self):
+        """
+        The upload stops when a file grows over the size limit.
+        """
+        self.assertEqual(self._errors(self._post(10, 1025)),
+                         ["Each attachment must be smaller than 1 kB."])
+
+    def test_too_large_request(self):
+        """
+        A request larger than all attachments together is not read.
+        """
+        response = self._post(2 * 1024 * 1024)
+        self.assertEqual(self._errors(response), ["The attachments are too large."])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the synthetic load generator.
+"""
+
+import unittest
+
+from mock import patch
+
+from envelope.benchmarks import (PayloadGenerator, measure_import_time,
+                                 percentile, run_load_test)
+from envelope.forms import ContactForm
+from envelope.signals import after_send, before_send
+
+
+class LoadTestTestCase(unittest.TestCase):
+    """
+    Unit tests for payload generation and the load test runner.
+    """
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile(values, 1), 100)
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_payloads(self):
+        """
+        Generated payloads are repeatable and respect the size limit.
+        """
+        first = PayloadGenerator(ContactForm, max_size=500, seed=1)
+        second = PayloadGenerator(ContactForm, max_size=500, seed=1)
+        for i in range(20):
+            data, spam = first.generate()
+            self.assertEqual((data, spam), second.generate())
+            self.assertTrue(len(data['message']) <= 500 + 100)
+        data, spam = PayloadGenerator(ContactForm, spam_ratio=1).generate()
+        self.assertTrue(spam)
+
+    def test_run(self):
+        """
+        Spam is rejected by the spam filters, everything else is sent.
+        """
+        generator = PayloadGenerator(ContactForm, spam_ratio=0.5, max_size=200, seed=1)
+        spam = sum(generator.generate()[1] for i in range(20))
+        self.assertTrue(0 < spam < 20)
+
+        honeypot_field = generator.honeypot_field
+
+        def reject_spam(sender, request, form, **kwargs):
+            return not request.POST.get(honeypot_field)
+
+        before_send.connect(reject_spam)
+        try:
+            result = run_load_test(count=20, concurrency=2, target='view',
+                                   spam_ratio=0.5, max_size=200, seed=1)
+        finally:
+            before_send.disconnect(reject_spam)
+        self.assertEqual(result.count, 20)
+        self.assertEqual(result.outcomes, {'sent': 20 - spam, 'rejected': spam})
+        self.assertTrue(result.throughput > 0)
+
+    def test_run_failure(self):
+        """
+        The after_send receiver is disconnected even if the run fails.
+        """
+        with patch('envelope.benchmarks.default_timer', side_effect=RuntimeError):
+            self.assertRaises(RuntimeError, run_load_test, count=2,
+                              processes=False)
+        self.assertFalse(any(key[0] == 'envelope.benchmarks'
+                             for key, receiver in after_send.receivers))
+
+    def test_import_time(self):
+        """
+        Without a settings module, this also checks that the form module
+        doesn't need configured settings to be imported.
+        """
+        (module, seconds), = measure_import_time(['envelope.forms'])
+        self.assertEqual(module, 'envelope.forms')
+        self.assertTrue(seconds > 0)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the buffered contact writer.
+"""
+
+import weakref
+
+from django.db import DatabaseError
+from django.test import TestCase
+
+from mock import patch
+
+from envelope.buffer import ContactBuffer, flush_all
+
+
+class FakeManager(object):
+    def __init__(self):
+        self.batches = []
+
+    def bulk_create(self, objs):
+        self.batches.append(list(objs))
+
+
+class FakeContact(object):
+    _default_manager = FakeManager()
+
+
+class ContactBufferTestCase(TestCase):
+    """
+    Unit tests for ``ContactBuffer``.
+    """
+
+    def setUp(self):
+        FakeContact._default_manager = FakeManager()
+        self.buffer = ContactBuffer(max_size=3, max_delay=60000)
+
+    def tearDown(self):
+        self.buffer.flush()
+
+    def test_flush_when_full(self):
+        """
+        The buffer inserts all instances at once when it reaches max_size.
+        """
+        for i in range(3):
+            self.buffer.add(FakeContact())
+        self.assertEqual(len(FakeContact._default_manager.batches), 1)
+        self.assertEqual(len(FakeContact._default_manager.batches[0]), 3)
+        self.assertEqual(self.buffer.size, 0)
+
+    def test_explicit_flush(self):
+        """
+        flush() writes whatever is buffered and cancels the timer.
+        """
+        self.buffer.add(FakeContact())
+        self.assertTrue(self.buffer.timer is not None)
+        self.assertEqual(self.buffer.flush(), 1)
+        self.assertTrue(self.buffer.timer is None)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_failed_write(self):
+        """
+        Instances which couldn't be inserted are retried with the next
+        batch, and dropped after max_retries failed writes.
+        """
+        manager = FakeContact._default_manager
+        self.buffer.max_retries = 1
+        with patch.object(manager, 'bulk_create', side_effect=DatabaseError):
+            self.buffer.add(FakeContact())
+            self.assertEqual(self.buffer.flush(), 0)
+            self.assertEqual(self.buffer.size, 1)
+            self.assertTrue(self.buffer.timer is not None)
+        self.buffer.add(FakeContact())
+        self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(len(manager.batches[0]), 2)
+
+        with patch.object(manager, 'bulk_create', side_effect=DatabaseError):
+            self.buffer.add(FakeContact())
+            self.buffer.flush()
+            self.buffer.flush()
+        self.assertEqual(self.buffer.size, 0)
+
+    def test_flush_all(self):
+        """
+        One exit hook flushes every buffer.
+        """
+        other = ContactBuffer(max_size=3, max_delay=60000)
+        self.buffer.add(FakeContact())
+        other.add(FakeContact())
+        # leave the buffers of other tests alone
+        with patch('envelope.buffer._buffers', weakref.WeakSet([self.buffer, other])):
+            flush_all()
+        self.assertEqual(len(FakeContact._default_manager.batches), 2)
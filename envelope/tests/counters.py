@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for pending contact counters.
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from mock import patch
+
+from envelope.counters import (adjust_pending_count, get_pending_count,
+                               rebuild_pending_counts)
+from envelope.managers import PENDING
+from envelope.tests.models import Company, Contact, create_tables
+
+
+class PendingCounterTestCase(TestCase):
+    """
+    Unit tests for counter updates. Any model will do as the counted one.
+    """
+
+    def test_missing_counter(self):
+        """
+        A counter which was never updated reads as zero.
+        """
+        self.assertEqual(get_pending_count(User, 1), 0)
+
+    def test_adjust(self):
+        """
+        Adjustments are added up separately for each company.
+        """
+        adjust_pending_count(User, 1, 1)
+        adjust_pending_count(User, 1, 1)
+        adjust_pending_count(User, 2, 1)
+        adjust_pending_count(User, 1, -1)
+        self.assertEqual(get_pending_count(User, 1), 1)
+        self.assertEqual(get_pending_count(User, 2), 1)
+        self.assertEqual(get_pending_count(User), 0)
+
+
+class ContactCounterTestCase(TestCase):
+    """
+    Unit tests for the receivers counting saved and deleted contacts.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ContactCounterTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.company = Company.objects.create(name="ACME")
+
+    def test_save_and_delete(self):
+        """
+        Pending contacts are counted per company until they are replied to
+        or deleted.
+        """
+        first = Contact.objects.create(user_email='a@example.com',
+                                       company=self.company)
+        Contact.objects.create(user_email='b@example.com')
+        self.assertEqual(get_pending_count(Contact, self.company), 1)
+        self.assertEqual(get_pending_count(Contact), 1)
+
+        first.state = 1
+        first.save()
+        self.assertEqual(get_pending_count(Contact, self.company), 0)
+        first.state = PENDING
+        first.company = None
+        first.save()
+        self.assertEqual(get_pending_count(Contact), 2)
+        first.delete()
+        self.assertEqual(get_pending_count(Contact), 1)
+
+    def test_rebuild(self):
+        """
+        Rebuilt counters have one row per company, whatever the model's
+        default ordering.
+        """
+        for days in (1, 2):
+            Contact.objects.create(user_email='a@example.com', company=self.company,
+                                   created=timezone.now() - timedelta(days=days))
+        Contact.objects.create(user_email='b@example.com')
+        with patch.object(Contact._meta, 'ordering', ['-created']):
+            counters = rebuild_pending_counts(Contact)
+        self.assertEqual(len(counters), 2)
+        self.assertEqual(get_pending_count(Contact, self.company.pk), 2)
+        self.assertEqual(get_pending_count(Contact), 1)
+
+    def test_deferred_fields(self):
+        """
+        Contacts loaded with deferred fields are counted too.
+        """
+        contact = Contact.objects.create(user_email='a@example.com')
+        contact = Contact.objects.defer('message_box').get(pk=contact.pk)
+        contact.state = 1
+        contact.save()
+        self.assertEqual(get_pending_count(Contact), 0)
+
+    def test_other_models(self):
+        """
+        Instances of other models are left alone.
+        """
+        self.assertFalse(hasattr(User(), '_envelope_counted'))
+        self.assertTrue(hasattr(Contact(), '_envelope_counted'))
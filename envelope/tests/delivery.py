@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the delivery backends.
+"""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+from smtplib import SMTPRecipientsRefused
+
+from django.core import mail
+from django.db import DatabaseError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from mock import patch
+
+from envelope import delivery
+from envelope.buffer import ContactBuffer
+from envelope.counters import get_pending_count
+from envelope.forms import ContactForm
+from envelope.search import search_contacts
+from envelope.signals import after_send
+from envelope.tests.models import Contact, create_tables
+
+
+class DeliveryTestCase(unittest.TestCase):
+    """
+    Unit tests for backend selection and the webhook and file backends.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'contacts.jsonl')
+        self.form_data = {
+            'sender': 'me',
+            'email': 'test@example.com',
+            'category': 10,
+            'subject': 'A subject',
+            'message': 'Hello there!',
+        }
+        self.sent = []
+        after_send.connect(self._after_send)
+
+    def tearDown(self):
+        after_send.disconnect(self._after_send)
+        delivery.close_backends()
+        shutil.rmtree(self.directory)
+
+    def _after_send(self, sender, message, form, **kwargs):
+        self.sent.append(message)
+
+    def _save(self, **kwargs):
+        form = ContactForm(self.form_data, **kwargs)
+        self.assertTrue(form.is_valid())
+        return form.save()
+
+    def _read(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_category_backend(self):
+        """
+        Categories can be delivered with their own backend.
+        """
+        backends = {
+            'default': {'BACKEND': 'envelope.delivery.EmailDelivery'},
+            'file': {'BACKEND': 'envelope.delivery.FileDelivery',
+                     'OPTIONS': {'path': self.path, 'batch_size': 1}},
+        }
+        with override_settings(ENVELOPE_DELIVERY_BACKENDS=backends,
+                               ENVELOPE_DELIVERY_CATEGORIES={10: 'file'}):
+            self.assertTrue(self._save())
+        record, = self._read()
+        self.assertEqual(record['fields']['message'], 'Hello there!')
+        self.assertEqual(record['message_id'],
+                         self.sent[0].extra_headers['Message-ID'])
+
+    def test_changed_configuration(self):
+        """
+        Backends are created again, and the previous ones closed, when their
+        configuration changes.
+        """
+        backends = {
+            'default': {'BACKEND': 'envelope.delivery.FileDelivery',
+                        'OPTIONS': {'path': self.path, 'batch_size': 2}},
+        }
+        backend = delivery.get_backend()
+        self.assertTrue(delivery.get_backend() is backend)
+        with override_settings(ENVELOPE_DELIVERY_BACKENDS=backends):
+            self.assertTrue(isinstance(delivery.get_backend(), delivery.FileDelivery))
+            self.assertTrue(self._save())
+            self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(isinstance(delivery.get_backend(), delivery.EmailDelivery))
+        self.assertEqual(len(self._read()), 1)
+
+    def test_file_batches(self):
+        """
+        Buffered lines are written together.
+        """
+        backend = delivery.FileDelivery(self.path, batch_size=3, interval=60000)
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            self._save()
+            self._save()
+            self.assertFalse(os.path.exists(self.path))
+            self._save()
+        self.assertEqual(len(self._read()), 3)
+        self.assertEqual(len(self.sent), 3)
+
+    def test_webhook_failure(self):
+        """
+        A failed delivery doesn't send after_send.
+        """
+        backend = delivery.WebhookDelivery('http://hooks.example.com/contact')
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            with patch('envelope.delivery.urlopen') as mock_urlopen:
+                self.assertTrue(self._save())
+                request = mock_urlopen.call_args[0][0]
+                payload = json.loads(request.data.decode('utf-8'))
+                self.assertEqual(payload['fields']['email'], 'test@example.com')
+
+                mock_urlopen.side_effect = IOError("connection refused")
+                self.assertFalse(self._save())
+        self.assertEqual(len(self.sent), 1)
+
+    def test_fan_out(self):
+        """
+        Recipients get private copies, or Bcc groups of limited size.
+        """
+        recipients = ['%d@example.com' % i for i in range(5)]
+        mail.outbox = []
+        backend = delivery.EmailDelivery(fan_out='recipient')
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            self._save(email_recipients=recipients)
+        self.assertEqual([message.to for message in mail.outbox],
+                         [[address] for address in recipients])
+        self.assertEqual(self.sent[0].failed_recipients, [])
+
+        mail.outbox = []
+        backend = delivery.EmailDelivery(fan_out='bcc', max_recipients=2)
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            self._save(email_recipients=recipients)
+        self.assertEqual([message.bcc for message in mail.outbox],
+                         [recipients[:2], recipients[2:4], recipients[4:]])
+        self.assertEqual(mail.outbox[0].message()['To'],
+                         delivery.UNDISCLOSED_RECIPIENTS)
+
+    def test_fan_out_failures(self):
+        """
+        Failed recipients are tracked, the delivery fails only if no copy
+        was sent.
+        """
+        def send_messages(messages):
+            if messages[0].to == ['bad@example.com']:
+                raise SMTPRecipientsRefused({})
+        connection = mail.get_connection()
+        backend = delivery.EmailDelivery(fan_out='recipient')
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            with patch.object(backend, 'get_connection', return_value=connection):
+                with patch.object(connection, 'send_messages', side_effect=send_messages):
+                    self.assertTrue(self._save(email_recipients=[
+                        'good@example.com', 'bad@example.com']))
+                    self.assertFalse(self._save(email_recipients=['bad@example.com']))
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.sent[0].failed_recipients, ['bad@example.com'])
+
+    def test_fan_out_unreachable(self):
+        """
+        The connection is reopened once, then the remaining recipients fail
+        without further attempts.
+        """
+        recipients = ['%d@example.com' % i for i in range(5)]
+        connection = mail.get_connection()
+        backend = delivery.EmailDelivery(fan_out='recipient')
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            with patch.object(backend, 'get_connection', return_value=connection):
+                with patch.object(connection, 'open', side_effect=socket.error) as mock_open:
+                    self.assertFalse(self._save(email_recipients=recipients))
+        self.assertEqual(mock_open.call_count, 2)
+        self.assertEqual(self.sent, [])
+
+        messages = delivery.fan_out(mail.EmailMessage(to=recipients), 'recipient')
+        with patch.object(connection, 'send_messages',
+                          side_effect=[1, socket.error, 1, socket.error, 1]) as mock_send:
+            self.assertEqual(delivery.send_messages(messages, connection),
+                             recipients[1:2] + recipients[3:])
+        self.assertEqual(mock_send.call_count, 4)
+
+
+class DatabaseDeliveryTestCase(TestCase):
+    """
+    Unit tests for ``DatabaseDelivery``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(DatabaseDeliveryTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.form_data = {
+            'sender': 'me',
+            'email': 'test@example.com',
+            'category': 10,
+            'subject': 'Broken invoice',
+            'message': 'Hello there!',
+        }
+
+    def _save(self, backend):
+        form = ContactForm(self.form_data)
+        self.assertTrue(form.is_valid())
+        with patch.object(delivery, 'get_backend', return_value=backend):
+            return form.save()
+
+    def test_save(self):
+        """
+        Contacts are saved immediately, indexed and counted.
+        """
+        self.assertTrue(self._save(delivery.DatabaseDelivery('envelope.Contact')))
+        contact = Contact.objects.get()
+        self.assertEqual(contact.user_email, 'test@example.com')
+        self.assertEqual(contact.subject, 'Broken invoice')
+        self.assertEqual(search_contacts(Contact.objects.all(), "invoice").get(), contact)
+        self.assertEqual(get_pending_count(Contact), 1)
+
+    def test_save_failure(self):
+        """
+        Database errors are delivery failures.
+        """
+        backend = delivery.DatabaseDelivery('envelope.Contact')
+        with patch.object(Contact, 'save', side_effect=DatabaseError("gone")):
+            self.assertFalse(self._save(backend))
+
+    def test_buffered_writes(self):
+        """
+        With ``ENVELOPE_BUFFERED_WRITES``, contacts go through the
+        per-process buffer.
+        """
+        backend = delivery.DatabaseDelivery('envelope.Contact')
+        buffer = ContactBuffer(max_size=2, max_delay=60000)
+        with patch('envelope.settings.BUFFERED_WRITES', True):
+            with patch('envelope.buffer.get_buffer', return_value=buffer):
+                self.assertTrue(self._save(backend))
+                self.assertEqual(Contact.objects.count(), 0)
+                self.assertTrue(self._save(backend))
+        self.assertEqual(Contact.objects.count(), 2)
+
+    def test_batches(self):
+        """
+        With a batch size, contacts are inserted together.
+        """
+        backend = delivery.DatabaseDelivery('envelope.Contact', batch_size=2,
+                                            interval=60000)
+        self._save(backend)
+        self.assertEqual(Contact.objects.count(), 0)
+        self._save(backend)
+        self.assertEqual(Contact.objects.count(), 2)
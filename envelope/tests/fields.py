@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for compressed text storage.
+"""
+
+import unittest
+
+from django.db import models
+
+from envelope.fields import (MARKER, CompressedTextField, compress_text,
+                             decompress_text)
+
+
+class CompressTextTestCase(unittest.TestCase):
+    """
+    Unit tests for ``compress_text()`` and ``decompress_text()``.
+    """
+
+    def test_short_text(self):
+        """
+        Text below the threshold is stored as it is.
+        """
+        self.assertEqual(compress_text("Hello there!", threshold=100), "Hello there!")
+        self.assertEqual(compress_text(None, threshold=100), None)
+
+    def test_long_text(self):
+        """
+        Long, compressible text is stored compressed and restored intact.
+        """
+        text = "Traceback (most recent call last): żółć\n" * 1000
+        stored = compress_text(text, threshold=100, algorithm='zlib')
+        self.assertTrue(stored.startswith(MARKER))
+        self.assertTrue(len(stored) < len(text))
+        self.assertEqual(decompress_text(stored), text)
+
+    def test_marker_in_text(self):
+        """
+        Text which happens to start with the marker survives a roundtrip.
+        """
+        text = MARKER + "z not really compressed"
+        stored = compress_text(text, threshold=100)
+        self.assertNotEqual(stored, text)
+        self.assertEqual(decompress_text(stored), text)
+
+    def test_plain_values(self):
+        """
+        Values stored before compression was enabled are returned unchanged.
+        """
+        self.assertEqual(decompress_text("plain"), "plain")
+        self.assertEqual(decompress_text(None), None)
+
+
+class Note(models.Model):
+    body = CompressedTextField(threshold=100)
+
+    class Meta:
+        app_label = 'envelope'
+        managed = False
+
+
+def load(stored):
+    """
+    Returns an instance as the ORM creates it from a database row.
+    """
+    note = Note(body=stored)
+    note._state.adding = False
+    return note
+
+
+class CompressedTextFieldTestCase(unittest.TestCase):
+    """
+    Unit tests for ``CompressedTextField`` and its descriptor.
+    """
+
+    def test_assigned_values(self):
+        """
+        Values assigned in Python are never decoded.
+        """
+        text = MARKER + "z not really compressed"
+        self.assertEqual(Note(body=text).body, text)
+        note = load("plain")
+        note.body = MARKER + "r" + text
+        self.assertEqual(note.body, MARKER + "r" + text)
+
+    def test_loaded_values(self):
+        """
+        Loaded values are decoded once, however often they are read.
+        """
+        text = MARKER + "zabc"
+        stored = Note._meta.get_field('body').get_prep_value(text)
+        self.assertEqual(stored, MARKER + "r" + text)
+        note = load(stored)
+        self.assertEqual(note.body, text)
+        self.assertEqual(note.body, text)
+
+        long_text = "Hello there! " * 100
+        note = load(compress_text(long_text, threshold=100))
+        self.assertEqual(note.body, long_text)
+        self.assertEqual(note.body, long_text)
+
+    def test_save_roundtrip(self):
+        """
+        Saving keeps Python values as they are and stores them escaped.
+        """
+        field = Note._meta.get_field('body')
+        text = MARKER + "r" + MARKER + "zabc"
+        note = Note(body=text)
+        self.assertEqual(field.pre_save(note, True), text)
+        note._state.adding = False
+        self.assertEqual(note.body, text)
+        self.assertEqual(load(field.get_prep_value(text)).body, text)
+
+    def test_invalid_stored_value(self):
+        """
+        Loaded text which merely looks compressed is returned as it is.
+        """
+        self.assertEqual(load(MARKER + "z not really compressed").body,
+                         MARKER + "z not really compressed")
@@ -6,13 +6,16 @@ from __future__ import unicode_literals
 Unit tests for ``django-envelope`` forms.
 """
 
+import logging
 import unittest
 from smtplib import SMTPException
 
+from django.test.utils import override_settings
 from django.utils.translation import ugettext_lazy as _
 
 from mock import patch
 
+from envelope import settings
 from envelope.forms import BaseContactForm, ContactForm
 
 
@@ -102,6 +105,20 @@ class BaseContactFormTestCase(unittest.TestCase):
             self.assertTrue(overrides['from_email'] in kwargs['from_email'])
             self.assertTrue(overrides['email_recipients'][0] in kwargs['to'])
 
+    def test_default_recipients(self):
+        """
+        Settings are resolved when used; admins get a copy by default.
+        """
+        with override_settings(ENVELOPE_EMAIL_RECIPIENTS=['to@example.com'],
+                               ADMINS=(('Admin', 'admin@example.com'),)):
+            self.assertEqual(BaseContactForm().get_email_recipients(),
+                             ['to@example.com', 'admin@example.com'])
+            self.assertEqual(
+                BaseContactForm(email_recipients=['a@example.com'])
+                .get_email_recipients(), ['a@example.com'])
+        self.assertEqual(BaseContactForm().get_email_recipients(),
+                         [settings.FROM_EMAIL])
+
     def test_save_smtp_error(self):
         """
         If the email backend raised an error, the message is not sent.
@@ -113,6 +130,30 @@ class BaseContactFormTestCase(unittest.TestCase):
             result = form.save()
             self.assertFalse(result)
 
+    def test_save_log_record(self):
+        """
+        The log record of a sent message carries structured fields.
+        """
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.getLogger('envelope.forms')
+        logger.addHandler(handler)
+        level = logger.level
+        logger.setLevel(logging.INFO)
+        try:
+            form = BaseContactForm(self.form_data)
+            self.assertTrue(form.is_valid())
+            self.assertTrue(form.save())
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(level)
+        record, = records
+        self.assertEqual(record.args, ('test@example.com',))
+        self.assertEqual(record.envelope['outcome'], 'sent')
+        self.assertTrue(record.envelope['message_id'])
+        self.assertTrue('send' in record.envelope['timings'])
+
     def _test_required_field(self, field_name):
         """
         Check that the form does not validate without a given field.
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for stage timing and metrics backends.
+"""
+
+import unittest
+
+from envelope import signals
+from envelope.instrumentation import StageTimer, StatsdMetricsBackend
+
+
+class StageTimerTestCase(unittest.TestCase):
+    """
+    Unit tests for ``StageTimer``.
+    """
+
+    def test_stages(self):
+        """
+        Every stage is recorded in order and announced with a signal.
+        """
+        timed = []
+
+        def handle_stage_timed(sender, stage, duration, **kwargs):
+            timed.append(stage)
+
+        signals.stage_timed.connect(handle_stage_timed)
+        try:
+            timer = StageTimer()
+            with timer.stage('render'):
+                pass
+            with timer.stage('send'):
+                pass
+        finally:
+            signals.stage_timed.disconnect(handle_stage_timed)
+        self.assertEqual([name for name, duration in timer.stages], ['render', 'send'])
+        self.assertEqual(timed, ['render', 'send'])
+        self.assertTrue(timer.total >= 0)
+
+    def test_stage_with_error(self):
+        """
+        A stage which raised an exception is still recorded.
+        """
+        timer = StageTimer()
+        with self.assertRaises(ValueError):
+            with timer.stage('send'):
+                raise ValueError
+        self.assertEqual(timer.stages[0][0], 'send')
+
+
+class StatsdMetricsBackendTestCase(unittest.TestCase):
+    """
+    Unit tests for the statsd line format.
+    """
+
+    def test_format(self):
+        backend = StatsdMetricsBackend('localhost', 8125, prefix='app.')
+        self.assertEqual(backend.format('envelope.send', '1.500', 'ms'),
+                         'app.envelope.send:1.500|ms')
+        self.assertEqual(backend.format('envelope.sent', 1, 'c', {'b': 2, 'a': 1}),
+                         'app.envelope.sent:1|c|#a:1,b:2')
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for contact querysets.
+"""
+
+import datetime
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import router
+from django.test import TestCase
+from django.utils import timezone
+
+from mock import patch
+
+from envelope.counters import get_pending_count
+from envelope.managers import (PENDING, ContactQuerySet, decode_cursor,
+                               encode_cursor)
+from envelope.signals import state_changed
+from envelope.tests.models import Company, Contact, create_tables
+
+
+class FakeContact(object):
+    def __init__(self, created, pk):
+        self.created = created
+        self.pk = pk
+
+
+class CursorTestCase(unittest.TestCase):
+    """
+    Unit tests for inbox cursors.
+    """
+
+    def test_roundtrip(self):
+        """
+        A cursor decodes to the creation date and primary key it was made of.
+        """
+        created = datetime.datetime(2014, 3, 1, 12, 30, 15, 123456)
+        cursor = encode_cursor(FakeContact(created, 42))
+        self.assertEqual(decode_cursor(cursor), (created, 42))
+
+    def test_invalid_cursor(self):
+        """
+        Malformed cursors raise ValueError.
+        """
+        for cursor in ('', 'not base64!', encode_cursor(FakeContact(datetime.datetime.now(), 'x'))):
+            self.assertRaises(ValueError, decode_cursor, cursor)
+
+
+class SetStateTestCase(TestCase):
+    """
+    Unit tests for ``ContactQuerySet.set_state()``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(SetStateTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.user = User.objects.create(username='admin')
+        self.company = Company.objects.create(name="ACME")
+        self.contacts = [
+            Contact.objects.create(user_email='a@example.com', company=self.company),
+            Contact.objects.create(user_email='b@example.com', company=self.company),
+            Contact.objects.create(user_email='c@example.com'),
+            Contact.objects.create(user_email='d@example.com', state=1),
+        ]
+        self.signals = []
+        state_changed.connect(self._state_changed)
+
+    def tearDown(self):
+        state_changed.disconnect(self._state_changed)
+
+    def _state_changed(self, sender, **kwargs):
+        self.signals.append(kwargs)
+
+    def _states(self):
+        return list(Contact.objects.order_by('pk').values_list('state', flat=True))
+
+    def test_set_state(self):
+        """
+        Contacts are updated in batches, counters adjusted and one signal
+        sent with the changed contacts.
+        """
+        changed = Contact.objects.exclude(user_email='b@example.com') \
+            .set_state(1, user=self.user, batch_size=1)
+        self.assertEqual(changed, 2)
+        self.assertEqual(self._states(), [1, 2, 1, 1])
+        self.assertEqual(Contact.objects.get(pk=self.contacts[0].pk).updated_by, self.user)
+        self.assertEqual(get_pending_count(Contact, self.company), 1)
+        self.assertEqual(get_pending_count(Contact), 0)
+        signal, = self.signals
+        self.assertEqual(signal['state'], 1)
+        self.assertEqual(signal['count'], 2)
+        self.assertEqual(signal['pks'], [self.contacts[0].pk, self.contacts[2].pk])
+        self.assertEqual(signal['user'], self.user)
+
+    def test_to_pending(self):
+        """
+        Contacts moved to the pending state are counted.
+        """
+        self.assertEqual(Contact.objects.all().set_state(PENDING), 1)
+        self.assertEqual(get_pending_count(Contact), 2)
+        self.assertEqual(get_pending_count(Contact, self.company), 2)
+        self.assertEqual(Contact.objects.all().set_state(PENDING), 0)
+        self.assertEqual(len(self.signals), 1)
+
+    def test_concurrent_change(self):
+        """
+        Contacts which stop matching the filters before they are updated
+        are left alone.
+        """
+        first, second = self.contacts[:2]
+        select_for_update = ContactQuerySet.select_for_update
+
+        def change_second(queryset, *args, **kwargs):
+            Contact.objects.filter(pk=second.pk).update(state=1)
+            return select_for_update(queryset, *args, **kwargs)
+
+        with patch.object(ContactQuerySet, 'select_for_update', change_second):
+            changed = Contact.objects.pending().for_company(self.company).set_state(-1)
+        self.assertEqual(changed, 1)
+        self.assertEqual(self._states()[:2], [-1, 1])
+        self.assertEqual(self.signals[0]['pks'], [first.pk])
+
+    def test_write_database(self):
+        """
+        Contacts to change are read from the database written to.
+        """
+        db_for_read = router.db_for_read
+
+        def read_contacts_from_replica(model, **hints):
+            return 'replica' if model is Contact else db_for_read(model, **hints)
+
+        with patch.object(router, 'db_for_read', read_contacts_from_replica):
+            self.assertEqual(Contact.objects.pending().set_state(1), 3)
+        self.assertEqual(get_pending_count(Contact), 0)
+
+
+class PageTestCase(TestCase):
+    """
+    Unit tests for ``ContactQuerySet.page()``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(PageTestCase, cls).setUpClass()
+
+    def test_equal_creation_dates(self):
+        """
+        Contacts created at the same time are ordered by primary key and
+        neither skipped nor repeated across pages.
+        """
+        for i in range(5):
+            Contact.objects.create(user_email='%d@example.com' % i)
+        created = timezone.now()
+        Contact.objects.filter(user_email__in=['1@example.com', '2@example.com',
+                                               '3@example.com']).update(created=created)
+        Contact.objects.filter(user_email='4@example.com').update(
+            created=created + datetime.timedelta(seconds=1))
+        Contact.objects.filter(user_email='0@example.com').update(
+            created=created - datetime.timedelta(seconds=1))
+        pages = []
+        cursor = None
+        while True:
+            contacts, cursor = Contact.objects.all().page(cursor, limit=2)
+            pages.append([contact.user_email[0] for contact in contacts])
+            if cursor is None:
+                break
+        self.assertEqual(pages, [['4', '3'], ['2', '1'], ['0']])
+
+    def test_exact_last_page(self):
+        """
+        A full last page has no next cursor.
+        """
+        for i in range(2):
+            Contact.objects.create(user_email='%d@example.com' % i)
+        contacts, cursor = Contact.objects.all().page(limit=2)
+        self.assertEqual(len(contacts), 2)
+        self.assertEqual(cursor, None)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for South migrations which do more than the generated code.
+"""
+
+import unittest
+
+from django.db import connection
+
+from mock import Mock, patch
+
+try:
+    from south.db import db
+except ImportError:
+    db = None
+
+from envelope.utils import import_module
+
+
+@unittest.skipIf(db is None, "requires South")
+class ContactIndexesMigrationTestCase(unittest.TestCase):
+    """
+    Unit tests for the migration adding the composite contact indexes.
+    """
+
+    def setUp(self):
+        self.migration = import_module(
+            'envelope.migrations.0003_auto__add_index_contact_state_created')
+        self.tables = self.migration.CONTACT_TABLES
+
+    def _index_names(self):
+        return [db.create_index_name(table, columns)
+                for table in self.tables for columns in self.migration.INDEXES]
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', "requires SQLite")
+    def test_sqlite(self):
+        """
+        The indexes are created in the migration's transaction.
+        """
+        cursor = connection.cursor()
+        for table in self.tables:
+            cursor.execute('CREATE TABLE %s (id integer PRIMARY KEY, state smallint, '
+                           'created datetime, user_email varchar(254))' % table)
+        try:
+            with patch.object(db, 'commit_transaction') as commit_transaction:
+                self.migration.Migration().forwards(None)
+            self.assertFalse(commit_transaction.called)
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+            created = set(row[0] for row in cursor.fetchall())
+            self.assertTrue(set(self._index_names()) <= created)
+            self.migration.Migration().backwards(None)
+        finally:
+            for table in self.tables:
+                cursor.execute('DROP TABLE %s' % table)
+
+    def test_postgres(self):
+        """
+        On PostgreSQL every index is created concurrently, outside of a
+        transaction.
+        """
+        fake_db = Mock(backend_name='postgres', quote_name=db.quote_name,
+                       create_index_name=db.create_index_name)
+        with patch.object(self.migration, 'db', fake_db):
+            self.migration.Migration().forwards(None)
+        statements = [args[0] for args, kwargs in fake_db.execute.call_args_list]
+        self.assertEqual(len(statements), len(self._index_names()))
+        self.assertTrue(all(statement.startswith('CREATE INDEX CONCURRENTLY')
+                            for statement in statements))
+        self.assertEqual(fake_db.commit_transaction.call_count, len(statements))
+        self.assertEqual(fake_db.start_transaction.call_count, len(statements))
+        self.assertFalse(fake_db.create_index.called)
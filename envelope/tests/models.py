@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+A concrete contact model for tests which need contact records in the
+database.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.color import no_style
+from django.db import connections, models
+
+from envelope.models import BaseContact
+
+
+class Company(models.Model):
+    name = models.CharField(max_length=100)
+
+    class Meta:
+        app_label = 'envelope'
+
+
+class Contact(BaseContact):
+    company = models.ForeignKey(Company, null=True, blank=True)
+    subject = models.TextField(blank=True)
+    message_box = models.TextField(blank=True)
+
+    class Meta(BaseContact.Meta):
+        app_label = 'envelope'
+
+
+def create_tables(using='default'):
+    """
+    Creates the tables of the test models unless they exist. Call it
+    outside of test transactions (e.g. in ``setUpClass()``, before the
+    ``super()`` call), as some databases commit on schema changes.
+    """
+    connection = connections[using]
+    existing = connection.introspection.table_names()
+    for model in (Company, Contact):
+        if model._meta.db_table in existing:
+            continue
+        if hasattr(connection, 'schema_editor'):
+            # Django 1.7+
+            with connection.schema_editor() as editor:
+                editor.create_model(model)
+        else:
+            statements, _ = connection.creation.sql_create_model(model, no_style())
+            cursor = connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+    # created here, so that it survives the rollback of test transactions
+    ContentType.objects.db_manager(using).get_for_model(Contact)
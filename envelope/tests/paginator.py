@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the estimated count paginator.
+"""
+
+from django.db import connections
+from django.test import TestCase
+
+from mock import Mock, patch
+
+from envelope.paginator import EstimatedCountPaginator
+from envelope.tests.models import Contact, create_tables
+
+
+class EstimatedCountPaginatorTestCase(TestCase):
+    """
+    Unit tests for ``EstimatedCountPaginator``.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(EstimatedCountPaginatorTestCase, cls).setUpClass()
+
+    def setUp(self):
+        for email in ('a@example.com', 'b@example.com', 'c@example.com'):
+            Contact.objects.create(user_email=email)
+        self.connection = connections['default']
+
+    def _paginator(self, queryset=None, estimate_threshold=10):
+        if queryset is None:
+            queryset = Contact.objects.order_by('pk')
+        paginator = EstimatedCountPaginator(queryset, 2)
+        paginator.estimate_threshold = estimate_threshold
+        return paginator
+
+    def _statistics(self, row):
+        """
+        Makes the connection look like PostgreSQL with the given row in
+        ``pg_class``.
+        """
+        cursor = Mock(fetchone=Mock(return_value=row))
+        return patch.multiple(self.connection, vendor='postgresql',
+                              cursor=Mock(return_value=cursor))
+
+    def test_above_threshold(self):
+        """
+        Large estimates are used as they are, without counting rows.
+        """
+        paginator = self._paginator()
+        with self._statistics((12345.0,)):
+            with self.assertNumQueries(0):
+                self.assertEqual(paginator.count, 12345)
+        self.assertEqual(paginator.num_pages, 6173)
+
+    def test_below_threshold(self):
+        """
+        Small estimates are replaced with an exact count.
+        """
+        paginator = self._paginator()
+        with self._statistics((5.0,)):
+            self.assertEqual(paginator.get_estimate(), 5)
+        with patch.object(paginator, 'get_estimate', return_value=5):
+            self.assertEqual(paginator.count, 3)
+        self.assertEqual(paginator.num_pages, 2)
+
+    def test_filtered(self):
+        """
+        Filtered querysets are counted exactly, table statistics don't
+        apply to them.
+        """
+        paginator = self._paginator(Contact.objects.filter(user_email='a@example.com'),
+                                    estimate_threshold=0)
+        with self._statistics((12345.0,)):
+            self.assertEqual(paginator.get_estimate(), None)
+        self.assertEqual(paginator.count, 1)
+
+    def test_no_statistics(self):
+        """
+        Databases without table statistics get an exact count.
+        """
+        paginator = self._paginator(estimate_threshold=0)
+        self.assertEqual(paginator.get_estimate(), None)
+        self.assertEqual(paginator.count, 3)
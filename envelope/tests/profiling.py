@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for on-demand profiling of submissions.
+"""
+
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from envelope import profiling
+
+
+class ProfilingTestCase(TestCase):
+    """
+    Unit tests for the profiling stage timer and its ring buffer.
+    """
+
+    def setUp(self):
+        profiling.clear_profiles()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        profiling.clear_profiles()
+
+    def test_token(self):
+        """
+        Only requests with a valid signed header are profiled.
+        """
+        request = self.factory.post('/', HTTP_X_ENVELOPE_PROFILE=profiling.make_token())
+        self.assertTrue(profiling.should_profile(request))
+        request = self.factory.post('/', HTTP_X_ENVELOPE_PROFILE='profile:forged')
+        self.assertFalse(profiling.should_profile(request))
+        self.assertFalse(profiling.should_profile(self.factory.post('/')))
+
+    def test_profile_stages(self):
+        """
+        Every stage is profiled separately and stored in the cache.
+        """
+        timer = profiling.ProfilingStageTimer()
+        with timer.stage('render'):
+            sorted(range(100))
+        with timer.stage('send'):
+            pass
+        timer.save('/contact/')
+        entry, = profiling.get_profiles()
+        self.assertEqual(entry['path'], '/contact/')
+        self.assertEqual([stage[0] for stage in entry['stages']], ['render', 'send'])
+        functions = [row[0] for row in entry['stages'][0][2]]
+        self.assertTrue(any('sorted' in function for function in functions))
+
+    def test_ring_buffer(self):
+        """
+        Only the most recent profiles are kept.
+        """
+        size = profiling.settings.PROFILING_BUFFER_SIZE
+        for number in range(size + 3):
+            profiling.store_profile({'time': number, 'path': '', 'total': 0,
+                                     'stages': []})
+        times = [entry['time'] for entry in profiling.get_profiles()]
+        self.assertEqual(times, list(range(3, size + 3)))
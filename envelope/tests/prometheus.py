@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for Prometheus metrics.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from envelope.prometheus import Registry, mark_process_dead
+
+
+class RegistryTestCase(unittest.TestCase):
+    """
+    Unit tests for the metrics ``Registry``.
+    """
+
+    def setUp(self):
+        self.registry = Registry(buckets=(0.1, 1.0))
+
+    def test_counters(self):
+        """
+        Counters are rendered per label set.
+        """
+        self.registry.inc('envelope_rejections_total', labels={'receiver': 'check_honeypot'})
+        self.registry.inc('envelope_rejections_total', labels={'receiver': 'check_honeypot'})
+        self.registry.inc('envelope_sent_total')
+        text = self.registry.render()
+        self.assertTrue('# TYPE envelope_rejections_total counter' in text)
+        self.assertTrue('envelope_rejections_total{receiver="check_honeypot"} 2' in text)
+        self.assertTrue('envelope_sent_total 1' in text)
+
+    def test_histogram(self):
+        """
+        Histogram buckets are cumulative and end with +Inf.
+        """
+        for value in (0.05, 0.5, 5):
+            self.registry.observe('envelope_stage_duration_seconds', value, {'stage': 'send'})
+        text = self.registry.render()
+        self.assertTrue('envelope_stage_duration_seconds_bucket{stage="send",le="0.1"} 1' in text)
+        self.assertTrue('envelope_stage_duration_seconds_bucket{stage="send",le="1.0"} 2' in text)
+        self.assertTrue('envelope_stage_duration_seconds_bucket{stage="send",le="+Inf"} 3' in text)
+        self.assertTrue('envelope_stage_duration_seconds_count{stage="send"} 3' in text)
+
+    def test_merge(self):
+        """
+        Snapshots of other processes add up.
+        """
+        self.registry.inc('envelope_sent_total', 2)
+        other = Registry(buckets=(0.1, 1.0))
+        other.inc('envelope_sent_total', 3)
+        self.registry.merge(other.snapshot())
+        self.assertTrue('envelope_sent_total 5' in self.registry.render())
+
+    def test_label_escaping(self):
+        """
+        Quotes in label values are escaped.
+        """
+        self.registry.inc('envelope_rejections_total', labels={'receiver': 'a"b'})
+        self.assertTrue('receiver="a\\"b"' in self.registry.render())
+
+
+class MarkProcessDeadTestCase(unittest.TestCase):
+    """
+    Unit tests for ``mark_process_dead()``.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, name, sent):
+        registry = Registry(buckets=(0.1, 1.0))
+        registry.inc('envelope_sent_total', sent)
+        registry.observe('envelope_stage_duration_seconds', 0.5)
+        with open(os.path.join(self.directory, name), 'w') as f:
+            json.dump(registry.snapshot(), f)
+
+    def test_fold(self):
+        """
+        Files of exited processes are replaced with one file holding their
+        sum.
+        """
+        self._write('envelope_1.json', 2)
+        self._write('envelope_2.json', 3)
+        self._write('envelope_3.json', 5)
+        mark_process_dead(1, self.directory)
+        mark_process_dead(2, self.directory)
+        mark_process_dead(4, self.directory)
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         ['envelope_3.json', 'envelope_dead.json'])
+        registry = Registry(buckets=(0.1, 1.0))
+        with open(os.path.join(self.directory, 'envelope_dead.json')) as f:
+            registry.merge(json.load(f))
+        text = registry.render()
+        self.assertTrue('envelope_sent_total 5\n' in text)
+        self.assertTrue('envelope_stage_duration_seconds_count 2\n' in text)
+
+    def test_partial_file(self):
+        """
+        An unreadable file is removed.
+        """
+        with open(os.path.join(self.directory, 'envelope_1.json'), 'w') as f:
+            f.write('{"buckets"')
+        mark_process_dead(1, self.directory)
+        self.assertEqual(os.listdir(self.directory), [])
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for replica routing.
+"""
+
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import router
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from mock import patch
+
+from envelope import routers, settings
+from envelope.models import PendingContactCounter
+from envelope.tests.models import Contact, create_tables
+
+
+class FakeRequest(object):
+    def __init__(self, cookies=None):
+        self.COOKIES = cookies or {}
+
+
+class FakeResponse(object):
+    def __init__(self):
+        self.cookies = {}
+
+    def set_cookie(self, key, value, **kwargs):
+        self.cookies[key] = value
+
+
+@patch('envelope.settings.REPLICA_DATABASE', 'replica')
+class ContactReplicaRouterTestCase(unittest.TestCase):
+    """
+    Unit tests for ``ContactReplicaRouter`` and the pinning middleware.
+    """
+
+    def setUp(self):
+        self.router = routers.ContactReplicaRouter()
+        self.middleware = routers.ReplicaPinningMiddleware()
+        self.middleware.process_request(FakeRequest())
+
+    def tearDown(self):
+        self.middleware.process_response(FakeRequest(), FakeResponse())
+
+    def test_reads_go_to_replica(self):
+        """
+        Envelope models are read from the replica, other models are not routed.
+        """
+        self.assertEqual(self.router.db_for_read(PendingContactCounter), 'replica')
+        self.assertEqual(self.router.db_for_read(FakeRequest), None)
+
+    def test_pinned_after_write(self):
+        """
+        After a write, reads go to the primary and the client gets a cookie.
+        """
+        routers.pin_after_write(PendingContactCounter)
+        self.assertEqual(self.router.db_for_read(PendingContactCounter), None)
+        response = self.middleware.process_response(FakeRequest(), FakeResponse())
+        self.assertTrue(routers.PIN_COOKIE_NAME in response.cookies)
+
+    def test_pinned_by_cookie(self):
+        """
+        A client with a fresh pin cookie reads from the primary.
+        """
+        pinned_until = str(routers.time.time() + 60)
+        self.middleware.process_request(FakeRequest({routers.PIN_COOKIE_NAME: pinned_until}))
+        self.assertEqual(self.router.db_for_read(PendingContactCounter), None)
+
+    def test_forged_cookie(self):
+        """
+        Pins are limited to ``ENVELOPE_REPLICA_PIN_SECONDS``, invalid ones
+        are ignored.
+        """
+        now = routers.time.time()
+        self.middleware.process_request(FakeRequest({routers.PIN_COOKIE_NAME: str(now + 10 ** 9)}))
+        self.assertTrue(routers._state.pinned_until <= now + 1 + settings.REPLICA_PIN_SECONDS)
+        for value in ('inf', 'nan', 'soon'):
+            self.middleware.process_request(FakeRequest({routers.PIN_COOKIE_NAME: value}))
+            self.assertEqual(self.router.db_for_read(PendingContactCounter), 'replica')
+
+    def test_other_models(self):
+        """
+        Writes of other models don't pin reads.
+        """
+        post_save.send(sender=User, instance=User(), created=True)
+        self.assertEqual(self.router.db_for_read(PendingContactCounter), 'replica')
+        post_save.send(sender=PendingContactCounter,
+                       instance=PendingContactCounter(), created=True)
+        self.assertEqual(self.router.db_for_read(PendingContactCounter), None)
+
+
+@patch('envelope.settings.REPLICA_DATABASE', 'replica')
+class ReplicaWriteTestCase(TestCase):
+    """
+    Unit tests for writes of contacts read from the replica.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ReplicaWriteTestCase, cls).setUpClass()
+
+    def tearDown(self):
+        routers.ReplicaPinningMiddleware().process_response(FakeRequest(), FakeResponse())
+
+    def test_save_on_primary(self):
+        """
+        A contact read from the replica is saved on the primary, and can
+        be related to objects of the primary.
+        """
+        user = User.objects.create(username='admin')
+        contact = Contact.objects.create(user_email='a@example.com', subject="Hello")
+        # as if it had been read from the replica
+        contact._state.db = 'replica'
+        with patch.object(router, 'routers', [routers.ContactReplicaRouter()]):
+            contact.updated_by = user
+            contact.subject = "Goodbye"
+            contact.save()
+        self.assertEqual(contact._state.db, 'default')
+        saved = Contact.objects.using('default').get(pk=contact.pk)
+        self.assertEqual(saved.subject, "Goodbye")
+        self.assertEqual(saved.updated_by, user)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for full-text search.
+"""
+
+import unittest
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.transaction import TransactionManagementError
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from mock import Mock, call, patch
+
+from envelope.models import ContactSearchTerm
+from envelope.search import (BACKENDS, TERM_MAX_LENGTH, _backend_cache,
+                             get_search_backend, search_contacts,
+                             setting_changed, tokenize)
+from envelope.tests.models import Contact, create_tables
+
+
+class TokenizeTestCase(unittest.TestCase):
+    """
+    Unit tests for ``tokenize()``.
+    """
+
+    def test_lowercase_unique_terms(self):
+        """
+        Terms are lowercased and deduplicated, punctuation is dropped.
+        """
+        self.assertEqual(tokenize("Hello, hello WORLD!"), set(['hello', 'world']))
+
+    def test_short_and_empty(self):
+        """
+        Single characters are not indexed and empty text gives no terms.
+        """
+        self.assertEqual(tokenize("a b cd"), set(['cd']))
+        self.assertEqual(tokenize(None), set())
+
+    def test_unicode_and_long_terms(self):
+        """
+        Non-ASCII words are kept and very long words are truncated.
+        """
+        self.assertEqual(tokenize("Zażółć gęślą"), set(['zażółć', 'gęślą']))
+        self.assertEqual(len(tokenize("x" * 200).pop()), TERM_MAX_LENGTH)
+
+
+class SearchBackendTestCase(TestCase):
+    """
+    Unit tests for the inverted index and the receivers keeping it up to
+    date.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(SearchBackendTestCase, cls).setUpClass()
+
+    def setUp(self):
+        _backend_cache.clear()
+
+    def tearDown(self):
+        _backend_cache.clear()
+
+    def test_search(self):
+        """
+        Contacts matching all words of the query are found.
+        """
+        first = Contact.objects.create(user_email='a@example.com',
+                                       subject="Broken invoice",
+                                       message_box="The invoice total is wrong.")
+        Contact.objects.create(user_email='b@example.com', subject="Invoice",
+                               message_box="Please send a copy.")
+        self.assertEqual(get_search_backend(Contact), BACKENDS['inverted'])
+        self.assertEqual(list(search_contacts(Contact.objects.all(), "INVOICE total")),
+                         [first])
+        self.assertEqual(search_contacts(Contact.objects.all(), "invoice").count(), 2)
+
+    def test_update_and_remove(self):
+        """
+        Saving a contact replaces its terms, deleting it removes them.
+        """
+        contact = Contact.objects.create(user_email='a@example.com',
+                                         subject="Hello", message_box="")
+        contact.subject = "Goodbye"
+        contact.save()
+        queryset = Contact.objects.all()
+        self.assertEqual(search_contacts(queryset, "hello").count(), 0)
+        self.assertEqual(search_contacts(queryset, "goodbye").count(), 1)
+        contact.delete()
+        self.assertFalse(ContactSearchTerm.objects.exists())
+
+    def test_other_models(self):
+        """
+        Other models are not indexed.
+        """
+        User.objects.create(username='hello')
+        self.assertFalse(ContactSearchTerm.objects.exists())
+
+    def test_database(self):
+        """
+        Terms are read from the database of the searched queryset.
+        """
+        manager = ContactSearchTerm.objects
+        with patch.object(manager, 'using', wraps=manager.using) as using:
+            BACKENDS['inverted'].filter(Contact.objects.using('other'), "hello")
+        using.assert_called_once_with('other')
+
+    @unittest.skipIf(setting_changed is None, "requires Django 1.8+")
+    def test_setting_changed(self):
+        """
+        The backend is chosen again when settings change.
+        """
+        get_search_backend(Contact)
+        self.assertTrue(_backend_cache)
+        with override_settings(ENVELOPE_SEARCH_BACKEND='inverted'):
+            self.assertFalse(_backend_cache)
+
+
+class PostgresSearchBackendTestCase(unittest.TestCase):
+    """
+    Unit tests for the GIN index backend, on a fake connection.
+    """
+
+    def setUp(self):
+        self.backend = BACKENDS['postgres']
+        self.connection = Mock(in_atomic_block=False)
+        self.connection.ops.quote_name = lambda name: '"%s"' % name
+        self.connection.get_autocommit.return_value = False
+        self.cursor = self.connection.cursor.return_value
+
+    def _install(self):
+        with patch('envelope.search.connections', {'default': self.connection}):
+            self.backend.install(Contact, 'default')
+
+    def test_install_concurrently(self):
+        """
+        The index is created concurrently, outside of a transaction, and
+        the backend cache is cleared.
+        """
+        _backend_cache['key'] = BACKENDS['inverted']
+        self._install()
+        sql, = self.cursor.execute.call_args[0]
+        self.assertTrue(sql.startswith('CREATE INDEX CONCURRENTLY "envelope_contact_fts" '
+                                       'ON "envelope_contact" USING gin'))
+        self.assertEqual(self.connection.set_autocommit.call_args_list,
+                         [call(True), call(False)])
+        self.assertFalse(_backend_cache)
+
+    def test_install_in_atomic(self):
+        """
+        The index can't be created concurrently inside a transaction.
+        """
+        self.connection.in_atomic_block = True
+        self.assertRaises(TransactionManagementError, self._install)
+        self.assertFalse(self.cursor.execute.called)
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "requires SQLite")
+class SqliteSearchBackendTestCase(unittest.TestCase):
+    """
+    Unit tests for the FTS5 backend.
+    """
+
+    def setUp(self):
+        create_tables()
+        self.backend = BACKENDS['sqlite']
+        _backend_cache.clear()
+
+    def tearDown(self):
+        _backend_cache.clear()
+        cursor = connection.cursor()
+        table = self.backend.get_table_name(Contact)
+        for suffix in ('_ai', '_ad', '_au'):
+            cursor.execute('DROP TRIGGER IF EXISTS %s' % (table + suffix))
+        cursor.execute('DROP TABLE IF EXISTS %s' % table)
+        Contact.objects.all().delete()
+        ContactSearchTerm.objects.all().delete()
+
+    def test_install_and_search(self):
+        """
+        Existing and new rows are indexed once the table is installed.
+        """
+        Contact.objects.create(user_email='a@example.com', subject="Broken invoice")
+        self.assertFalse(self.backend.is_installed(Contact, 'default'))
+        self.assertEqual(get_search_backend(Contact), BACKENDS['inverted'])
+        self.backend.install(Contact, 'default')
+        self.assertTrue(self.backend.is_installed(Contact, 'default'))
+        self.assertEqual(get_search_backend(Contact), self.backend)
+        Contact.objects.create(user_email='b@example.com', subject="Invoice copy")
+        queryset = Contact.objects.all()
+        self.assertEqual(search_contacts(queryset, "invoice").count(), 2)
+        self.assertEqual(search_contacts(queryset, "broken INVOICE").count(), 1)
+        self.assertEqual(search_contacts(queryset, "missing").count(), 0)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the slow submission log.
+"""
+
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from mock import patch
+
+from envelope import slowlog
+from envelope.models import SlowSubmission
+
+
+class SlowLogTestCase(TestCase):
+    """
+    Unit tests for recording slow submissions.
+    """
+    urls = 'envelope.tests.urls'
+
+    def setUp(self):
+        slowlog.clear()
+        self.addCleanup(slowlog.clear)
+
+    def post(self):
+        self.client.post(reverse('envelope-contact'), {
+            'sender': 'zbyszek',
+            'email': 'test@example.com',
+            'category': 10,
+            'subject': 'A subject',
+            'message': 'Hello there!',
+        })
+
+    def test_fast_submission(self):
+        """
+        A submission under the threshold is not recorded.
+        """
+        self.post()
+        self.assertEqual(slowlog.get_entries(), [])
+
+    @patch('envelope.slowlog.settings.SLOWLOG_DATABASE', True)
+    @patch('envelope.slowlog.settings.SLOWLOG_THRESHOLD', 0)
+    def test_slow_submission(self):
+        """
+        A submission over the threshold is recorded with its details.
+        """
+        self.post()
+        entry, = slowlog.get_entries()
+        self.assertEqual(entry['outcome'], 'sent')
+        self.assertEqual(entry['message_size'], len('Hello there!'))
+        self.assertTrue(entry['recipients'] >= 1)
+        self.assertTrue('send' in entry['stages'])
+        submission = SlowSubmission.objects.get()
+        self.assertEqual(submission.duration, entry['duration'])
+        self.assertEqual(set(submission.get_stages()), set(entry['stages']))
+
+    def test_worst(self):
+        """
+        The slowest recorded submissions come first.
+        """
+        for duration in (5, 50, 20):
+            slowlog.record({'duration': duration})
+        self.assertEqual([entry['duration'] for entry in slowlog.get_worst(2)],
+                         [50, 20])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for the local SMTP sink server.
+"""
+
+import unittest
+from smtplib import SMTPException
+
+from django.core import mail
+
+from envelope.smtp_sink import SMTPSinkServer
+
+
+class SMTPSinkServerTestCase(unittest.TestCase):
+    """
+    Unit tests for ``SMTPSinkServer``.
+    """
+
+    def send(self, server):
+        host, port = server.address
+        connection = mail.get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=host, port=port, username='', password='', use_tls=False,
+            fail_silently=False)
+        message = mail.EmailMessage('Subject', 'Body', 'from@example.com',
+                                    ['a@example.com', 'b@example.com'],
+                                    connection=connection)
+        return message.send()
+
+    def start(self, **kwargs):
+        server = SMTPSinkServer(('127.0.0.1', 0), **kwargs)
+        server.address = server.start()
+        self.addCleanup(server.stop)
+        return server
+
+    def test_receive(self):
+        """
+        Accepted messages are counted and passed to the callback.
+        """
+        received = []
+        server = self.start(on_message=lambda *args: received.append(args))
+        self.assertEqual(self.send(server), 1)
+        self.assertEqual(server.stats['messages'], 1)
+        self.assertEqual(server.stats['recipients'], 2)
+        mail_from, recipients, size = received[0]
+        self.assertEqual(mail_from, '<from@example.com>')
+        self.assertEqual(recipients, ['<a@example.com>', '<b@example.com>'])
+        self.assertTrue(size > 0)
+
+    def test_failure(self):
+        """
+        Commands can be answered with a temporary failure.
+        """
+        server = self.start(failure_rate=1)
+        with self.assertRaises(SMTPException):
+            self.send(server)
+        self.assertEqual(server.stats['messages'], 0)
+
+    def test_drop(self):
+        """
+        Connections can be closed instead of answering a command.
+        """
+        server = self.start(drop_rate=1)
+        with self.assertRaises(SMTPException):
+            self.send(server)
+        self.assertEqual(server.stats['dropped'], 1)
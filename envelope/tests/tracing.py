@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for tracing spans.
+"""
+
+import django
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+
+from mock import patch
+
+from envelope import signals, tracing
+
+
+class RecordingSpan(object):
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = dict(attributes or {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+
+class RecordingTracer(object):
+    enabled = True
+
+    def __init__(self):
+        self.spans = []
+
+    def span(self, name, attributes=None):
+        span = RecordingSpan(name, attributes)
+        self.spans.append(span)
+        return span
+
+
+class TracingTestCase(TestCase):
+    """
+    Unit tests for spans around the contact form pipeline.
+    """
+    urls = 'envelope.tests.urls'
+
+    def setUp(self):
+        self.tracer = RecordingTracer()
+        patcher = patch.object(tracing, '_tracer', self.tracer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_noop_tracer(self):
+        tracer = tracing.NoopTracer()
+        with tracer.span('envelope.send') as span:
+            span.set_attribute('envelope.recipients', 1)
+        self.assertTrue(span is tracing.NOOP_SPAN)
+
+    def test_send_signal(self):
+        """
+        Every receiver is called in its own span.
+        """
+        def accept(sender, **kwargs):
+            return True
+
+        def reject(sender, **kwargs):
+            return False
+
+        signals.before_send.connect(accept)
+        signals.before_send.connect(reject)
+        try:
+            responses = tracing.send_signal(signals.before_send, sender=None,
+                                            request=None, form=None)
+        finally:
+            signals.before_send.disconnect(accept)
+            signals.before_send.disconnect(reject)
+        self.assertEqual(responses[-2:], [(accept, True), (reject, False)])
+        spans = [span.attributes for span in self.tracer.spans][-2:]
+        self.assertEqual(spans, [
+            {'envelope.receiver': 'accept', 'envelope.accepted': True},
+            {'envelope.receiver': 'reject', 'envelope.accepted': False},
+        ])
+
+    def test_live_receivers(self):
+        """
+        The receivers are found on the supported Django versions, which
+        include the running one.
+        """
+        first, last = tracing.LIVE_RECEIVERS_VERSIONS
+        self.assertTrue(first <= django.VERSION[:2] < last)
+
+        def accept(sender, **kwargs):
+            return True
+
+        signals.before_send.connect(accept, sender=RecordingTracer)
+        try:
+            self.assertTrue(accept in tracing.live_receivers(signals.before_send,
+                                                             RecordingTracer))
+            self.assertFalse(accept in tracing.live_receivers(signals.before_send, None))
+        finally:
+            signals.before_send.disconnect(accept, sender=RecordingTracer)
+
+    def test_unsupported_version(self):
+        """
+        On other Django versions, the signal is sent without receiver spans.
+        """
+        def accept(sender, **kwargs):
+            return True
+
+        signals.before_send.connect(accept)
+        try:
+            with patch.object(tracing, 'LIVE_RECEIVERS_VERSIONS', ((1, 4), (1, 5))):
+                self.assertEqual(tracing.live_receivers(signals.before_send, None), None)
+                responses = tracing.send_signal(signals.before_send, sender=None,
+                                                request=None, form=None)
+        finally:
+            signals.before_send.disconnect(accept)
+        self.assertTrue((accept, True) in responses)
+        self.assertEqual(self.tracer.spans, [])
+
+    def test_submission(self):
+        """
+        A submission is traced stage by stage.
+        """
+        self.client.post(reverse('envelope-contact'), {
+            'sender': 'zbyszek',
+            'email': 'test@example.com',
+            'category': 10,
+            'subject': 'A subject',
+            'message': 'Hello there!',
+        })
+        spans = dict((span.name, span.attributes) for span in self.tracer.spans)
+        for name in ('validation', 'before_send', 'render', 'send'):
+            self.assertTrue('envelope.' + name in spans)
+        self.assertEqual(spans['envelope.submission']['envelope.outcome'], 'sent')
+        self.assertEqual(spans['envelope.submission']['envelope.category'], '10')
+        self.assertTrue(spans['envelope.send']['envelope.recipients'] >= 1)
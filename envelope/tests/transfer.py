@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Unit tests for contact import and export helpers.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from envelope.counters import get_pending_count
+from envelope.managers import PENDING
+from envelope.search import search_contacts
+from envelope.tests.models import Company, Contact, create_tables
+from envelope.transfer import (iter_csv_rows, iter_jsonl_rows,
+                               iter_csv_lines, iter_jsonl_lines,
+                               iter_export_rows, streaming_export_response)
+from envelope.utils import chunked, iter_keyset
+
+
+class ReadersTestCase(unittest.TestCase):
+    """
+    Unit tests for CSV and JSONL row readers.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'wb') as f:
+            f.write(content.encode('utf-8'))
+        return path
+
+    def test_csv_rows(self):
+        """
+        CSV rows are returned as dictionaries keyed by the header.
+        """
+        path = self._write('rows.csv', 'sender,email\nme,test@example.com\nZażółć,a@example.com\n')
+        rows = list(iter_csv_rows(path))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['email'], 'test@example.com')
+        self.assertEqual(rows[1]['sender'], 'Zażółć')
+
+    def test_jsonl_rows(self):
+        """
+        Every non-blank line of a JSONL file is a separate row.
+        """
+        path = self._write('rows.jsonl', '{"sender": "me"}\n\n{"sender": "you"}\n')
+        rows = list(iter_jsonl_rows(path))
+        self.assertEqual([row['sender'] for row in rows], ['me', 'you'])
+
+    def test_chunked(self):
+        """
+        chunked() splits an iterable into lists of a given maximum size.
+        """
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+
+
+class WritersTestCase(unittest.TestCase):
+    """
+    Unit tests for CSV and JSONL line formatters.
+    """
+
+    def setUp(self):
+        self.rows = [['sender', 'email'], ['me', 'test@example.com']]
+
+    def test_csv_lines(self):
+        """
+        Every row becomes a separate CSV line.
+        """
+        lines = list(iter_csv_lines(self.rows))
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('me,test@example.com'))
+
+    def test_jsonl_lines(self):
+        """
+        The header row provides keys for the JSON objects.
+        """
+        lines = list(iter_jsonl_lines(self.rows))
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0]), {'sender': 'me', 'email': 'test@example.com'})
+
+
+class ImportCommandTestCase(TestCase):
+    """
+    Unit tests for the ``envelope_import`` command.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ImportCommandTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'contacts.jsonl')
+        with open(self.path, 'w') as f:
+            for subject in ("Broken invoice", "Hello"):
+                f.write(json.dumps({'sender': 'me', 'email': 'test@example.com',
+                                    'subject': subject, 'message': "Hi there!",
+                                    'state': PENDING}) + '\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_rebuild(self):
+        """
+        Counters and the search index are rebuilt after the import.
+        """
+        call_command('envelope_import', 'envelope.Contact', self.path,
+                     chunk_size=1, stdout=StringIO())
+        self.assertEqual(Contact.objects.count(), 2)
+        self.assertEqual(get_pending_count(Contact), 2)
+        self.assertEqual(search_contacts(Contact.objects.all(), "invoice").get().subject,
+                         "Broken invoice")
+
+    def test_no_rebuild(self):
+        """
+        With ``--no-rebuild``, the counters are left alone.
+        """
+        call_command('envelope_import', 'envelope.Contact', self.path,
+                     rebuild=False, stdout=StringIO())
+        self.assertEqual(Contact.objects.count(), 2)
+        self.assertEqual(get_pending_count(Contact), 0)
+
+
+class ExportTestCase(TestCase):
+    """
+    Unit tests for chunked exports and the ``envelope_export`` command.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ExportTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        user = User.objects.create(username='admin')
+        company = Company.objects.create(name="ACME")
+        self.contacts = [
+            Contact.objects.create(user_email='%d@example.com' % i, company=company,
+                                   created_by=user, subject="Subject %d" % i)
+            for i in range(5)
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_iter_keyset(self):
+        """
+        Chunks follow each other in primary key order, one query each, and
+        keep the related objects of the queryset.
+        """
+        queryset = Contact.objects.select_related('company').order_by('-pk')
+        # three chunks and the empty query ending the last one
+        with self.assertNumQueries(4):
+            chunks = list(iter_keyset(queryset, chunk_size=2))
+            self.assertEqual([contact.company.name for contact in chunks[0]],
+                             ["ACME", "ACME"])
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual([contact.pk for chunk in chunks for contact in chunk],
+                         [contact.pk for contact in self.contacts])
+
+    def test_iter_export_rows(self):
+        """
+        Rows of all chunks follow the header, related objects are fetched
+        with the contacts.
+        """
+        fields = ['user_email', 'subject', 'created_by']
+        with self.assertNumQueries(4):
+            rows = list(iter_export_rows(Contact.objects.all(), fields, chunk_size=2))
+        self.assertEqual(rows[0], fields)
+        self.assertEqual(rows[1:], [['%d@example.com' % i, "Subject %d" % i, 'admin']
+                                    for i in range(5)])
+
+    def test_streaming_export_response(self):
+        """
+        The response streams one JSONL line per contact.
+        """
+        response = streaming_export_response(Contact.objects.all(), 'jsonl',
+                                             fields=['user_email'], chunk_size=2)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename="envelope_contact.jsonl"')
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual([json.loads(line) for line in content.splitlines()],
+                         [{'user_email': '%d@example.com' % i} for i in range(5)])
+
+    def test_command(self):
+        """
+        The command writes every chunk to standard output or to a file.
+        """
+        out = StringIO()
+        call_command('envelope_export', 'envelope.Contact', chunk_size=2, stdout=out)
+        rows = list(csv.reader(out.getvalue().splitlines()))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual([row[rows[0].index('subject')] for row in rows[1:]],
+                         ["Subject %d" % i for i in range(5)])
+
+        path = os.path.join(self.tmpdir, 'contacts.jsonl')
+        call_command('envelope_export', 'envelope.Contact', format='jsonl',
+                     output=path, chunk_size=2, stdout=StringIO())
+        with io.open(path, encoding='utf-8') as f:
+            exported = [json.loads(line) for line in f]
+        response = streaming_export_response(Contact.objects.all(), 'jsonl')
+        streamed = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(exported, [json.loads(line) for line in streamed.splitlines()])
+        self.assertEqual([row['user_email'] for row in exported],
+                         ['%d@example.com' % i for i in range(5)])
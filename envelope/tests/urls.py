@@ -5,7 +5,8 @@ except ImportError:
     # Django 1.4 and 1.5
     from django.conf.urls.defaults import patterns, include, url
 
-from envelope.views import ContactView
+from envelope.tests.models import Contact
+from envelope.views import AttachmentContactView, ContactInboxView, ContactView
 
 
 class SubclassedContactView(ContactView):
@@ -28,4 +29,19 @@ urlpatterns = patterns('',
         SubclassedContactView.as_view(),
         name='subclassed_class_contact'
     ),
+
+    url(r'^limited_class_contact/',
+        ContactView.as_view(max_request_size=2000),
+        name='limited_class_contact'
+    ),
+
+    url(r'^attachment_contact/',
+        AttachmentContactView.as_view(),
+        name='attachment_contact'
+    ),
+
+    url(r'^inbox/',
+        ContactInboxView.as_view(model=Contact, page_size=2),
+        name='contact_inbox'
+    ),
 )
@@ -13,8 +13,9 @@ from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.utils import override_settings
-from django.utils import unittest
+from django.utils import timezone, unittest
 from django.utils.translation import ugettext_lazy as _
+from mock import patch
 
 try:
     import honeypot
@@ -22,6 +23,8 @@ except ImportError:
     honeypot = None
 
 from envelope import signals
+from envelope.managers import encode_cursor
+from envelope.tests.models import Company, Contact, create_tables
 
 
 test_templates = (
@@ -141,6 +144,23 @@ class ContactViewTestCase(TestCase):
         self.client.post(self.url, self.form_data, follow=True)
         self.assertEqual(params['form'].cleaned_data['email'], self.form_data['email'])
 
+    def test_rejected_by_callable(self):
+        """
+        A ``before_send`` receiver without a ``__name__`` may reject the
+        message.
+        """
+        class Reject(object):
+            def __call__(self, sender, **kwargs):
+                return False
+
+        receiver = Reject()
+        signals.before_send.connect(receiver, weak=False)
+        try:
+            response = self.client.post(self.url, self.form_data)
+        finally:
+            signals.before_send.disconnect(receiver)
+        self.assertContains(response, "Rejected by", status_code=400)
+
     def test_signal_after_send(self):
         """
         An ``after_send`` signal is sent after succesfully sending the message.
@@ -154,6 +174,38 @@ class ContactViewTestCase(TestCase):
         self.client.post(self.url, self.form_data, follow=True)
         self.assertIn(self.form_data['subject'], params['message'].subject)
 
+    def test_email_body_not_escaped(self):
+        """
+        The plain text email body contains the message as it was written.
+        """
+        params = {}
+
+        def handle_after_send(sender, message, form, **kwargs):
+            params['message'] = message
+
+        signals.after_send.connect(handle_after_send)
+        try:
+            self.form_data['message'] = 'Tom & Jerry <3'
+            self.client.post(self.url, self.form_data)
+        finally:
+            signals.after_send.disconnect(handle_after_send)
+        self.assertIn('Tom & Jerry <3', params['message'].body)
+
+    def test_max_request_size(self):
+        """
+        Requests larger than max_request_size are refused before parsing,
+        and counted apart from rejections.
+        """
+        url = reverse('limited_class_contact')
+        self.form_data['message'] = 'x' * 2000
+        with patch('envelope.instrumentation.increment') as increment:
+            response = self.client.post(url, self.form_data)
+        self.assertEqual(response.status_code, 413)
+        increment.assert_called_once_with('too_large')
+        self.form_data['message'] = 'x'
+        response = self.client.post(url, self.form_data)
+        self.assertEqual(response.status_code, 302)
+
     def test_custom_template(self):
         """
         You can change the default template used to render the form.
@@ -177,3 +229,93 @@ class ContactViewTestCase(TestCase):
         self.form_data.update({self.honeypot: 'some value'})
         response = self.client.post(self.subclassed_url, self.form_data, follow=True)
         self.assertEqual(response.status_code, 400)
+
+
+@override_settings(TEMPLATE_DIRS=test_templates)
+class ContactInboxViewTestCase(TestCase):
+    """
+    Unit tests for the cursor-paginated contact inbox.
+    """
+    urls = 'envelope.tests.urls'
+
+    @classmethod
+    def setUpClass(cls):
+        create_tables()
+        super(ContactInboxViewTestCase, cls).setUpClass()
+
+    def setUp(self):
+        self.url = reverse('contact_inbox')
+        User.objects.create_superuser('admin', 'admin@example.com', 'secret')
+        self.client.login(username='admin', password='secret')
+        self.company = Company.objects.create(name="ACME")
+        self.contacts = [
+            Contact.objects.create(user_email='%d@example.com' % i, state=state,
+                                   company=company)
+            for i, (state, company) in enumerate([
+                (2, self.company), (1, self.company), (2, None), (2, self.company)])
+        ]
+        # the same creation date for all, pages are split on primary keys
+        Contact.objects.update(created=timezone.now())
+
+    def _emails(self, response):
+        return [contact.user_email for contact in response.context['object_list']]
+
+    def test_pages(self):
+        """
+        Contacts are listed newest first, the next page follows the cursor.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'envelope/inbox.html')
+        self.assertEqual(self._emails(response), ['3@example.com', '2@example.com'])
+        self.assertEqual(response.context['next_cursor'],
+                         encode_cursor(Contact.objects.get(user_email='2@example.com')))
+        response = self.client.get(self.url + '?' + response.context['next_page_query'])
+        self.assertEqual(self._emails(response), ['1@example.com', '0@example.com'])
+        self.assertEqual(response.context['next_cursor'], None)
+
+    def test_filters(self):
+        """
+        Contacts can be filtered by state and company; invalid values give
+        an empty list.
+        """
+        response = self.client.get(self.url, {'state': 2, 'company': self.company.pk})
+        self.assertEqual(self._emails(response), ['3@example.com', '0@example.com'])
+        response = self.client.get(self.url, {'state': 1})
+        self.assertEqual(self._emails(response), ['1@example.com'])
+        response = self.client.get(self.url, {'company': 'acme'})
+        self.assertEqual(self._emails(response), [])
+
+    def test_company_filter_without_field(self):
+        """
+        The company filter is ignored for models without a ``company`` field.
+        """
+        with patch('envelope.views.has_field', return_value=False):
+            response = self.client.get(self.url, {'state': 2, 'company': 'acme'})
+        self.assertEqual(self._emails(response), ['3@example.com', '2@example.com'])
+
+    def test_staff_only(self):
+        """
+        Users who aren't staff are sent to the login page.
+        """
+        User.objects.create_user('visitor', 'visitor@example.com', 'secret')
+        self.client.login(username='visitor', password='secret')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(settings.LOGIN_URL in response['Location'])
+
+    def test_filtered_pages(self):
+        """
+        Filters are kept in the query string of the next page.
+        """
+        response = self.client.get(self.url, {'state': 2})
+        self.assertEqual(self._emails(response), ['3@example.com', '2@example.com'])
+        response = self.client.get(self.url + '?' + response.context['next_page_query'])
+        self.assertEqual(self._emails(response), ['0@example.com'])
+
+    def test_bad_cursor(self):
+        """
+        A malformed cursor is a bad request.
+        """
+        response = self.client.get(self.url, {'cursor': 'not a cursor'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Tracing spans around the stages of contact form processing.
+
+Every stage measured by :class:`~envelope.instrumentation.StageTimer` is
+wrapped in a span, and so is every ``before_send`` receiver. With
+``ENVELOPE_TRACER = 'auto'`` (the default) spans go to OpenTelemetry if the
+``opentelemetry-api`` package is installed; otherwise a no-op tracer is
+used, which allocates nothing per span.
+"""
+
+import django
+
+from envelope import settings
+from envelope.utils import get_receiver_name, load_object
+
+
+class NoopSpan(object):
+    """
+    Span which does nothing, shared by all no-op spans.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set_attribute(self, key, value):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class NoopTracer(object):
+    """
+    Tracer used when tracing is disabled.
+
+    A custom tracer implements the same interface: ``span()`` returns a
+    context manager which yields an object with ``set_attribute()``.
+    """
+    enabled = False
+
+    def span(self, name, attributes=None):
+        return NOOP_SPAN
+
+
+class OpenTelemetrySpan(object):
+    """
+    Wraps an OpenTelemetry span started as the current span.
+    """
+
+    def __init__(self, tracer, name, attributes):
+        self.manager = tracer.start_as_current_span(name, attributes=attributes)
+        self.span = None
+
+    def __enter__(self):
+        self.span = self.manager.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self.manager.__exit__(exc_type, exc_value, traceback)
+
+    def set_attribute(self, key, value):
+        # OpenTelemetry only accepts primitive values
+        if value is not None:
+            self.span.set_attribute(key, value)
+
+
+class OpenTelemetryTracer(object):
+    """
+    Sends spans to the global OpenTelemetry tracer provider, as children of
+    the current (request) span.
+    """
+    enabled = True
+
+    def __init__(self):
+        from opentelemetry import trace
+        self.tracer = trace.get_tracer('envelope')
+
+    def span(self, name, attributes=None):
+        if attributes:
+            attributes = dict((key, value) for key, value in attributes.items()
+                              if value is not None)
+        return OpenTelemetrySpan(self.tracer, name, attributes)
+
+
+_tracer = None
+
+
+def get_tracer():
+    """
+    Returns the tracer selected by ``ENVELOPE_TRACER``.
+    """
+    global _tracer
+    if _tracer is None:
+        path = settings.TRACER
+        if not path:
+            _tracer = NoopTracer()
+        elif path == 'auto':
+            try:
+                _tracer = OpenTelemetryTracer()
+            except ImportError:
+                _tracer = NoopTracer()
+        else:
+            _tracer = load_object(path)()
+    return _tracer
+
+
+# Django versions (from, up to but excluding) whose private
+# Signal._live_receivers() live_receivers() knows how to call
+LIVE_RECEIVERS_VERSIONS = ((1, 4), (6, 0))
+
+
+def live_receivers(signal, sender):
+    """
+    Returns the receivers the signal would call for the sender, or ``None``
+    if they can't be told apart.
+
+    This relies on the private ``Signal._live_receivers()``, whose
+    signature changes between Django versions, so other versions (and
+    asynchronous receivers on Django 5.0+) give ``None``.
+    """
+    first, last = LIVE_RECEIVERS_VERSIONS
+    if not first <= django.VERSION[:2] < last or \
+            not hasattr(signal, '_live_receivers'):
+        return None
+    if django.VERSION < (1, 6):  # pragma: no cover
+        from django.dispatch.dispatcher import _make_id
+        return signal._live_receivers(_make_id(sender))
+    receivers = signal._live_receivers(sender)
+    if django.VERSION >= (5, 0):  # pragma: no cover
+        sync_receivers, async_receivers = receivers
+        return None if async_receivers else sync_receivers
+    return receivers
+
+
+def send_signal(signal, sender, **named):
+    """
+    Sends the signal like ``signal.send()``, calling every receiver in its
+    own span when tracing is enabled and :func:`live_receivers` can tell
+    them apart.
+    """
+    tracer = get_tracer()
+    receivers = live_receivers(signal, sender) if tracer.enabled else None
+    if receivers is None:
+        return signal.send(sender=sender, **named)
+    responses = []
+    for receiver in receivers:
+        name = get_receiver_name(receiver)
+        with tracer.span('envelope.receiver',
+                         {'envelope.receiver': name}) as span:
+            response = receiver(signal=signal, sender=sender, **named)
+            span.set_attribute('envelope.accepted', bool(response))
+        responses.append((receiver, response))
+    return responses
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Streaming import and export of contact records as CSV and JSONL.
+"""
+
+import csv
+import io
+import json
+import time
+from contextlib import contextmanager
+
+from django import db
+from django.db import models
+from django.utils import six, timezone
+
+from envelope.managers import RELATED_FIELDS
+from envelope.utils import atomic, chunked, has_field, iter_keyset
+
+
+# Maps contact form fields to the matching contact model fields.
+FORM_FIELD_MAP = (
+    ('sender', 'user_name'),
+    ('email', 'user_email'),
+    ('subject', 'subject'),
+    ('message', 'message_box'),
+)
+
+
+def iter_csv_rows(path, encoding='utf-8'):
+    """
+    Yields rows of a CSV file (with a header line) as dictionaries.
+    """
+    if six.PY3:
+        with io.open(path, 'r', encoding=encoding, newline='') as f:
+            for row in csv.DictReader(f):
+                yield row
+    else:  # pragma: no cover
+        with open(path, 'rb') as f:
+            for row in csv.DictReader(f):
+                yield dict((key.decode(encoding), (value or b'').decode(encoding))
+                           for key, value in row.items())
+
+
+def iter_jsonl_rows(path, encoding='utf-8'):
+    """
+    Yields rows of a JSONL file (one JSON object per line) as dictionaries.
+    Blank lines are skipped.
+    """
+    with io.open(path, 'r', encoding=encoding) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+READERS = {
+    'csv': iter_csv_rows,
+    'jsonl': iter_jsonl_rows,
+}
+
+
+@contextmanager
+def preserved_timestamps(model):
+    """
+    Temporarily disables ``auto_now`` and ``auto_now_add`` on the model's
+    date fields, so that imported rows keep their historical timestamps.
+    """
+    changed = []
+    for field in model._meta.fields:
+        if isinstance(field, models.DateField):
+            changed.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class ContactImporter(object):
+    """
+    Validates rows with an envelope form and inserts them into a contact
+    model with chunked ``bulk_create()`` calls.
+
+    Each chunk is written in its own transaction, so memory usage and lock
+    duration depend only on ``chunk_size``, not on the size of the input.
+
+    ``progress``, if given, is called after every chunk with the number of
+    imported rows, the number of rejected rows and the elapsed time.
+    ``on_error``, if given, is called for every rejected row with its
+    (1-based) row number and the form errors.
+    """
+
+    def __init__(self, model, form_class, chunk_size=1000, progress=None,
+                 on_error=None):
+        self.model = model
+        self.form_class = form_class
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.on_error = on_error
+        self.imported = 0
+        self.rejected = 0
+        self.fields = dict((field.attname, field)
+                           for field in model._meta.fields
+                           if not field.primary_key)
+        self.field_map = [(form_field, model_field)
+                          for form_field, model_field in FORM_FIELD_MAP
+                          if model_field in self.fields]
+        # read before preserved_timestamps() turns the flags off
+        self.auto_now_fields = [name for name, field in self.fields.items()
+                                if isinstance(field, models.DateField) and
+                                (field.auto_now or field.auto_now_add)]
+
+    def build_instance(self, row, cleaned_data):
+        """
+        Creates an unsaved model instance out of a validated row.
+
+        Values of the form fields are mapped to model fields through
+        ``FORM_FIELD_MAP``; any other column named after a model field
+        (for example ``company_id`` or ``state``) is converted with that
+        field's ``to_python()``.
+        """
+        kwargs = {}
+        for name, value in row.items():
+            field = self.fields.get(name)
+            if field is None:
+                continue
+            if value in ('', None) and field.null:
+                kwargs[name] = None
+            else:
+                kwargs[name] = field.to_python(value)
+        for form_field, model_field in self.field_map:
+            kwargs[model_field] = cleaned_data[form_field]
+        now = timezone.now()
+        for name in self.auto_now_fields:
+            if kwargs.get(name) is None:
+                kwargs[name] = now
+        return self.model(**kwargs)
+
+    def iter_instances(self, rows):
+        for number, row in enumerate(rows, 1):
+            form = self.form_class(row)
+            if form.is_valid():
+                yield self.build_instance(row, form.cleaned_data)
+            else:
+                self.rejected += 1
+                if self.on_error:
+                    self.on_error(number, form.errors)
+
+    def run(self, rows):
+        """
+        Imports all rows and returns a tuple of imported and rejected
+        row counts.
+        """
+        start = time.time()
+        with preserved_timestamps(self.model):
+            for chunk in chunked(self.iter_instances(rows), self.chunk_size):
+                with atomic():
+                    self.model.objects.bulk_create(chunk)
+                self.imported += len(chunk)
+                # with DEBUG = True every query would be kept in memory
+                db.reset_queries()
+                if self.progress:
+                    self.progress(self.imported, self.rejected,
+                                  time.time() - start)
+        return self.imported, self.rejected
+
+
+def get_export_fields(model):
+    """
+    Returns names of the model fields included in an export.
+    """
+    return [field.name for field in model._meta.fields]
+
+
+def _export_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return six.text_type(value)
+
+
+def iter_export_rows(queryset, fields=None, chunk_size=1000):
+    """
+    Yields rows (lists of strings) for every object in the queryset,
+    starting with a header row.
+
+    Objects are fetched in primary key order, ``chunk_size`` at a time, so
+    exports of any size run in constant memory. Foreign keys are exported
+    as their string representation.
+    """
+    model = queryset.model
+    fields = fields or get_export_fields(model)
+    related = [name for name in RELATED_FIELDS
+               if name in fields and has_field(model, name)]
+    if related:
+        queryset = queryset.select_related(*related)
+    yield list(fields)
+    for chunk in iter_keyset(queryset, chunk_size):
+        for obj in chunk:
+            yield [_export_value(getattr(obj, name)) for name in fields]
+
+
+class Echo(object):
+    """
+    File-like object which returns whatever is written to it, which lets
+    ``csv.writer`` produce lines one at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv_lines(rows):
+    """
+    Formats rows as CSV lines.
+    """
+    writer = csv.writer(Echo())
+    for row in rows:
+        if six.PY3:
+            yield writer.writerow(row)
+        else:  # pragma: no cover
+            yield writer.writerow([value.encode('utf-8') for value in row])
+
+
+def iter_jsonl_lines(rows):
+    """
+    Formats rows as JSONL lines; the first row is used as the keys.
+    """
+    rows = iter(rows)
+    header = next(rows)
+    for row in rows:
+        yield json.dumps(dict(zip(header, row))) + '\n'
+
+
+WRITERS = {
+    'csv': (iter_csv_lines, 'text/csv'),
+    'jsonl': (iter_jsonl_lines, 'application/x-ndjson'),
+}
+
+
+def streaming_export_response(queryset, export_format='csv', fields=None,
+                              chunk_size=1000, filename=None):
+    """
+    Returns a streaming HTTP response with the queryset exported as CSV or
+    JSONL.
+    """
+    try:
+        # Django 1.5+
+        from django.http import StreamingHttpResponse as Response
+    except ImportError:  # pragma: no cover
+        from django.http import HttpResponse as Response
+    line_formatter, content_type = WRITERS[export_format]
+    lines = line_formatter(iter_export_rows(queryset, fields, chunk_size))
+    response = Response(lines, content_type=content_type)
+    if filename is None:
+        filename = '%s.%s' % (queryset.model._meta.db_table, export_format)
+    response['Content-Disposition'] = 'attachment; filename="%s"' % filename
+    return response
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Upload handlers for contact form attachments.
+"""
+
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from django.utils.translation import ugettext as _
+
+from envelope import settings
+
+
+class LimitedTemporaryFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams every uploaded file to a temporary file on disk, and stops
+    the upload as soon as there are too many files or a file grows past
+    the size limit.
+
+    The reason of a stopped upload is stored in the
+    ``envelope_upload_error`` attribute of the request.
+    """
+
+    def __init__(self, request=None, max_count=None, max_size=None):
+        super(LimitedTemporaryFileUploadHandler, self).__init__(request)
+        self.max_count = max_count or settings.ATTACHMENTS_MAX_COUNT
+        self.max_size = max_size or settings.ATTACHMENT_MAX_SIZE
+        self.count = 0
+        self.size = 0
+
+    def handle_raw_input(self, input_data, META, content_length, boundary,
+                         encoding=None):
+        # the whole request is too big, don't even start reading it
+        if content_length > self.max_count * self.max_size + 1024 * 1024:
+            self.set_error(_("The attachments are too large."))
+            return QueryDict('', encoding=encoding), MultiValueDict()
+
+    def new_file(self, *args, **kwargs):
+        self.count += 1
+        self.size = 0
+        if self.count > self.max_count:
+            self.reject(_("You can attach at most %d files.") % self.max_count)
+        return super(LimitedTemporaryFileUploadHandler, self).new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.size > self.max_size:
+            self.reject(_("Each attachment must be smaller than %d kB.") %
+                        (self.max_size // 1024))
+        return super(LimitedTemporaryFileUploadHandler, self).receive_data_chunk(raw_data, start)
+
+    def set_error(self, reason):
+        if self.request is not None:
+            self.request.envelope_upload_error = reason
+
+    def reject(self, reason):
+        self.set_error(reason)
+        # the rest of the request body is read and discarded, so that the
+        # client gets a proper response with the error
+        raise StopUpload(connection_reset=False)
@@ -7,9 +7,17 @@ except ImportError:  # pragma: no cover
     # Django 1.4 and 1.5
     from django.conf.urls.defaults import patterns, url
 
+from envelope import settings
 from envelope.views import ContactView
 
 
 urlpatterns = patterns('',
     url(r'^$', ContactView.as_view(), name='envelope-contact'),
 )
+
+if settings.PROMETHEUS_ENDPOINT:
+    from envelope.prometheus import metrics_view
+
+    urlpatterns += patterns('',
+        url(r'^metrics/$', metrics_view, name='envelope-metrics'),
+    )
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+"""
+Helpers shared by the tooling built around the contact models.
+"""
+
+try:
+    from importlib import import_module
+except ImportError:  # pragma: no cover
+    # Python 2.6
+    from django.utils.importlib import import_module
+
+
+def atomic(*args, **kwargs):
+    """
+    ``transaction.atomic()``, or ``commit_on_success()`` on Django < 1.6.
+
+    The ORM is imported on first use, so that modules which only need
+    the other helpers stay cheap to import.
+    """
+    from django.db import transaction
+    try:
+        # Django 1.6+
+        function = transaction.atomic
+    except AttributeError:  # pragma: no cover
+        # Django 1.4 and 1.5
+        function = transaction.commit_on_success
+    return function(*args, **kwargs)
+
+
+def _get_all_models():
+    try:
+        # Django 1.7+
+        from django.apps import apps
+        return apps.get_models()
+    except ImportError:  # pragma: no cover
+        from django.db import models
+        return models.get_models()
+
+
+def get_contact_models():
+    """
+    Returns a list of concrete models derived from
+    :class:`envelope.models.BaseContact`.
+    """
+    from envelope.models import BaseContact
+    return [model for model in _get_all_models()
+            if issubclass(model, BaseContact) and not model._meta.proxy]
+
+
+def get_contact_model(label):
+    """
+    Returns the contact model for a label such as
+    ``"envelope.CompanyContact"``.
+
+    Raises ``ValueError`` if the label doesn't point to a concrete
+    subclass of :class:`envelope.models.BaseContact`.
+    """
+    try:
+        app_label, model_name = label.split('.')
+    except ValueError:
+        raise ValueError("Expected a model label like 'app_label.ModelName', "
+                         "got %r." % label)
+    for model in get_contact_models():
+        if (model._meta.app_label == app_label and
+                model._meta.object_name.lower() == model_name.lower()):
+            return model
+    raise ValueError("%r is not a contact model." % label)
+
+
+def has_field(model, name):
+    """
+    Checks whether the model has a concrete field with the given name.
+    """
+    return name in [field.name for field in model._meta.fields]
+
+
+def chunked(iterable, size):
+    """
+    Splits an iterable into lists of at most ``size`` elements, without
+    consuming more than one chunk at a time.
+    """
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def load_object(path):
+    """
+    Imports an object given its dotted path, like
+    ``"envelope.forms.ContactForm"``.
+    """
+    module_name, _, attr = path.rpartition('.')
+    try:
+        return getattr(import_module(module_name), attr)
+    except (ImportError, AttributeError, ValueError) as e:
+        raise ImportError("Could not import %r: %s" % (path, e))
+
+
+def get_receiver_name(receiver):
+    """
+    Returns a readable name for a signal receiver, which may also be a
+    ``functools.partial`` or a callable instance without ``__name__``.
+    """
+    return getattr(receiver, '__name__', repr(receiver))
+
+
+def iter_keyset(queryset, chunk_size=1000):
+    """
+    Yields lists of objects from the queryset ordered by primary key.
+
+    Each chunk is fetched with a ``pk > last_pk`` condition instead of an
+    offset, so every query stays cheap no matter how deep into the table
+    it goes, and only one chunk is held in memory at a time.
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        page = queryset
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
@@ -7,15 +7,23 @@ Views used to process the contact form.
 """
 
 import logging
+from timeit import default_timer
+
 from django.contrib import messages
-from django.http import HttpResponseBadRequest
+from django.contrib.auth.decorators import user_passes_test
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.shortcuts import redirect
-from django.views.generic import FormView
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.generic import FormView, ListView
 from django.views.generic.edit import CreateView
 from django.utils.translation import ugettext_lazy as _
 
-from envelope import signals
-from envelope.forms import ContactForm
+from envelope import instrumentation, profiling, settings, signals, slowlog, tracing
+from envelope.forms import AttachmentContactForm, ContactForm
+from envelope.instrumentation import StageTimer
+from envelope.uploadhandlers import LimitedTemporaryFileUploadHandler
+from envelope.utils import get_receiver_name, has_field
 
 logger = logging.getLogger('envelope.views')
 
@@ -53,11 +61,25 @@ class ContactView(FormView):
         URL of the page with some kind of a "thank you
         for your feedback", displayed after the form is successfully
         submitted. If left unset, the view redirects to itself.
+
+    ``max_request_size``
+        Largest accepted request body, in bytes. Larger submissions are
+        refused with a 413 response before the body is read. Defaults to
+        ``settings.ENVELOPE_MAX_REQUEST_SIZE``.
     """
     form_class = ContactForm
     form_kwargs = {}
     template_name = 'envelope/contact.html'
     success_url = None
+    max_request_size = None
+
+    def get_max_request_size(self):
+        """
+        Returns the largest accepted request body, or None for no limit.
+        """
+        if self.max_request_size is not None:
+            return self.max_request_size
+        return settings.MAX_REQUEST_SIZE
 
     def get_success_url(self):
         """
@@ -91,18 +113,93 @@ class ContactView(FormView):
         kwargs.update(self.form_kwargs)
         return kwargs
 
+    def post(self, request, *args, **kwargs):
+        """
+        Validates the submitted form, measuring how long it takes.
+
+        The submission is traced as an ``envelope.submission`` span (see
+        :mod:`envelope.tracing`). Submissions picked by
+        :mod:`envelope.profiling` are also profiled, and those slower than
+        ``ENVELOPE_SLOWLOG_THRESHOLD`` are recorded by
+        :mod:`envelope.slowlog`.
+        """
+        max_request_size = self.get_max_request_size()
+        if max_request_size is not None:
+            try:
+                content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                content_length = 0
+            if content_length > max_request_size:
+                self.set_outcome('too_large')
+                instrumentation.increment('too_large')
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Contact form too large (%d bytes)", content_length,
+                                extra={'envelope': {
+                                    'outcome': 'too_large',
+                                    'size': content_length,
+                                }})
+                return HttpResponse(_("The message is too large."), status=413)
+        self.stage_timer = profiling.get_stage_timer(request)
+        start = default_timer()
+        form = None
+        try:
+            with tracing.get_tracer().span('envelope.submission') as self.span:
+                form = self.get_form(self.get_form_class())
+                with self.stage_timer.stage('validation'):
+                    is_valid = form.is_valid()
+                if is_valid:
+                    return self.form_valid(form)
+                else:
+                    return self.form_invalid(form)
+        finally:
+            duration = default_timer() - start
+            if slowlog.is_slow(duration):
+                slowlog.record_submission(self, form, duration)
+            if isinstance(self.stage_timer, profiling.ProfilingStageTimer):
+                self.stage_timer.save(request.path)
+
+    def set_outcome(self, outcome):
+        """
+        Records how the submission ended: ``sent``, ``failed``, ``rejected``,
+        ``invalid`` or ``too_large``.
+        """
+        self.outcome = outcome
+        span = getattr(self, 'span', tracing.NOOP_SPAN)
+        span.set_attribute('envelope.outcome', outcome)
+
     def form_valid(self, form):
         """
         Sends the message and redirects the user somewhere.
         """
-        responses = signals.before_send.send(sender=self.__class__,
-                                             request=self.request,
-                                             form=form)
+        timer = getattr(self, 'stage_timer', None) or StageTimer()
+        span = getattr(self, 'span', tracing.NOOP_SPAN)
+        span.set_attribute('envelope.category', form.cleaned_data.get('category'))
+        instrumentation.increment('submissions')
+        with timer.stage('before_send'):
+            responses = tracing.send_signal(signals.before_send,
+                                            sender=self.__class__,
+                                            request=self.request,
+                                            form=form)
+        self.receivers = [get_receiver_name(receiver) for receiver, response in responses]
         for (receiver, response) in responses:
             if not response:
-                error_message = _("Rejected by %s") % receiver.__name__
+                name = get_receiver_name(receiver)
+                self.set_outcome('rejected')
+                instrumentation.increment('rejections',
+                                          tags={'receiver': name})
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Contact form rejected by %s", name,
+                                extra={'envelope': {
+                                    'category': form.cleaned_data.get('category'),
+                                    'outcome': 'rejected',
+                                    'receiver': name,
+                                    'timings': timer.as_dict(),
+                                }})
+                error_message = _("Rejected by %s") % name
                 return HttpResponseBadRequest(error_message)
-        form.save()
+        form.stage_timer = timer
+        sent = form.save()
+        self.set_outcome('failed' if sent is False else 'sent')
         messages.info(self.request,
                       _("Thank you for your message."),
                       fail_silently=True)
@@ -112,12 +209,53 @@ class ContactView(FormView):
         """
         When the form has errors, display it again.
         """
+        self.set_outcome('invalid')
+        if logger.isEnabledFor(logging.DEBUG):
+            timer = getattr(self, 'stage_timer', None)
+            logger.debug("Contact form invalid (fields: %s)", ', '.join(form.errors),
+                         extra={'envelope': {
+                             'outcome': 'invalid',
+                             'errors': sorted(form.errors),
+                             'timings': timer.as_dict() if timer else {},
+                         }})
         messages.error(self.request,
                        _("There was an error in the contact form."),
                        fail_silently=True)
         return self.render_to_response(self.get_context_data(form=form))
 
 
+class AttachmentContactView(ContactView):
+    """
+    Contact form view accepting file attachments.
+
+    Uploaded files are written straight to temporary files on disk and the
+    upload is stopped early when the attachments exceed the configured
+    limits. The template must render the form with
+    ``enctype="multipart/form-data"``.
+    """
+    form_class = AttachmentContactForm
+
+    def get_max_request_size(self):
+        # the upload handler enforces the limits of attachments while reading
+        return None
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        # upload handlers can't be changed once request.POST is accessed,
+        # which is why the CSRF check has to wait until they are set
+        request.upload_handlers = [LimitedTemporaryFileUploadHandler(request)]
+        return self._dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def _dispatch(self, request, *args, **kwargs):
+        return super(AttachmentContactView, self).dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super(AttachmentContactView, self).get_form_kwargs()
+        kwargs['upload_error'] = getattr(self.request, 'envelope_upload_error', None)
+        return kwargs
+
+
 class BaseContact(CreateView):
     user = None
     company = None
@@ -172,6 +310,61 @@ class BaseContact(CreateView):
         )
 
 
+class ContactInboxView(ListView):
+    """
+    Staff-only list of contact records, newest first, paginated with
+    cursors instead of page numbers.
+
+    ``model``
+        The contact model to list (a subclass of
+        :class:`envelope.models.BaseContact`). Required.
+
+    ``page_size``
+        Number of contacts on a page. Defaults to 50.
+
+    The list can be filtered with ``state`` and ``company`` (a company id,
+    ignored unless the model has a ``company`` field) query string
+    parameters; ``cursor`` selects the page. The template
+    (``envelope/inbox.html`` by default) gets the contacts as
+    ``object_list``, the cursor of the next page as ``next_cursor`` and the
+    query string of the next page as ``next_page_query``.
+    No query ever counts the rows of the table.
+    """
+    page_size = 50
+    template_name = 'envelope/inbox.html'
+
+    @method_decorator(user_passes_test(lambda u: u.is_active and u.is_staff))
+    def dispatch(self, *args, **kwargs):
+        return super(ContactInboxView, self).dispatch(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.with_related()
+        try:
+            state = self.request.GET.get('state')
+            if state:
+                queryset = queryset.filter(state=int(state))
+            company = self.request.GET.get('company')
+            if company and has_field(self.model, 'company'):
+                queryset = queryset.for_company(int(company))
+        except ValueError:
+            return queryset.none()
+        return queryset
+
+    def get(self, request, *args, **kwargs):
+        try:
+            self.object_list, self.next_cursor = self.get_queryset().page(
+                request.GET.get('cursor'), self.page_size)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        context = self.get_context_data(object_list=self.object_list,
+                                        next_cursor=self.next_cursor)
+        if self.next_cursor:
+            params = request.GET.copy()
+            params['cursor'] = self.next_cursor
+            context['next_page_query'] = params.urlencode()
+        return self.render_to_response(context)
+
+
 # def filter_spam(sender, request, form, **kwargs):
 #     """
 #     Handle spam filtering.